@@ -0,0 +1,137 @@
+import math
+
+# ==========================================
+# ACUMULADORES EN STREAMING (MEMORIA CONSTANTE)
+# ==========================================
+# Para correr barridos y horizontes largos sin guardar un objeto por cliente:
+#   - media y desvío con Welford (una pasada, numéricamente estable)
+#   - cuantiles con un sketch de cubetas logarítmicas (estilo DDSketch):
+#     error RELATIVO acotado (1% por defecto) con unos pocos cientos de cubetas,
+#     sin importar cuántos valores entren. Dos sketches se fusionan sumando cubetas
+#     (réplicas, días, procesos), cosa que no se puede con P² ni con un reservorio.
+
+
+class SketchCuantiles:
+    def __init__(self, error_relativo=0.01, minimo=1e-3):
+        """
+        error_relativo: cota del error de cualquier cuantil (0.01 = ±1% del valor real).
+        minimo: valores <= minimo cuentan como 0 (ej: los que no esperaron nada).
+        """
+        if not 0 < error_relativo < 1:
+            raise ValueError("error_relativo debe estar entre 0 y 1")
+        self.error_relativo = error_relativo
+        self.minimo = minimo
+        self.gamma = (1 + error_relativo) / (1 - error_relativo)
+        self._log_gamma = math.log(self.gamma)
+        self.cubetas = {} # índice i -> conteo de valores en (gamma^(i-1), gamma^i]
+        self.ceros = 0
+        self.n = 0
+
+    def agregar(self, x):
+        self.n += 1
+        if x <= self.minimo:
+            self.ceros += 1
+            return
+        i = math.ceil(math.log(x) / self._log_gamma)
+        cubetas = self.cubetas
+        cubetas[i] = cubetas.get(i, 0) + 1
+
+    def cuantil(self, q):
+        """Cuantil q (0-1) aproximado; 0.0 sin datos"""
+        if not self.n: return 0.0
+        rango = q * (self.n - 1)
+        acumulado = self.ceros
+        if rango < acumulado: return 0.0
+        for i in sorted(self.cubetas):
+            acumulado += self.cubetas[i]
+            if rango < acumulado:
+                # Punto medio (en escala relativa) de la cubeta: error <= error_relativo
+                return 2 * self.gamma ** i / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.cubetas) / (self.gamma + 1)
+
+    def fusionar(self, otro):
+        if otro.gamma != self.gamma or otro.minimo != self.minimo:
+            raise ValueError("Solo se fusionan sketches con el mismo error_relativo y minimo")
+        for i, conteo in otro.cubetas.items():
+            self.cubetas[i] = self.cubetas.get(i, 0) + conteo
+        self.ceros += otro.ceros
+        self.n += otro.n
+        return self
+
+    def __len__(self):
+        return self.n
+
+    def __repr__(self):
+        return f"SketchCuantiles(n={self.n}, {len(self.cubetas)} cubetas, error={self.error_relativo:.1%})"
+
+
+class KPIsEspera:
+    """Esperas de los clientes atendidos: todo lo que piden los reportes, en O(1) memoria"""
+
+    def __init__(self, sla_min=10.0, error_relativo=0.01):
+        self.sla_min = sla_min
+        self.n = 0
+        self.media = 0.0
+        self._m2 = 0.0 # Suma de cuadrados de desvíos (Welford)
+        self.maximo = 0.0
+        self.dentro_sla = 0
+        self.cola_max = 0
+        self.sketch = SketchCuantiles(error_relativo)
+
+    def agregar(self, espera_min, cola_al_llegar=0):
+        self.n += 1
+        delta = espera_min - self.media
+        self.media += delta / self.n
+        self._m2 += delta * (espera_min - self.media)
+        if espera_min > self.maximo: self.maximo = espera_min
+        if espera_min <= self.sla_min: self.dentro_sla += 1
+        if cola_al_llegar > self.cola_max: self.cola_max = cola_al_llegar
+        self.sketch.agregar(espera_min)
+
+    @property
+    def desvio(self):
+        return math.sqrt(self._m2 / (self.n - 1)) if self.n > 1 else 0.0
+
+    @property
+    def sla_pct(self):
+        return self.dentro_sla / self.n * 100 if self.n else 100.0
+
+    def cuantil(self, q):
+        return self.sketch.cuantil(q)
+
+    def fusionar(self, otro):
+        """Combina dos acumuladores (Chan et al.): réplicas, días o procesos"""
+        if otro.sla_min != self.sla_min:
+            raise ValueError("Solo se fusionan KPIs con el mismo sla_min")
+        n = self.n + otro.n
+        if n:
+            delta = otro.media - self.media
+            self._m2 += otro._m2 + delta * delta * self.n * otro.n / n
+            self.media += delta * otro.n / n
+        self.n = n
+        self.maximo = max(self.maximo, otro.maximo)
+        self.dentro_sla += otro.dentro_sla
+        self.cola_max = max(self.cola_max, otro.cola_max)
+        self.sketch.fusionar(otro.sketch)
+        return self
+
+    def __repr__(self):
+        return (f"KPIsEspera(n={self.n}, media={self.media:.2f} min, p95={self.cuantil(0.95):.2f} min, "
+                f"SLA<={self.sla_min:g} min: {self.sla_pct:.1f}%)")
+
+
+# --- ZONA DE PRUEBAS ---
+
+if __name__ == "__main__":
+    import numpy as np
+    rng = np.random.default_rng(0)
+    # Mezcla típica de esperas: muchos ceros y una cola larga
+    esperas = np.where(rng.random(1_000_000) < 0.4, 0.0, rng.gamma(1.5, 6.0, 1_000_000))
+    kpis = KPIsEspera()
+    for x in esperas.tolist():
+        kpis.agregar(x)
+    print(kpis, "|", kpis.sketch)
+    for q in [0.5, 0.9, 0.95, 0.99]:
+        exacto = np.quantile(esperas, q)
+        print(f"p{q * 100:g}: sketch {kpis.cuantil(q):7.3f} | exacto {exacto:7.3f} | error {kpis.cuantil(q) / exacto - 1:+.2%}")
+    print(f"media {kpis.media:.4f} vs {esperas.mean():.4f} | desvío {kpis.desvio:.4f} vs {esperas.std(ddof=1):.4f}")
@@ -0,0 +1,98 @@
+import heapq
+import itertools
+
+# ==========================================
+# LISTA DE EVENTOS FUTUROS (FEL) CANCELABLE
+# ==========================================
+
+# Estados de una entrada del heap
+_VIVO = 1
+_CANCELADO = 0
+_CONSUMIDO = -1
+
+
+class AgendaEventos:
+    """
+    Priority Queue de eventos sobre heapq con cancelación perezosa.
+
+    Cancelar un evento no lo saca del heap (eso sería O(n)): solo lo marca
+    como 'lápida'. Las lápidas se descartan cuando llegan al tope y, si se
+    acumulan demasiadas, se compacta el heap entero de una vez.
+    """
+
+    def __init__(self, fraccion_compactacion=0.5, minimo_compactacion=1024):
+        self._heap = []
+        self._secuencia = itertools.count() # Desempate estable entre eventos simultáneos
+        self._lapidas = 0
+        # Compactamos cuando las lápidas superan esta fracción del heap
+        self.fraccion_compactacion = fraccion_compactacion
+        self.minimo_compactacion = minimo_compactacion
+        self.compactaciones = 0
+
+    def programar(self, tiempo, tipo, data=None):
+        """Agenda un evento y devuelve su 'ticket' (sirve para cancelarlo)"""
+        entrada = [tiempo, next(self._secuencia), tipo, data, _VIVO]
+        heapq.heappush(self._heap, entrada)
+        return entrada
+
+    def cancelar(self, entrada):
+        """Cancela en O(1). Ignora tickets ya consumidos o ya cancelados."""
+        if entrada is None or entrada[4] != _VIVO:
+            return False
+        entrada[4] = _CANCELADO
+        self._lapidas += 1
+
+        if (self._lapidas > self.minimo_compactacion and
+                self._lapidas > self.fraccion_compactacion * len(self._heap)):
+            self._compactar()
+        return True
+
+    def extraer(self):
+        """Saca el próximo evento vivo como tupla (tiempo, tipo, data)"""
+        heap = self._heap
+        while heap:
+            entrada = heapq.heappop(heap)
+            if entrada[4] == _VIVO:
+                entrada[4] = _CONSUMIDO
+                return entrada[0], entrada[2], entrada[3]
+            self._lapidas -= 1 # Lápida descartada
+        raise IndexError("extraer() sobre una agenda vacía")
+
+    def proximo_tiempo(self):
+        """Tiempo del próximo evento vivo (None si no hay)"""
+        heap = self._heap
+        while heap and heap[0][4] != _VIVO:
+            heapq.heappop(heap)
+            self._lapidas -= 1
+        return heap[0][0] if heap else None
+
+    def _compactar(self):
+        # O(n) una vez cada ~n cancelaciones -> O(1) amortizado
+        self._heap = [e for e in self._heap if e[4] == _VIVO]
+        heapq.heapify(self._heap)
+        self._lapidas = 0
+        self.compactaciones += 1
+
+    def __getstate__(self):
+        # El contador de secuencia se guarda como número (y solo los campos propios:
+        # la instrumentación puede haber envuelto métodos en la instancia)
+        siguiente = next(self._secuencia)
+        self._secuencia = itertools.count(siguiente)
+        return {"heap": self._heap, "siguiente": siguiente, "lapidas": self._lapidas,
+                "fraccion_compactacion": self.fraccion_compactacion,
+                "minimo_compactacion": self.minimo_compactacion, "compactaciones": self.compactaciones}
+
+    def __setstate__(self, estado):
+        self._heap = estado["heap"]
+        self._secuencia = itertools.count(estado["siguiente"])
+        self._lapidas = estado["lapidas"]
+        self.fraccion_compactacion = estado["fraccion_compactacion"]
+        self.minimo_compactacion = estado["minimo_compactacion"]
+        self.compactaciones = estado["compactaciones"]
+
+    def __len__(self):
+        # Solo cuenta eventos vivos
+        return len(self._heap) - self._lapidas
+
+    def __bool__(self):
+        return len(self._heap) > self._lapidas
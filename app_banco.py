@@ -1,11 +1,12 @@
 import streamlit as st
 import heapq
-import random
 from collections import deque
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 
+from distribuciones import crear_flujo, semillas_independientes
+
 # ==========================================
 # 1. LÓGICA DE SIMULACIÓN (Backend)
 # ==========================================
@@ -26,13 +27,18 @@ class Servidor:
         self.tiempo_fin_servicio = 0.0
 
 class SimulacionBancoInteligente:
-    def __init__(self, tasa_llegada, tasa_servicio, min_serv, max_serv, umbral_up, umbral_down):
+    def __init__(self, tasa_llegada, tasa_servicio, min_serv, max_serv, umbral_up, umbral_down, semilla=None):
         self.lambd = tasa_llegada
         self.mu = tasa_servicio
         self.min_servers = min_serv
         self.max_servers = max_serv
         self.umbral_up = umbral_up / 60.0
         self.umbral_down = umbral_down / 60.0
+
+        # Variables aleatorias pre-generadas en bloques (distribuciones.py): una llamada a NumPy cada miles de eventos
+        s_lleg, s_serv = semillas_independientes(semilla, 2)
+        self.flujo_llegadas = crear_flujo(None, s_lleg, media=1.0 / self.lambd)
+        self.flujo_servicio = crear_flujo(None, s_serv, media_por_defecto=1.0 / self.mu)
         
         self.reloj = 0.0
         self.cola_clientes = deque()
@@ -80,7 +86,7 @@ class SimulacionBancoInteligente:
                     return
 
     def programar_llegada(self):
-        tiempo = random.expovariate(self.lambd)
+        tiempo = self.flujo_llegadas.siguiente()
         heapq.heappush(self.eventos, (self.reloj + tiempo, "LLEGADA", None))
 
     def correr(self, num_clientes):
@@ -135,7 +141,7 @@ class SimulacionBancoInteligente:
             cliente = self.cola_clientes.popleft()
             candidato.ocupado = True
             cliente.hora_inicio_atencion = self.reloj
-            duracion = random.expovariate(self.mu)
+            duracion = self.flujo_servicio.siguiente()
             cliente.hora_salida = self.reloj + duracion
             candidato.tiempo_fin_servicio = cliente.hora_salida
             
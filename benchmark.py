@@ -0,0 +1,355 @@
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+import warnings
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# ==========================================
+# SUITE DE BENCHMARKS DE LOS MOTORES
+# ==========================================
+# Mide, para cada motor y cada combinación (carga, servidores):
+#   - eventos/seg        -> mejor de N repeticiones, SIN tracemalloc (no contamina el tiempo)
+#   - pico de memoria    -> corrida aparte con tracemalloc (heap de Python + NumPy)
+#                           y pico de RSS del proceso (incluye el C++ de super_cpp) si Linux lo permite
+#   - bytes por cliente  -> pico de memoria / clientes simulados
+# y guarda todo en JSON para comparar commits:
+#
+#   python benchmark.py -o bench_base.json
+#   python benchmark.py -o bench_nuevo.json --comparar bench_base.json
+#
+# En los casos de ETL los "eventos" son filas procesadas (log del sistema + clientes).
+# "carga" es la utilización objetivo rho = lambda / (c * mu). En los motores con
+# curva de demanda, rho se alcanza en la hora pico (factor 1.8).
+
+CARGAS = [0.5, 0.8, 0.95]
+SERVIDORES = [5, 20]
+TASA_SERVICIO = 20.0
+FACTOR_PICO = 1.8
+
+
+# --- Medición ---
+
+def _rss_kb(campo):
+    """VmRSS / VmHWM del proceso en KB (None fuera de Linux)"""
+    try:
+        with open("/proc/self/status") as f:
+            for linea in f:
+                if linea.startswith(campo):
+                    return int(linea.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _reiniciar_pico_rss():
+    """Linux permite resetear VmHWM escribiendo 5 en clear_refs"""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def medir(caso, repeticiones):
+    """
+    caso: callable sin argumentos que corre el motor y devuelve (clientes, eventos).
+    Devuelve el dict de métricas.
+    """
+    tiempos = []
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        clientes, eventos = caso()
+        tiempos.append(time.perf_counter() - t0)
+    segundos = min(tiempos)
+
+    # Pasada de memoria (tracemalloc hace todo 2-3x más lento: no se usa para el tiempo)
+    rss_base = _rss_kb("VmRSS") if _reiniciar_pico_rss() else None
+    tracemalloc.start()
+    caso()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rss_pico = _rss_kb("VmHWM") if rss_base is not None else None
+
+    return {
+        "clientes": clientes,
+        "eventos": eventos,
+        "segundos": segundos,
+        "segundos_mediana": float(np.median(tiempos)),
+        "eventos_por_seg": eventos / segundos if segundos > 0 else None,
+        "pico_python_mb": pico / 2**20,
+        "pico_rss_mb": (rss_pico - rss_base) / 1024 if rss_pico is not None else None,
+        "bytes_por_cliente": pico / clientes if clientes else None,
+        # Lo único que ve la memoria del C++ es el RSS
+        "bytes_por_cliente_rss": (rss_pico - rss_base) * 1024 / clientes if rss_pico is not None and clientes else None,
+    }
+
+
+# --- Carga perezosa de los motores ---
+# Los dashboards de Streamlit se importan en "bare mode": se ejecuta el sidebar
+# con los valores por defecto pero ningún botón, así que no simulan nada.
+
+def _importar_dashboard(nombre):
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    for nombre_logger in list(logging.root.manager.loggerDict):
+        if nombre_logger.startswith("streamlit"):
+            logging.getLogger(nombre_logger).setLevel(logging.ERROR)
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        return __import__(nombre)
+
+
+def _silencioso(funcion, *args):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return funcion(*args)
+
+
+# --- Casos por motor: cada uno devuelve callables (clientes, eventos) ---
+
+def casos_master(carga, c, semilla):
+    from motor_master import SimulacionMaster
+    tasa_base = carga * c * TASA_SERVICIO / FACTOR_PICO
+
+    def caso():
+        sim = SimulacionMaster(tasa_base, TASA_SERVICIO, 1, c, 15, 3, semilla=semilla)
+        sim.correr()
+        return len(sim.historial_clientes), sim.eventos_procesados
+    return caso
+
+
+def casos_master_agregados(carga, c, semilla):
+    """Mismo día que casos_master, en modo solo agregados (como en los barridos)"""
+    from motor_master import SimulacionMaster
+    tasa_base = carga * c * TASA_SERVICIO / FACTOR_PICO
+
+    def caso():
+        sim = SimulacionMaster(tasa_base, TASA_SERVICIO, 1, c, 15, 3, semilla=semilla, solo_agregados=True)
+        kpis = sim.correr()
+        return kpis["Atendidos"], sim.eventos_procesados
+    return caso
+
+
+def casos_pro(carga, c, semilla):
+    pro = _importar_dashboard("simulacion_pro")
+    tasa_base = carga * c * TASA_SERVICIO / FACTOR_PICO
+
+    def caso():
+        sim = pro.SimulacionAvanzada(tasa_base, TASA_SERVICIO, 1, c, 15, 3, semilla=semilla)
+        df_clientes, _, _ = sim.correr_simulacion()
+        # Una llegada + una salida por cliente atendido
+        return len(df_clientes), 2 * len(df_clientes)
+    return caso
+
+
+def casos_banco(carga, c, semilla, n_clientes):
+    from simulacion_banco import SimulacionBancoInteligente
+
+    def caso():
+        sim = SimulacionBancoInteligente(carga * c * TASA_SERVICIO, TASA_SERVICIO, 1, c, semilla=semilla)
+        _silencioso(sim.correr, n_clientes)
+        return len(sim.historial_clientes), 2 * len(sim.historial_clientes)
+    return caso
+
+
+def casos_supermercado(c, semilla, n_clientes):
+    # La carga del supermercado es fija (llegan 30% más rápido de lo que se atiende)
+    myth = _importar_dashboard("supermercado_myth")
+
+    def caso():
+        myth.simular_escenario_fijo(c, TASA_SERVICIO, n_clientes, semilla=semilla)
+        return n_clientes, 2 * n_clientes
+    return caso
+
+
+def casos_cpp(carga, semilla, n_clientes, generador="xoshiro256++"):
+    import super_cpp # M/M/1: un solo servidor
+
+    def caso():
+        sim = super_cpp.Simulador(carga * TASA_SERVICIO, TASA_SERVICIO, generador, semilla)
+        sim.correr(n_clientes)
+        return n_clientes, 2 * n_clientes
+    return caso
+
+
+def casos_cpp_generador(generador, semilla, n_variables):
+    """Microbenchmark del generador: 'eventos' = exponenciales por segundo (sin simulación)"""
+    import super_cpp
+
+    def caso():
+        super_cpp.exponenciales(n_variables, 1.0, generador, semilla)
+        return n_variables, n_variables
+    return caso
+
+
+def casos_cpp_paralelo(carga, semilla, n_clientes):
+    """Una sola corrida M/M/1 repartida en hilos (scan paralelo de Lindley, dos pasadas)"""
+    import super_cpp
+
+    def caso():
+        sim = super_cpp.Simulador(carga * TASA_SERVICIO, TASA_SERVICIO)
+        sim.correr_paralelo(n_clientes, semilla=semilla)
+        return n_clientes, 2 * n_clientes
+    return caso
+
+
+def casos_cpp_lote(carga, c, semilla, n_clientes, configuraciones=64):
+    """super_cpp.correr_lote: `configuraciones` M/M/c en una sola llamada (hilos de C++)"""
+    import super_cpp
+    por_config = max(n_clientes // configuraciones, 1)
+    semillas = np.arange(semilla, semilla + configuraciones, dtype=np.uint64)
+
+    def caso():
+        super_cpp.correr_lote(np.full(configuraciones, carga * c * TASA_SERVICIO), TASA_SERVICIO, c,
+                              semillas, n_clientes=por_config)
+        return por_config * configuraciones, 2 * por_config * configuraciones
+    return caso
+
+
+def casos_etl(carga, c, semilla):
+    """ETL de los dashboards sobre la salida de un día del motor master"""
+    from motor_master import SimulacionMaster, fusionar_realidad_vs_estimado
+    pro = _importar_dashboard("simulacion_pro")
+    sim = SimulacionMaster(carga * c * TASA_SERVICIO / FACTOR_PICO, TASA_SERVICIO, 1, c, 15, 3, semilla=semilla)
+    df_clientes, df_sistema, _ = sim.correr()
+    # Mismo log con los nombres de columnas de SimulacionAvanzada
+    df_log = df_sistema.rename(columns={"Tiempo": "Tiempo_Exacto", "Tasa_Llegada_Instantanea": "Tasa_Llegada_Teorica",
+                                        "Wait_Time_Estimado_Min": "Wait_Time_Estimado"})
+    df_log["Hora_Dia"] = df_log["Tiempo_Exacto"]
+    filas = len(df_sistema) + len(df_clientes)
+
+    def fusionar():
+        fusionar_realidad_vs_estimado(df_sistema.copy(), df_clientes.copy())
+        return len(df_clientes), filas
+
+    def timeseries():
+        pro.generar_dataset_timeseries(df_log.copy())
+        return len(df_clientes), len(df_log)
+    return {"etl_fusionar_realidad_vs_estimado": fusionar, "etl_generar_dataset_timeseries": timeseries}
+
+
+# --- Suite ---
+
+MOTORES = ["master", "pro", "banco", "supermercado", "etl", "cpp"]
+
+
+def correr_suite(motores=MOTORES, cargas=CARGAS, servidores=SERVIDORES, n_clientes=20_000,
+                 n_clientes_cpp=2_000_000, repeticiones=3, semilla=42, verbose=True):
+    resultados = []
+
+    def registrar(motor, carga, c, caso):
+        fila = {"motor": motor, "carga": carga, "servidores": c}
+        fila.update(medir(caso, repeticiones))
+        resultados.append(fila)
+        if verbose:
+            print(f"{motor:<42} rho={carga if carga is not None else '-':<5} c={c:<3} "
+                  f"{fila['eventos_por_seg']:>12,.0f} ev/s  {fila['pico_python_mb']:>8.1f} MB  "
+                  f"{fila['bytes_por_cliente'] or 0:>8.0f} B/cliente  "
+                  f"(RSS: {fila['bytes_por_cliente_rss'] or 0:>6.0f} B/cliente)", flush=True)
+
+    for carga in cargas:
+        for c in servidores:
+            if "master" in motores:
+                registrar("SimulacionMaster", carga, c, casos_master(carga, c, semilla))
+                registrar("SimulacionMaster (solo agregados)", carga, c, casos_master_agregados(carga, c, semilla))
+            if "pro" in motores: registrar("SimulacionAvanzada", carga, c, casos_pro(carga, c, semilla))
+            if "banco" in motores:
+                registrar("SimulacionBancoInteligente", carga, c, casos_banco(carga, c, semilla, n_clientes))
+            if "etl" in motores:
+                for nombre, caso in casos_etl(carga, c, semilla).items():
+                    registrar(nombre, carga, c, caso)
+        if "cpp" in motores:
+            try:
+                registrar("super_cpp.Simulador", carga, 1, casos_cpp(carga, semilla, n_clientes_cpp))
+                registrar("super_cpp.Simulador (mt19937)", carga, 1,
+                          casos_cpp(carga, semilla, n_clientes_cpp, "mt19937"))
+                registrar("super_cpp.Simulador.correr_paralelo", carga, 1,
+                          casos_cpp_paralelo(carga, semilla, n_clientes_cpp))
+                for c in servidores:
+                    registrar("super_cpp.correr_lote (64 configs)", carga, c,
+                              casos_cpp_lote(carga, c, semilla, n_clientes_cpp))
+            except ImportError:
+                if verbose: print("super_cpp no está compilado: se saltea (ver CMakeLists.txt)")
+                motores = [m for m in motores if m != "cpp"]
+
+    if "cpp" in motores:
+        import super_cpp
+        for generador in super_cpp.GENERADORES:
+            registrar(f"super_cpp.exponenciales ({generador})", None, 1,
+                      casos_cpp_generador(generador, semilla, 2 * n_clientes_cpp))
+
+    if "supermercado" in motores:
+        for c in servidores:
+            registrar("supermercado_myth.simular_escenario_fijo", None, c,
+                      casos_supermercado(c, semilla, n_clientes))
+    return resultados
+
+
+def _commit_actual():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def comparar(resultados, ruta_base):
+    """Tabla de speedup (eventos/seg nuevo / base) y memoria contra un JSON anterior"""
+    with open(ruta_base) as f:
+        base = json.load(f)
+    clave = ["motor", "carga", "servidores"]
+    df_nuevo = pd.DataFrame(resultados).set_index(clave)
+    df_base = pd.DataFrame(base["resultados"]).set_index(clave)
+    df = df_nuevo[["eventos_por_seg", "bytes_por_cliente"]].join(
+        df_base[["eventos_por_seg", "bytes_por_cliente"]], rsuffix="_base", how="inner")
+    df["speedup"] = df["eventos_por_seg"] / df["eventos_por_seg_base"]
+    df["memoria_relativa"] = df["bytes_por_cliente"] / df["bytes_por_cliente_base"]
+    print(f"\nComparación contra {ruta_base} (commit {base['meta'].get('commit')}):")
+    print(df[["speedup", "memoria_relativa"]].to_string(float_format=lambda x: f"{x:.2f}x"))
+    return df
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de los motores de simulación de colas")
+    parser.add_argument("-o", "--salida", default=f"bench_{datetime.now():%Y%m%d_%H%M%S}.json")
+    parser.add_argument("--motores", nargs="+", choices=MOTORES, default=MOTORES)
+    parser.add_argument("--cargas", nargs="+", type=float, default=CARGAS)
+    parser.add_argument("--servidores", nargs="+", type=int, default=SERVIDORES)
+    parser.add_argument("--clientes", type=int, default=20_000, help="Clientes por corrida (banco y supermercado)")
+    parser.add_argument("--clientes-cpp", type=int, default=2_000_000)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--comparar", help="JSON de una corrida anterior para calcular speedups")
+    args = parser.parse_args(argv)
+    warnings.simplefilter("ignore", FutureWarning) # Alias de pandas ('1T', fillna(method=...)) en los dashboards
+
+    resultados = correr_suite(args.motores, args.cargas, args.servidores, args.clientes,
+                              args.clientes_cpp, args.repeticiones, args.semilla)
+    meta = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "commit": _commit_actual(),
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "plataforma": platform.platform(),
+        "procesador": platform.processor() or platform.machine(),
+        "parametros": vars(args),
+    }
+    with open(args.salida, "w") as f:
+        json.dump({"meta": meta, "resultados": resultados}, f, indent=2)
+    print(f"\nResultados guardados en {args.salida}")
+    if args.comparar:
+        comparar(resultados, args.comparar)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import multiprocessing as mp
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from motor_master import SimulacionMaster
+
+# ==========================================
+# RAMAS WHAT-IF DESDE UN CHECKPOINT
+# ==========================================
+# "¿Y si abríamos 3 cajas más a las 12:00?": la mañana compartida se simula UNA vez,
+# se toma un checkpoint y cada alternativa sigue desde ahí en su propio proceso.
+#
+#   sim = SimulacionMaster(...)
+#   sim.avanzar(hasta=4.0)                     # 8:00 + 4 h = 12:00
+#   cp = sim.checkpoint()
+#   ramas = correr_ramas(cp, [{}, {"min_serv": 4}, {"umbral_up": 8, "umbral_down": 2}])
+#
+# Cada variante es un dict de SimulacionMaster.aplicar_cambios() (min_serv, max_serv,
+# umbral_up, umbral_down, semilla). Sin "semilla" todas las ramas comparten los mismos
+# flujos aleatorios (números aleatorios comunes): las diferencias son de la política, no del azar.
+
+
+def correr_rama(checkpoint, cambios=None):
+    """Restaura, aplica la variante y termina el día. Devuelve (df_clientes, df_sistema, df_servidores, resumen)"""
+    sim = SimulacionMaster.desde_checkpoint(checkpoint, **(cambios or {}))
+    df_clientes, df_sistema, df_servidores = sim.correr()
+    return df_clientes, df_sistema, df_servidores, sim.resumen()
+
+
+def correr_ramas(checkpoint, variantes, max_procesos=None):
+    """Corre todas las variantes en paralelo (procesos). Resultados en el mismo orden que `variantes`"""
+    max_procesos = min(max_procesos or os.cpu_count() or 1, len(variantes))
+    if max_procesos <= 1:
+        return [correr_rama(checkpoint, v) for v in variantes]
+    # El checkpoint son bytes: viaja a cada proceso sin re-simular la mañana
+    with ProcessPoolExecutor(max_procesos, mp_context=mp.get_context("spawn")) as pool:
+        return list(pool.map(correr_rama, [checkpoint] * len(variantes), variantes))
+
+
+# --- ZONA DE PRUEBAS ---
+
+if __name__ == "__main__":
+    import time
+    sim = SimulacionMaster(150, 20, 1, 15, 15, 3, semilla=7)
+    t0 = time.perf_counter()
+    sim.avanzar(hasta=4.0)
+    cp = sim.checkpoint()
+    print(f"Mañana simulada en {time.perf_counter() - t0:.3f} s -> {cp}")
+
+    variantes = [{}, {"min_serv": 10}, {"min_serv": 13}, {"umbral_up": 5, "umbral_down": 2}]
+    t0 = time.perf_counter()
+    ramas = correr_ramas(cp, variantes)
+    print(f"{len(ramas)} ramas en {time.perf_counter() - t0:.3f} s")
+    for variante, (df_clientes, _, _, resumen) in zip(variantes, ramas):
+        tarde = df_clientes[df_clientes["Llegada"] >= 4.0]["Espera_Real_Min"]
+        print(f"{str(variante):<40} espera tarde: {tarde.mean():6.2f} min | activaciones: {resumen['contador_activaciones']}")
+
+    # Una rama con semilla propia también se puede pausar y reanudar sin cambiar su futuro
+    rama = SimulacionMaster.desde_checkpoint(cp, semilla=99)
+    rama.avanzar(hasta=5.0, exacto=False)
+    reanudada = SimulacionMaster.desde_checkpoint(rama.checkpoint())
+    print(f"Rama semilla=99 pausada y reanudada idéntica: {rama.correr()[0].equals(reanudada.correr()[0])}")
+    rama = SimulacionMaster.desde_checkpoint(cp, semilla=99)
+    copia = SimulacionMaster.desde_checkpoint(rama.checkpoint())
+    print(f"Checkpoint recién resembrado: próxima llegada {rama.flujo_llegadas.siguiente():.4f} "
+          f"vs restaurada {copia.flujo_llegadas.siguiente():.4f}")
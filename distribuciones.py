@@ -0,0 +1,184 @@
+import itertools
+
+import numpy as np
+
+# ==========================================
+# DISTRIBUCIONES DE LLEGADA / SERVICIO
+# ==========================================
+# Una distribución se describe con un dict ("spec"), el mismo formato que
+# acepta super_cpp.Simulador. Tiempos SIEMPRE en horas (unidad del motor).
+#
+#   {"tipo": "exponencial", "media": 0.05}
+#   {"tipo": "erlang", "k": 3, "media": 0.05}
+#   {"tipo": "gamma", "forma": 2.5, "media": 0.05}
+#   {"tipo": "lognormal", "cv": 0.8, "media": 0.05}
+#   {"tipo": "determinista", "valor": 0.05}
+#   {"tipo": "empirica", "valores": [...]}                 # ECDF interpolada
+#   {"tipo": "empirica", "bordes": [...], "pesos": [...]}  # Histograma
+#   {"tipo": "uniforme", "minimo": 0.0, "maximo": 1.0}
+#
+# "media" es opcional: si falta, el motor la completa con su tasa (1/mu).
+
+EXPONENCIAL = {"tipo": "exponencial"}
+
+TIPOS = ("exponencial", "erlang", "gamma", "lognormal", "determinista", "empirica", "uniforme")
+
+TAMANO_BLOQUE = 16384
+
+
+def tiene_escala_propia(spec):
+    """¿La spec ya trae su media (o valores absolutos) o hay que dársela?"""
+    tipo = spec["tipo"]
+    if tipo == "empirica" or tipo == "uniforme": return True
+    if tipo == "determinista": return "valor" in spec
+    return "media" in spec
+
+
+def media_teorica(spec):
+    """Media exacta de la spec (sin muestrear)"""
+    tipo = spec["tipo"]
+    if tipo == "determinista":
+        return spec.get("valor", spec.get("media"))
+    if tipo == "uniforme":
+        return (spec.get("minimo", 0.0) + spec.get("maximo", 1.0)) / 2
+    if tipo == "empirica":
+        if "valores" in spec:
+            x = np.sort(np.asarray(spec["valores"], dtype=float))
+            if len(x) == 1: return float(x[0])
+            # Media de la ECDF linealmente interpolada (regla del trapecio)
+            return float((x[:-1] + x[1:]).sum() / (2 * (len(x) - 1)))
+        bordes = np.asarray(spec["bordes"], dtype=float)
+        pesos = np.asarray(spec["pesos"], dtype=float)
+        return float(((bordes[:-1] + bordes[1:]) / 2 * pesos).sum() / pesos.sum())
+    return spec["media"]
+
+
+def con_media(spec, media):
+    """Copia de la spec reescalada para que su media sea exactamente `media`"""
+    spec = dict(spec)
+    tipo = spec["tipo"]
+    if tipo == "determinista":
+        spec["valor"] = media
+    elif tipo == "empirica":
+        factor = media / media_teorica(spec)
+        if "valores" in spec:
+            spec["valores"] = [v * factor for v in spec["valores"]]
+        else:
+            spec["bordes"] = [b * factor for b in spec["bordes"]]
+    elif tipo == "uniforme":
+        factor = media / media_teorica(spec)
+        spec["minimo"] = spec.get("minimo", 0.0) * factor
+        spec["maximo"] = spec.get("maximo", 1.0) * factor
+    else:
+        spec["media"] = media
+    return spec
+
+
+def muestrear_bloque(spec, rng, n):
+    """Genera n variables de una sola vez (vectorizado con NumPy)"""
+    tipo = spec["tipo"]
+    if tipo == "exponencial":
+        return rng.exponential(spec["media"], n)
+    if tipo == "erlang":
+        k = int(spec["k"])
+        return rng.gamma(k, spec["media"] / k, n)
+    if tipo == "gamma":
+        forma = spec["forma"]
+        return rng.gamma(forma, spec["media"] / forma, n)
+    if tipo == "lognormal":
+        # Parametrización por media y coeficiente de variación
+        sigma2 = np.log1p(spec["cv"] ** 2)
+        return rng.lognormal(np.log(spec["media"]) - sigma2 / 2, np.sqrt(sigma2), n)
+    if tipo == "determinista":
+        return np.full(n, float(spec["valor"]))
+    if tipo == "uniforme":
+        return rng.uniform(spec.get("minimo", 0.0), spec.get("maximo", 1.0), n)
+    if tipo == "empirica":
+        if "valores" in spec:
+            x = np.sort(np.asarray(spec["valores"], dtype=float))
+            if len(x) == 1: return np.full(n, x[0])
+            # Inversa de la ECDF interpolada: posición continua entre estadísticos de orden
+            u = rng.random(n) * (len(x) - 1)
+            i = u.astype(np.int64)
+            return x[i] + (u - i) * (x[i + 1] - x[i])
+        bordes = np.asarray(spec["bordes"], dtype=float)
+        acum = np.cumsum(np.asarray(spec["pesos"], dtype=float))
+        i = np.searchsorted(acum, rng.random(n) * acum[-1], side="right")
+        i = np.minimum(i, len(acum) - 1)
+        return bordes[i] + rng.random(n) * (bordes[i + 1] - bordes[i])
+    raise ValueError(f"Distribución desconocida: {tipo!r} (opciones: {', '.join(TIPOS)})")
+
+
+class FlujoVariables:
+    """
+    Flujo (stream) de variables aleatorias con buffer.
+    Genera bloques grandes con NumPy y el loop de eventos solo hace next():
+    una llamada vectorizada cada TAMANO_BLOQUE variables en vez de una por evento.
+    """
+
+    def __init__(self, spec, semilla=None, tamano_bloque=TAMANO_BLOQUE):
+        self.spec = spec
+        self.rng = np.random.default_rng(semilla)
+        self.tamano_bloque = tamano_bloque
+        self._it = iter(())
+        self._estado_bloque = None # Estado del RNG antes de generar el bloque actual
+
+    def _rellenar(self):
+        self._estado_bloque = self.rng.bit_generator.state
+        # tolist() -> floats de Python: next() sobre una lista es mucho más rápido que indexar un ndarray
+        self._it = iter(muestrear_bloque(self.spec, self.rng, self.tamano_bloque).tolist())
+
+    def __getstate__(self):
+        # Compacto para checkpoints: en vez del bloque entero se guarda el estado del RNG
+        # que lo generó y cuántas variables ya se consumieron (se regenera igual al restaurar)
+        reduccion = self._it.__reduce__()
+        posicion = reduccion[2] if len(reduccion) > 2 else None # None = bloque agotado
+        estado = {k: v for k, v in self.__dict__.items() if k != "_it"}
+        estado["_posicion"] = posicion
+        return estado
+
+    def __setstate__(self, estado):
+        posicion = estado.pop("_posicion")
+        self.__dict__.update(estado)
+        self._it = iter(())
+        if posicion is not None and self._estado_bloque is not None:
+            self.rng.bit_generator.state = self._estado_bloque
+            self._rellenar()
+            for _ in itertools.islice(self._it, posicion): pass
+
+    def resembrar(self, semilla):
+        """Futuro aleatorio nuevo: descarta el bloque en curso y el estado que lo generó"""
+        self.rng = np.random.default_rng(semilla)
+        self._it = iter(())
+        self._estado_bloque = None
+
+    def siguiente(self):
+        try:
+            return next(self._it)
+        except StopIteration:
+            self._rellenar()
+            return next(self._it)
+
+
+def crear_flujo(spec, semilla=None, media=None, media_por_defecto=None, tamano_bloque=TAMANO_BLOQUE):
+    """
+    Arma un FlujoVariables a partir de una spec.
+    media: fuerza la media (ej: 1.0 para llegadas que después se escalan por la tasa).
+    media_por_defecto: solo se usa si la spec no trae su propia escala.
+    """
+    spec = dict(spec or EXPONENCIAL)
+    if spec["tipo"] not in TIPOS:
+        raise ValueError(f"Distribución desconocida: {spec['tipo']!r} (opciones: {', '.join(TIPOS)})")
+    if media is not None:
+        if not tiene_escala_propia(spec): spec["media"] = media
+        spec = con_media(spec, media)
+    elif not tiene_escala_propia(spec):
+        if media_por_defecto is None:
+            raise ValueError(f"La distribución {spec['tipo']!r} necesita 'media'")
+        spec = con_media(spec, media_por_defecto)
+    return FlujoVariables(spec, semilla, tamano_bloque)
+
+
+def semillas_independientes(semilla, n):
+    """n semillas estadísticamente independientes (una por flujo)"""
+    return np.random.SeedSequence(semilla).spawn(n)
@@ -0,0 +1,242 @@
+import math
+import multiprocessing as mp
+import os
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from motor_master import SimulacionMaster, curva_demanda_diaria
+from perfil_demanda import PerfilDemanda
+from turnos import CalendarioTurnos, Turno
+
+# ==========================================
+# DOTACIÓN POR TRAMO: ERLANG C + CORRECCIÓN POR SIMULACIÓN
+# ==========================================
+# Cuántos cajeros poner en cada tramo del día (ej: 15 min) para cumplir un SLA del tipo
+# "80% de los clientes atendidos en menos de 10 minutos", sin probar MAX_SERVERS a mano.
+#
+#   1. Erlang C por tramo: cada tramo como una M/M/c estacionaria con su tasa media.
+#      Microsegundos, pero ignora los transitorios: la fila que arrastra una subida de
+#      demanda y el tiempo que tarda en vaciarse.
+#   2. Corrección: el plan se convierte en calendario de turnos (turnos.py) y se simulan
+#      réplicas del motor con la flota fija (min = max, sin auto-scaling) y las mismas
+#      semillas en cada iteración. Las réplicas son dirigidas: se arranca con pocas y se
+#      duplican solo mientras algún tramo tenga el SLA dentro del intervalo de confianza
+#      (no se sabe si cumple); los tramos claros no piden más días. Se suma un cajero al PRIMER tramo que no cumple: el
+#      atraso se arrastra hacia adelante, así que arreglar el primero suele arreglar los
+#      que siguen. Se repite hasta que todos cumplen.
+#   3. Recorte (opcional): se saca un cajero de los tramos con más holgura mientras el
+#      plan siga cumpliendo en todos. Nunca por debajo de la carga (c * mu > lambda): un
+#      tramo inestable puede "cumplir" en las réplicas solo porque es corto.
+#
+# El SLA de un tramo se mide sobre los clientes que LLEGAN en él; los que abandonan cuentan
+# como no cumplidos.
+
+
+def erlang_c(c, carga):
+    """Probabilidad de esperar en una M/M/c con `carga` = lambda / mu Erlangs"""
+    if c <= carga: return 1.0
+    b = 1.0
+    for k in range(1, c + 1):
+        b = carga * b / (k + carga * b) # Erlang B recursiva (estable para c grande)
+    return c * b / (c - carga * (1.0 - b))
+
+
+def nivel_servicio(c, tasa, tasa_servicio, espera_min):
+    """Fracción de clientes que esperan como mucho `espera_min` en una M/M/c"""
+    if tasa <= 0: return 1.0
+    carga = tasa / tasa_servicio
+    if c <= carga: return 0.0
+    return 1.0 - erlang_c(c, carga) * math.exp(-(c * tasa_servicio - tasa) * espera_min / 60.0)
+
+
+def cajeros_erlang_c(tasa, tasa_servicio, sla_pct, sla_min, max_cajeros=200):
+    """Mínimo c que cumple el SLA en régimen estacionario (0 si no llega nadie)"""
+    if tasa <= 0: return 0
+    c = int(tasa // tasa_servicio) + 1
+    while nivel_servicio(c, tasa, tasa_servicio, sla_min) * 100 < sla_pct:
+        c += 1
+        if c > max_cajeros:
+            raise ValueError(f"Con {max_cajeros} cajeros no se cumple el SLA a {tasa:.0f} clientes/hora")
+    return c
+
+
+def tasas_por_tramo(perfil, ancho_h):
+    """Tasa media de cada tramo del plan (llegadas esperadas / duración), sobre la grilla del perfil"""
+    n = int(math.ceil(perfil.periodo / ancho_h - 1e-9))
+    bordes = [min(k * ancho_h, perfil.periodo) for k in range(n + 1)]
+    acumulada = [perfil.lambda_acumulada(t) for t in bordes]
+    return np.array([(acumulada[k + 1] - acumulada[k]) / (bordes[k + 1] - bordes[k]) for k in range(n)])
+
+
+def calendario_desde_plan(cajeros, ancho_h, sesion_minima_min=0.0):
+    """Plan por tramo -> CalendarioTurnos: el cajero i trabaja en los tramos con más de i cajeros"""
+    turnos = []
+    for i in range(max(cajeros, default=0)):
+        entrada = None
+        for k, c in enumerate(list(cajeros) + [0]):
+            if c > i and entrada is None: entrada = k
+            elif c <= i and entrada is not None:
+                turnos.append(Turno(i, entrada * ancho_h, k * ancho_h))
+                entrada = None
+    return CalendarioTurnos(turnos, sesion_minima_min)
+
+
+def _replica(tarea):
+    """Un día con el plan: (llegadas, cumplen el SLA) por tramo según la hora de llegada"""
+    parametros, ancho_h, n_tramos, sla_min = tarea
+    sim = SimulacionMaster(**parametros)
+    sim.avanzar()
+    llegadas = [c.hora_llegada for c in sim.historial_clientes]
+    esperas = [c.hora_inicio_atencion - c.hora_llegada for c in sim.historial_clientes]
+    tramo = np.minimum((np.array(llegadas) / ancho_h).astype(np.int64), n_tramos - 1)
+    cumplen = np.bincount(tramo[np.array(esperas) * 60 <= sla_min], minlength=n_tramos)
+    abandonos = np.array([c.hora_llegada for c in sim.historial_abandonos])
+    tramo_ab = np.minimum((abandonos / ancho_h).astype(np.int64), n_tramos - 1)
+    total = np.bincount(tramo, minlength=n_tramos) + np.bincount(tramo_ab, minlength=n_tramos)
+    return total, cumplen
+
+
+class PlanDotacion:
+    def __init__(self, tabla, ancho_h, sla_pct, sla_min, simulaciones):
+        self.tabla = tabla              # DataFrame por tramo
+        self.ancho_h = ancho_h
+        self.sla_pct = sla_pct
+        self.sla_min = sla_min
+        self.simulaciones = simulaciones # Días simulados en total (todas las evaluaciones)
+
+    @property
+    def cajeros(self):
+        return self.tabla["Cajeros"].tolist()
+
+    def calendario(self, sesion_minima_min=0.0):
+        return calendario_desde_plan(self.cajeros, self.ancho_h, sesion_minima_min)
+
+    def horas_cajero(self):
+        return float(self.tabla["Cajeros"].sum() * self.ancho_h)
+
+    def __repr__(self):
+        return (f"PlanDotacion({len(self.tabla)} tramos, {self.horas_cajero():.1f} horas-cajero "
+                f"vs {self.tabla['Erlang_C'].sum() * self.ancho_h:.1f} de Erlang C, "
+                f"{self.simulaciones} días simulados)")
+
+
+def plan_dotacion(perfil, tasa_servicio, sla_pct=80.0, sla_min=10.0, ancho_min=15, replicas=20,
+                  max_replicas=160, confianza=0.95, max_cajeros=200, recortar=True, max_iteraciones=100,
+                  semilla=0, max_procesos=None, **parametros):
+    """
+    Plan de cajeros por tramo de `ancho_min` minutos que cumple el SLA en todos los tramos con demanda.
+    perfil: PerfilDemanda de un día (ej: PerfilDemanda.desde_curva(curva_demanda_diaria, 150)).
+    replicas: días simulados de arranque por evaluación del plan (0 = solo Erlang C); se duplican
+    hasta max_replicas mientras algún tramo quede dudoso al nivel de `confianza`.
+    parametros: extras de SimulacionMaster (paciencia_min, dist_servicio, clases...).
+    """
+    if perfil.ciclico:
+        raise ValueError("El plan es para un día: recortar el perfil semanal con perfil.perfil_dia()")
+    ancho_h = ancho_min / 60.0
+    tasas = tasas_por_tramo(perfil, ancho_h)
+    n_tramos = len(tasas)
+    analitico = [cajeros_erlang_c(t, tasa_servicio, sla_pct, sla_min, max_cajeros) for t in tasas]
+    cajeros = list(analitico)
+    # Mismas semillas en todas las evaluaciones: los cambios de SLA son del plan, no del azar
+    max_replicas = max(max_replicas, replicas)
+    semillas = np.random.SeedSequence(semilla).generate_state(max_replicas).tolist() if replicas else []
+    z = NormalDist().inv_cdf(0.5 + confianza / 2)
+    max_procesos = min(max_procesos or os.cpu_count() or 1, max(replicas, 1))
+    pool = ProcessPoolExecutor(max_procesos, mp_context=mp.get_context("spawn")) if max_procesos > 1 else None
+    dias_simulados = 0
+
+    def evaluar(plan):
+        """(clientes medios por día, SLA %) por tramo, con réplicas hasta que ningún tramo quede dudoso"""
+        nonlocal dias_simulados
+        n = max(max(plan), 1)
+        base = {"tasa_base": 0.0, "tasa_servicio": tasa_servicio, "min_serv": n, "max_serv": n,
+                "umbral_up": sla_min, "umbral_down": 0.0, "perfil": perfil,
+                "turnos": calendario_desde_plan(plan, ancho_h), **parametros}
+        totales, cumplidos = [], []
+        objetivo = replicas
+        while True:
+            tareas = [({**base, "semilla": s}, ancho_h, n_tramos, sla_min) for s in semillas[len(totales):objetivo]]
+            for t, c in (pool.map(_replica, tareas) if pool is not None else map(_replica, tareas)):
+                totales.append(t)
+                cumplidos.append(c)
+            dias_simulados += len(tareas)
+            t, c = np.array(totales, dtype=np.float64), np.array(cumplidos, dtype=np.float64)
+            total = t.sum(axis=0)
+            p = np.divide(c.sum(axis=0), total, out=np.ones(n_tramos), where=total > 0)
+            if len(totales) >= max_replicas: break
+            # Error estándar del cociente (días independientes, clientes de un mismo día correlacionados)
+            error = np.sqrt((c - p * t).var(axis=0, ddof=1) / len(t)) / np.maximum(t.mean(axis=0), 1e-12)
+            if not ((np.abs(p * 100 - sla_pct) < z * error * 100) & (total > 0)).any(): break
+            objetivo = min(2 * len(totales), max_replicas)
+        return total / len(totales), p * 100
+
+    try:
+        total = sla = None
+        if replicas:
+            # 2. Corrección: +1 en el primer tramo que no cumple, hasta que cumplen todos
+            for _ in range(max_iteraciones):
+                total, sla = evaluar(cajeros)
+                fallan = np.flatnonzero((sla < sla_pct) & (total > 0))
+                if not len(fallan): break
+                k = int(fallan[0])
+                if cajeros[k] >= max_cajeros:
+                    raise ValueError(f"El tramo {k} no cumple el SLA ni con {max_cajeros} cajeros")
+                cajeros[k] += 1
+            else:
+                raise ValueError(f"El plan no cumple el SLA después de {max_iteraciones} iteraciones")
+            # 3. Recorte: de más holgura a menos, -1 si el plan sigue cumpliendo en todos los tramos
+            if recortar:
+                minimos = [int(t // tasa_servicio) + 1 if t > 0 else 0 for t in tasas]
+                for k in np.argsort(-(sla - sla_pct), kind="stable"):
+                    if cajeros[k] <= minimos[k]: continue
+                    cajeros[k] -= 1
+                    total_k, sla_k = evaluar(cajeros)
+                    if ((sla_k >= sla_pct) | (total_k == 0)).all():
+                        total, sla = total_k, sla_k
+                    else:
+                        cajeros[k] += 1
+    finally:
+        if pool is not None: pool.shutdown()
+
+    tabla = pd.DataFrame({
+        "Desde_H": np.arange(n_tramos) * ancho_h,
+        "Hasta_H": np.minimum((np.arange(n_tramos) + 1) * ancho_h, perfil.periodo),
+        "Tasa": tasas,
+        "Erlang_C": analitico,
+        "Cajeros": cajeros,
+        "SLA_Erlang_Pct": [nivel_servicio(c, t, tasa_servicio, sla_min) * 100 for c, t in zip(cajeros, tasas)],
+    })
+    if total is not None:
+        tabla["SLA_Sim_Pct"] = sla
+        tabla["Clientes_Sim"] = total
+    return PlanDotacion(tabla, ancho_h, sla_pct, sla_min, dias_simulados)
+
+
+# --- ZONA DE PRUEBAS ---
+
+if __name__ == "__main__":
+    import time
+
+    # Validación de Erlang C: M/M/2 con carga 1 -> P(esperar) = 1/3
+    print(f"Erlang C (c=2, a=1): {erlang_c(2, 1.0):.4f} (teoría 0.3333)")
+
+    # El día del banco (curva_demanda_diaria), 90% atendido en menos de 5 min
+    perfil = PerfilDemanda.desde_curva(curva_demanda_diaria, 150)
+    t0 = time.perf_counter()
+    plan = plan_dotacion(perfil, 20, sla_pct=90, sla_min=5, ancho_min=30)
+    print(f"{plan} en {time.perf_counter() - t0:.1f} s")
+    print(plan.tabla.round(1).to_string(index=False))
+
+    # Control: réplicas nuevas (otras semillas) con el calendario final y el de Erlang C puro
+    for nombre, cajeros in [("Erlang C", plan.tabla["Erlang_C"].tolist()), ("corregido", plan.cajeros)]:
+        tareas = [({"tasa_base": 0.0, "tasa_servicio": 20, "min_serv": max(cajeros), "max_serv": max(cajeros),
+                    "umbral_up": 5, "umbral_down": 0.0, "perfil": perfil, "semilla": 1000 + r,
+                    "turnos": calendario_desde_plan(cajeros, plan.ancho_h)}, plan.ancho_h, len(cajeros), 5)
+                  for r in range(200)]
+        total, cumplen = map(sum, zip(*map(_replica, tareas)))
+        peores = np.sort(cumplen / np.maximum(total, 1) * 100)[:3].round(1).tolist()
+        print(f"{nombre:<10} {sum(cajeros) * plan.ancho_h:5.1f} horas-cajero | SLA global "
+              f"{cumplen.sum() / total.sum() * 100:.1f}% | 3 peores tramos {peores}")
@@ -0,0 +1,152 @@
+from collections import defaultdict
+
+import pandas as pd
+
+# ==========================================
+# ESTIMADORES DE ESPERA (EWT) INTERCAMBIABLES
+# ==========================================
+# Lo que la pantalla le promete a cada cliente que llega. Todos cuestan O(1) por llegada:
+# leen el estado que el motor ya mantiene (largos de cola, activos, libres, cabeza de la fila)
+# o un acumulador propio que se actualiza cuando alguien pasa a la caja.
+#
+#   heuristica  cola / (activos * mu)                       (el _calcular_ewt de siempre)
+#   erlang_c    espera condicional del M/M/c dado el estado: con todos ocupados y L adelante
+#               son L+1 salidas a tasa activos*mu -> (L+1) / (activos*mu); 0 si hay un cajero libre
+#               (con cajeros heterogéneos, la capacidad de los que atienden la clase)
+#   ewma        promedio exponencial de las últimas esperas REALES (las de quienes entran a caja)
+#   cola_cabeza largo de la fila al ritmo que avanzó la cabeza: el primero de la fila tardó
+#               w en recorrer las posiciones que tenía delante al llegar -> (L+1) * w / (L_cabeza+1)
+#
+# MarcadorEWT compara cada promesa con la espera real apenas el cliente pasa a la caja
+# (los que abandonan no tienen espera real y no cuentan) y acumula, por hora de llegada,
+# MAE, sesgo (real - estimado: positivo = esperó más de lo prometido) y cobertura
+# (% que esperó como mucho lo prometido + tolerancia).
+
+
+class EstimadorEWT:
+    nombre = "base"
+
+    def estimar(self, sim, clase):
+        """Espera prometida (horas) al cliente de `clase` que llega ahora a `sim`"""
+        raise NotImplementedError
+
+    def observar(self, espera):
+        """Un cliente pasó a la caja después de esperar `espera` horas"""
+
+    def reiniciar(self):
+        """Día nuevo (horizonte largo): olvidar lo aprendido"""
+
+
+class Heuristica(EstimadorEWT):
+    nombre = "heuristica"
+
+    def estimar(self, sim, clase):
+        return sim._calcular_ewt(clase)
+
+
+class ErlangC(EstimadorEWT):
+    nombre = "erlang_c"
+
+    def estimar(self, sim, clase):
+        if sim.hay_libre(clase): return 0.0
+        if sim.n_activos == 0: return 999.0
+        return (sim.delante(clase) + 1) / sim.capacidad(clase)
+
+
+class EWMA(EstimadorEWT):
+    nombre = "ewma"
+
+    def __init__(self, alfa=0.1):
+        self.alfa = alfa
+        self.valor = 0.0
+
+    def estimar(self, sim, clase):
+        return self.valor
+
+    def observar(self, espera):
+        self.valor += self.alfa * (espera - self.valor)
+
+    def reiniciar(self):
+        self.valor = 0.0
+
+
+class ColaCabeza(EstimadorEWT):
+    nombre = "cola_cabeza"
+
+    def estimar(self, sim, clase):
+        if sim.hay_libre(clase): return 0.0
+        # El estimador no toca la fila: el motor le muestra la cabeza salteando lápidas
+        cabeza = sim.cabeza_viva(clase)
+        delante = sim.delante(clase)
+        if cabeza is not None:
+            w = sim.reloj - cabeza.hora_llegada
+            if w > 0: return (delante + 1) * w / (cabeza.cola_al_llegar + 1)
+        # Sin historia en la fila: mismo criterio que Erlang
+        if sim.n_activos == 0: return 999.0
+        return (delante + 1) / sim.capacidad(clase)
+
+
+ESTIMADORES = {e.nombre: e for e in (Heuristica, ErlangC, EWMA, ColaCabeza)}
+
+
+def crear_estimadores(especificacion):
+    """Lista de nombres (ver ESTIMADORES) y/o instancias de EstimadorEWT -> lista de instancias"""
+    estimadores = []
+    for e in especificacion:
+        if isinstance(e, str):
+            if e not in ESTIMADORES:
+                raise ValueError(f"Estimador desconocido: {e!r} (opciones: {', '.join(ESTIMADORES)})")
+            e = ESTIMADORES[e]()
+        estimadores.append(e)
+    nombres = [e.nombre for e in estimadores]
+    if len(set(nombres)) != len(nombres):
+        raise ValueError(f"Estimadores con nombre repetido: {nombres}")
+    return estimadores
+
+
+class MarcadorEWT:
+    """Error de cada estimador por hora de llegada, en streaming (4 sumas por hora y estimador)"""
+
+    def __init__(self, nombres, tolerancia_min=2.0):
+        self.nombres = list(nombres)
+        self.tolerancia = tolerancia_min / 60.0
+        k = len(self.nombres)
+        # hora -> [clientes, suma |error|, suma error, cubiertos] por estimador (horas)
+        self._sumas = defaultdict(lambda: [[0, 0.0, 0.0, 0] for _ in range(k)])
+
+    def registrar(self, hora_llegada, espera, estimaciones):
+        filas = self._sumas[int(hora_llegada)]
+        tolerancia = self.tolerancia
+        for fila, estimado in zip(filas, estimaciones):
+            error = espera - estimado
+            fila[0] += 1
+            fila[1] += abs(error)
+            fila[2] += error
+            if error <= tolerancia: fila[3] += 1
+
+    def tabla(self, por_hora=True):
+        """DataFrame de MAE / sesgo (minutos) y cobertura (%) por hora y estimador (o totales)"""
+        registros = []
+        for hora in sorted(self._sumas):
+            for nombre, (n, abs_err, err, cubiertos) in zip(self.nombres, self._sumas[hora]):
+                registros.append((hora, nombre, n, abs_err, err, cubiertos))
+        df = pd.DataFrame(registros, columns=["Hora", "Estimador", "Clientes", "_abs", "_err", "_cub"])
+        if not por_hora:
+            df = df.groupby("Estimador", sort=False)[["Clientes", "_abs", "_err", "_cub"]].sum().reset_index()
+        n = df["Clientes"].clip(lower=1)
+        df["MAE_Min"] = df["_abs"] / n * 60
+        df["Sesgo_Min"] = df["_err"] / n * 60
+        df["Cobertura_Pct"] = df["_cub"] / n * 100
+        return df.drop(columns=["_abs", "_err", "_cub"])
+
+    def __getstate__(self):
+        # defaultdict con lambda no se puede picklear: viaja como dict común
+        estado = dict(self.__dict__)
+        estado["_sumas"] = dict(self._sumas)
+        return estado
+
+    def __setstate__(self, estado):
+        sumas = estado.pop("_sumas")
+        self.__dict__.update(estado)
+        k = len(self.nombres)
+        self._sumas = defaultdict(lambda: [[0, 0.0, 0.0, 0] for _ in range(k)], sumas)
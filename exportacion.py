@@ -0,0 +1,143 @@
+import gzip
+import io
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# ==========================================
+# EXPORTACIÓN DE DATASETS (DESCARGA DIFERIDA)
+# ==========================================
+# Los archivos se arman SOLO cuando el usuario aprieta el botón de descarga
+# (st.download_button acepta un callable) y se escriben por bloques de filas,
+# así un log de un millón de clientes no se serializa en cada rerun del dashboard.
+# Lo diferido es la serialización, no la entrega: Streamlit convierte lo que devuelve
+# el callable a un único bytes, así que al descargar el archivo completo está en memoria.
+
+FILAS_POR_BLOQUE = 100_000
+
+# Archivos chicos quedan en RAM; los grandes se vuelcan solos a disco
+_MAX_EN_MEMORIA = 32 * 1024 * 1024
+
+# Formato -> (extensión, MIME)
+FORMATOS = {
+    "CSV": (".csv", "text/csv"),
+    "CSV (gzip)": (".csv.gz", "application/gzip"),
+    "Parquet (zstd)": (".parquet", "application/vnd.apache.parquet"),
+    "Arrow / Feather (zstd)": (".arrow", "application/vnd.apache.arrow.file"),
+    "NumPy (NPZ)": (".npz", "application/zip"),
+}
+
+
+def _bloques(df, filas_por_bloque):
+    for i in range(0, max(len(df), 1), filas_por_bloque):
+        yield i, df.iloc[i:i + filas_por_bloque]
+
+
+def _escribir_csv(df, destino, filas_por_bloque):
+    texto = io.TextIOWrapper(destino, encoding="utf-8", newline="")
+    for i, bloque in _bloques(df, filas_por_bloque):
+        bloque.to_csv(texto, header=(i == 0))
+    texto.flush()
+    texto.detach() # No cerrar el destino al liberar el wrapper
+
+
+def _escribir_csv_gzip(df, destino, filas_por_bloque):
+    with gzip.GzipFile(fileobj=destino, mode="wb", compresslevel=6) as comprimido:
+        _escribir_csv(df, comprimido, filas_por_bloque)
+
+
+def _escribir_parquet(df, destino, filas_por_bloque):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    escritor = None
+    for _, bloque in _bloques(df, filas_por_bloque):
+        tabla = pa.Table.from_pandas(bloque, preserve_index=True)
+        if escritor is None:
+            escritor = pq.ParquetWriter(destino, tabla.schema, compression="zstd")
+        escritor.write_table(tabla.cast(escritor.schema)) # Un row group por bloque
+    escritor.close()
+
+
+def _escribir_arrow(df, destino, filas_por_bloque):
+    import pyarrow as pa
+    escritor = esquema = None
+    for _, bloque in _bloques(df, filas_por_bloque):
+        tabla = pa.Table.from_pandas(bloque, preserve_index=True)
+        if escritor is None:
+            esquema = tabla.schema
+            opciones = pa.ipc.IpcWriteOptions(compression="zstd")
+            escritor = pa.ipc.new_file(destino, esquema, options=opciones)
+        escritor.write_table(tabla.cast(esquema))
+    escritor.close()
+
+
+def _escribir_npz(df, destino, filas_por_bloque):
+    # Una entrada comprimida por columna (+ el índice); el zip se escribe columna por columna
+    columnas = {"__indice__": df.index.to_numpy()}
+    for nombre in df.columns:
+        valores = df[nombre].to_numpy()
+        columnas[str(nombre)] = valores.astype(str) if valores.dtype == object else valores
+    np.savez_compressed(destino, **columnas)
+
+
+_ESCRITORES = {
+    "CSV": _escribir_csv,
+    "CSV (gzip)": _escribir_csv_gzip,
+    "Parquet (zstd)": _escribir_parquet,
+    "Arrow / Feather (zstd)": _escribir_arrow,
+    "NumPy (NPZ)": _escribir_npz,
+}
+
+
+def escribir(df, formato, destino, filas_por_bloque=FILAS_POR_BLOQUE):
+    """Escribe df por bloques en un archivo binario abierto"""
+    if formato not in _ESCRITORES:
+        raise ValueError(f"Formato desconocido: {formato!r} (opciones: {', '.join(FORMATOS)})")
+    _ESCRITORES[formato](df, destino, filas_por_bloque)
+
+
+def generador_descarga(df, formato, filas_por_bloque=FILAS_POR_BLOQUE):
+    """
+    Callable sin argumentos que arma el archivo recién cuando se lo llama.
+    Devuelve el archivo entero como bytes (no es un stream): se difiere la serialización, no la memoria.
+    """
+    def generar():
+        # st.download_button solo acepta str / bytes: el archivo se escribe por bloques y se entrega leído
+        with tempfile.SpooledTemporaryFile(max_size=_MAX_EN_MEMORIA) as destino:
+            escribir(df, formato, destino, filas_por_bloque)
+            destino.seek(0)
+            return destino.read()
+    return generar
+
+
+def boton_descarga(contenedor, etiqueta, df, nombre_base, formato="CSV", key=None):
+    """
+    st.download_button con generación diferida (el archivo se arma al apretar y se entrega entero).
+    contenedor: st o una columna de Streamlit. nombre_base: nombre de archivo sin extensión.
+    """
+    extension, mime = FORMATOS[formato]
+    return contenedor.download_button(
+        f"{etiqueta} ({formato})",
+        generador_descarga(df, formato),
+        nombre_base + extension,
+        mime,
+        key=key,
+        on_click="ignore", # Descargar no re-ejecuta la simulación
+    )
+
+
+def selector_formato(contenedor, key=None):
+    return contenedor.selectbox("Formato de descarga", list(FORMATOS), key=key,
+                                help="Parquet / Arrow son columnares y comprimidos: mucho más chicos y rápidos que CSV.")
+
+
+def leer(ruta):
+    """Lee de vuelta cualquier archivo exportado (para análisis externo en Python)"""
+    if ruta.endswith(".parquet"): return pd.read_parquet(ruta)
+    if ruta.endswith(".arrow"): return pd.read_feather(ruta)
+    if ruta.endswith(".npz"):
+        datos = np.load(ruta, allow_pickle=False)
+        columnas = {k: datos[k] for k in datos.files if k != "__indice__"}
+        return pd.DataFrame(columnas, index=datos["__indice__"])
+    return pd.read_csv(ruta, index_col=0)
@@ -0,0 +1,207 @@
+import heapq
+import math
+import random
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+# ==========================================
+# SUPERMERCADO: UNA FILA POR CAJA
+# ==========================================
+# El mito de la fila (supermercado_myth.py) usa una fila única que reparte a todos los
+# cajeros, como en el banco. En el supermercado cada caja tiene su propia fila y el
+# cliente elige al llegar:
+#
+#   mas_corta   se pone en la fila con menos gente (empate: la caja de número más bajo)
+#   azar        cualquier fila, sin mirar
+#   jockeying   la más corta, y cuando una fila queda `umbral_jockeying` personas más corta
+#               que la más larga, el último de la más larga se cambia (solo el de atrás)
+#
+# IndiceFilas es un heap binario indexado sobre los largos (gente en la caja, incluido el
+# que está pagando): elegir la más corta cuesta O(1) y cada llegada, salida o cambio de
+# fila actualiza el heap en O(log c). Con 50 cajas y millones de clientes nunca se
+# recorren las filas.
+#
+# La posición que ve el cliente es la gente que espera delante en SU fila (sin contar al
+# que está pagando), igual que "Metros de Fila" en el mito.
+
+REGLAS = ("mas_corta", "azar", "jockeying")
+
+
+class IndiceFilas:
+    def __init__(self, largos, maximo=False):
+        """
+        largos: lista compartida con el motor (largo de cada fila); el índice no la copia.
+        maximo: la cima es la fila más larga en vez de la más corta.
+        """
+        self.largos = largos
+        self.signo = -1 if maximo else 1
+        self.heap = list(range(len(largos)))
+        self.pos = list(range(len(largos)))
+        for p in range(len(self.heap) // 2 - 1, -1, -1):
+            self._bajar(p)
+
+    def _menor(self, a, b):
+        # Empates por número de caja: el orden no depende de la historia del heap
+        la, lb = self.signo * self.largos[a], self.signo * self.largos[b]
+        return la < lb or (la == lb and a < b)
+
+    def actualizar(self, i):
+        """La fila i cambió de largo (el motor ya tocó `largos`): se reubica en O(log c)"""
+        p = self.pos[i]
+        if p > 0 and self._menor(i, self.heap[(p - 1) >> 1]): self._subir(p)
+        else: self._bajar(p)
+
+    def _subir(self, p):
+        heap, pos = self.heap, self.pos
+        i = heap[p]
+        while p > 0:
+            padre = (p - 1) >> 1
+            j = heap[padre]
+            if not self._menor(i, j): break
+            heap[p] = j
+            pos[j] = p
+            p = padre
+        heap[p] = i
+        pos[i] = p
+
+    def _bajar(self, p):
+        heap, pos = self.heap, self.pos
+        n = len(heap)
+        i = heap[p]
+        while True:
+            hijo = 2 * p + 1
+            if hijo >= n: break
+            if hijo + 1 < n and self._menor(heap[hijo + 1], heap[hijo]): hijo += 1
+            j = heap[hijo]
+            if not self._menor(j, i): break
+            heap[p] = j
+            pos[j] = p
+            p = hijo
+        heap[p] = i
+        pos[i] = p
+
+
+def simular_filas_separadas(n_cajas, tasa_llegada, tasa_servicio, n_clientes=1000, regla="mas_corta",
+                            umbral_jockeying=2, semilla=None):
+    """
+    Llegadas Poisson (tasa_llegada por hora), servicio exponencial (tasa_servicio por caja)
+    y una fila FIFO por caja. Devuelve un DataFrame con una fila por cliente:
+    Caja (donde pagó), Personas_Delante (al llegar, en la fila elegida), Espera_Min y Cambio_Fila.
+    """
+    if regla not in REGLAS:
+        raise ValueError(f"Regla desconocida: {regla!r} (opciones: {', '.join(REGLAS)})")
+    if regla == "jockeying" and umbral_jockeying < 2:
+        raise ValueError("umbral_jockeying debe ser al menos 2 (con 1 el cliente iría y vendría)")
+
+    rng = random.Random(semilla)
+    expo = rng.expovariate
+    filas = [deque() for _ in range(n_cajas)]  # IDs esperando (sin el que paga)
+    largos = [0] * n_cajas                     # Gente en la caja, incluido el que paga
+    mas_corta = IndiceFilas(largos) if regla != "azar" else None
+    mas_larga = IndiceFilas(largos, maximo=True) if regla == "jockeying" else None
+
+    llegada = [0.0] * n_clientes
+    inicio = [math.nan] * n_clientes
+    caja = [0] * n_clientes
+    delante = [0] * n_clientes
+    cambio = [False] * n_clientes
+
+    salidas = []  # FEL de salidas: (hora, caja); a lo sumo una por caja
+    reloj = 0.0
+    proxima_llegada = expo(tasa_llegada)
+    siguiente = 0
+
+    def atender(i, cliente, ahora):
+        inicio[cliente] = ahora
+        caja[cliente] = i
+        heapq.heappush(salidas, (ahora + expo(tasa_servicio), i))
+
+    while siguiente < n_clientes or salidas:
+        if siguiente < n_clientes and (not salidas or proxima_llegada < salidas[0][0]):
+            # LLEGADA
+            reloj = proxima_llegada
+            cliente = siguiente
+            siguiente += 1
+            llegada[cliente] = reloj
+            i = rng.randrange(n_cajas) if mas_corta is None else mas_corta.heap[0]
+            largos[i] += 1
+            if mas_corta is not None: mas_corta.actualizar(i)
+            if mas_larga is not None: mas_larga.actualizar(i)
+            if largos[i] == 1:
+                atender(i, cliente, reloj)
+            else:
+                delante[cliente] = len(filas[i])
+                filas[i].append(cliente)
+            proxima_llegada = reloj + expo(tasa_llegada)
+        else:
+            # SALIDA de la caja i
+            reloj, i = heapq.heappop(salidas)
+            largos[i] -= 1
+            if mas_corta is not None: mas_corta.actualizar(i)
+            if mas_larga is not None:
+                mas_larga.actualizar(i)
+                # Jockeying: el último de la fila más larga se pasa a la que se achicó
+                j = mas_larga.heap[0]
+                while largos[j] - largos[i] >= umbral_jockeying:
+                    cliente = filas[j].pop()
+                    cambio[cliente] = True
+                    filas[i].append(cliente)
+                    largos[j] -= 1
+                    largos[i] += 1
+                    for indice in (mas_corta, mas_larga):
+                        indice.actualizar(j)
+                        indice.actualizar(i)
+                    j = mas_larga.heap[0]
+            if filas[i]:
+                atender(i, filas[i].popleft(), reloj)
+
+    llegada = np.array(llegada)
+    return pd.DataFrame({
+        "Caja": np.array(caja, dtype=np.int32),
+        "Personas_Delante": np.array(delante, dtype=np.int32),
+        "Espera_Min": (np.array(inicio) - llegada) * 60,
+        "Cambio_Fila": np.array(cambio),
+    })
+
+
+def espera_por_posicion(df, max_posicion=None):
+    """Espera media, p10 y p90 (min) según la gente que había delante al llegar (la curva del mito)"""
+    if max_posicion is not None: df = df[df["Personas_Delante"] <= max_posicion]
+    grupos = df.groupby("Personas_Delante")["Espera_Min"]
+    tabla = grupos.agg(["count", "mean"]).rename(columns={"count": "Clientes", "mean": "Espera_Media_Min"})
+    tabla["P10_Min"] = grupos.quantile(0.10)
+    tabla["P90_Min"] = grupos.quantile(0.90)
+    return tabla
+
+
+# --- ZONA DE PRUEBAS ---
+
+if __name__ == "__main__":
+    import time
+
+    # 1. Validación: con una sola caja es una M/M/1 (Wq = rho / (mu - lambda))
+    df = simular_filas_separadas(1, 18, 20, 400_000, semilla=1)
+    print(f"M/M/1 rho=0.9: espera {df['Espera_Min'].mean():.2f} min (teoría {0.9 / (20 - 18) * 60:.2f})")
+
+    # 2. Las reglas frente a frente: 10 cajas al 95%
+    for regla in REGLAS:
+        df = simular_filas_separadas(10, 190, 20, 300_000, regla=regla, semilla=7)
+        por_posicion = espera_por_posicion(df, 6)["Espera_Media_Min"].round(1).tolist()
+        print(f"{regla:<10} espera {df['Espera_Min'].mean():5.2f} min | p95 {df['Espera_Min'].quantile(0.95):5.1f} | "
+              f"cambios de fila {df['Cambio_Fila'].mean() * 100:4.1f}% | espera por posición 0..6 {por_posicion}")
+
+    # 3. La misma posición, distinta espera: depende de cuántas cajas hay y de la fila que tocó
+    for n_cajas in (2, 6, 12):
+        df = simular_filas_separadas(n_cajas, n_cajas * 20 * 0.95, 20, 200_000, semilla=3)
+        fila = espera_por_posicion(df).loc[5]
+        print(f"{n_cajas:2d} cajas, 5 personas delante: media {fila['Espera_Media_Min']:.1f} min "
+              f"(p10 {fila['P10_Min']:.1f} - p90 {fila['P90_Min']:.1f})")
+
+    # 4. Escala: 50 cajas y un millón de clientes con jockeying
+    t0 = time.perf_counter()
+    df = simular_filas_separadas(50, 950, 20, 1_000_000, regla="jockeying", semilla=11)
+    segundos = time.perf_counter() - t0
+    print(f"50 cajas / 1M clientes (jockeying): {segundos:.1f} s ({len(df) / segundos:,.0f} clientes/s) | "
+          f"espera media {df['Espera_Min'].mean():.2f} min")
@@ -0,0 +1,126 @@
+import numpy as np
+import plotly.graph_objects as go
+
+# ==========================================
+# CAPA DE GRÁFICOS PARA CORRIDAS GRANDES
+# ==========================================
+# Nada de mandarle un punto por cliente al navegador:
+#   - Series de tiempo -> LTTB (Largest Triangle Three Buckets) + trazas WebGL (Scattergl)
+#   - Nubes de puntos  -> histograma 2D calculado con NumPy (Heatmap)
+#   - Tendencias       -> recta ajustada sobre medias por bin (sin statsmodels)
+
+MAX_PUNTOS_SERIE = 2000
+MAX_PUNTOS_NUBE = 20_000
+
+
+def _a_float(x):
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype("datetime64[ns]").astype(np.int64).astype(np.float64)
+    return x.astype(np.float64)
+
+
+def lttb(x, y, n_puntos=MAX_PUNTOS_SERIE):
+    """
+    Índices de los n_puntos que mejor conservan la forma visual de la serie.
+    Un bucket por punto de salida; en cada uno se elige el punto que forma el
+    triángulo de mayor área con el punto anterior elegido y el promedio del bucket siguiente.
+    """
+    n = len(x)
+    if n_puntos >= n or n_puntos < 3:
+        return np.arange(n)
+    xf = _a_float(x)
+    yf = np.asarray(y, dtype=np.float64)
+    bordes = np.linspace(1, n - 1, n_puntos - 1).astype(np.int64)
+    idx = np.empty(n_puntos, dtype=np.int64)
+    idx[0], idx[-1] = 0, n - 1
+    a = 0
+    for i in range(n_puntos - 2):
+        ini, fin = bordes[i], bordes[i + 1]
+        sig_fin = bordes[i + 2] if i + 2 < len(bordes) else n
+        mx = xf[fin:sig_fin].mean()
+        my = np.nanmean(yf[fin:sig_fin]) if sig_fin > fin else yf[-1]
+        area = np.abs((xf[a] - mx) * (yf[ini:fin] - yf[a]) - (xf[a] - xf[ini:fin]) * (my - yf[a]))
+        a = ini + int(np.argmax(np.nan_to_num(area, nan=-1.0)))
+        idx[i + 1] = a
+    return idx
+
+
+def serie(x, y, max_puntos=MAX_PUNTOS_SERIE, **kwargs):
+    """Traza WebGL de una serie de tiempo, reducida con LTTB si hace falta"""
+    x = np.asarray(x)
+    y = np.asarray(y)
+    idx = lttb(x, y, max_puntos)
+    return go.Scattergl(x=x[idx], y=y[idx], **kwargs)
+
+
+def histograma_2d(x, y, bins=(120, 60)):
+    """Conteos (nx, ny) + centros de bins. Las celdas vacías quedan en NaN (transparentes)"""
+    conteos, bx, by = np.histogram2d(_a_float(x), np.asarray(y, dtype=np.float64), bins=bins)
+    conteos[conteos == 0] = np.nan
+    return conteos, (bx[:-1] + bx[1:]) / 2, (by[:-1] + by[1:]) / 2
+
+
+def mapa_calor(x, y, bins=(120, 60), **kwargs):
+    """Reemplazo de un scatter de millones de puntos: densidad en una grilla"""
+    conteos, cx, cy = histograma_2d(x, y, bins)
+    kwargs.setdefault("colorscale", "Viridis")
+    kwargs.setdefault("colorbar", dict(title="Clientes"))
+    return go.Heatmap(z=conteos.T, x=cx, y=cy, **kwargs)
+
+
+def nube(x, y, max_puntos=MAX_PUNTOS_NUBE, semilla=0, color=None, **kwargs):
+    """Scatter WebGL con submuestreo uniforme (para nubes que se superponen a otras trazas)"""
+    x = np.asarray(x)
+    y = np.asarray(y)
+    if len(x) > max_puntos:
+        idx = np.sort(np.random.default_rng(semilla).choice(len(x), max_puntos, replace=False))
+        x, y = x[idx], y[idx]
+        if color is not None: color = np.asarray(color)[idx]
+    if color is not None:
+        kwargs["marker"] = dict(kwargs.get("marker", {}), color=color)
+    return go.Scattergl(x=x, y=y, mode="markers", **kwargs)
+
+
+def medias_por_bin(x, y, bins=50):
+    """
+    Medias de y por bin de x (np.bincount, una pasada).
+    Si x tiene pocos valores distintos (ej: posición en la fila), cada valor es su propio bin.
+    Devuelve (x_medio, y_medio, conteo) de los bins no vacíos.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    valores = np.unique(x)
+    if len(valores) <= bins:
+        grupo = np.searchsorted(valores, x)
+        n_grupos = len(valores)
+    else:
+        bordes = np.linspace(x.min(), x.max(), bins + 1)
+        grupo = np.clip(np.searchsorted(bordes, x, side="right") - 1, 0, bins - 1)
+        n_grupos = bins
+    conteo = np.bincount(grupo, minlength=n_grupos)
+    suma_x = np.bincount(grupo, weights=x, minlength=n_grupos)
+    suma_y = np.bincount(grupo, weights=y, minlength=n_grupos)
+    ok = conteo > 0
+    return suma_x[ok] / conteo[ok], suma_y[ok] / conteo[ok], conteo[ok]
+
+
+def tendencia_lineal(x, y, bins=50):
+    """
+    Recta de tendencia por mínimos cuadrados ponderados sobre las medias por bin.
+    Con x discreta (un bin por valor) da exactamente la misma recta que OLS sobre todos los puntos.
+    Devuelve (pendiente, intercepto).
+    """
+    xm, ym, w = medias_por_bin(x, y, bins)
+    if len(xm) < 2:
+        return 0.0, float(ym[0]) if len(ym) else 0.0
+    x_bar = np.average(xm, weights=w)
+    y_bar = np.average(ym, weights=w)
+    pendiente = np.sum(w * (xm - x_bar) * (ym - y_bar)) / np.sum(w * (xm - x_bar) ** 2)
+    return float(pendiente), float(y_bar - pendiente * x_bar)
+
+
+def linea_tendencia(x, y, bins=50, **kwargs):
+    pendiente, intercepto = tendencia_lineal(x, y, bins)
+    extremos = np.array([np.min(x), np.max(x)], dtype=np.float64)
+    return go.Scattergl(x=extremos, y=intercepto + pendiente * extremos, mode="lines", **kwargs)
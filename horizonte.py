@@ -0,0 +1,197 @@
+import csv
+import os
+
+import numpy as np
+import pandas as pd
+
+from motor_master import INDICADORES, SimulacionMaster
+from perfil_demanda import DIAS_SEMANA, FACTORES_DIA_BANCO, FACTORES_SABADO_BANCO, PerfilDemanda
+
+# ==========================================
+# HORIZONTE LARGO (SEMANAS / MESES)
+# ==========================================
+# Para planificar capacidad no alcanza un día de 8 h. Acá se encadenan días:
+#   - Calendario semanal: un perfil de demanda por día de la semana (None = cerrado)
+#   - Cierre nocturno: cada día termina cuando se atiende al último de la fila;
+#     el motor se reinicia con nuevo_dia() (reloj, flota, historiales) y los flujos
+#     aleatorios siguen su secuencia (días independientes, reproducibles con la semilla)
+#   - Salida en streaming: una fila de agregados por día (CSV, se escribe al cerrar el día)
+#     y, opcional, los registros por cliente (Parquet, un row group por día)
+# Sin registros por cliente el motor corre en modo solo agregados (nada por cliente
+# ni por evento); con ellos, en memoria nunca hay más de UN día de historial.
+# En ambos casos el consumo no crece con el horizonte.
+
+COLUMNAS_DIA = ["Fecha", "Dia_Semana", "Abierto"] + INDICADORES
+
+
+class CalendarioSemanal:
+    def __init__(self, perfiles):
+        """perfiles: 7 PerfilDemanda de un día (0 = lunes); None = el banco no abre"""
+        if len(perfiles) != 7:
+            raise ValueError(f"Un calendario semanal necesita 7 perfiles (llegaron {len(perfiles)})")
+        for dia, perfil in zip(DIAS_SEMANA, perfiles):
+            if perfil is not None and perfil.ciclico:
+                raise ValueError(f"El perfil del {dia} debe ser de un día, no cíclico")
+        self.perfiles = list(perfiles)
+
+    @classmethod
+    def banco(cls, tasa_base, abre_sabado=True):
+        """Lunes a viernes el patrón histórico de 8 h; sábado media jornada; domingo cerrado"""
+        semana = PerfilDemanda.desde_factores(FACTORES_DIA_BANCO, tasa_base)
+        sabado = PerfilDemanda.desde_factores(FACTORES_SABADO_BANCO, tasa_base) if abre_sabado else None
+        return cls([semana] * 5 + [sabado, None])
+
+    @classmethod
+    def desde_perfil_semanal(cls, perfil, apertura_h=8.0, horas=None, cerrados=(6,)):
+        """
+        Recorta un perfil semanal ajustado (ajustar_perfil) en jornadas.
+        horas: duración por día (número o lista de 7); por defecto 8 h de lunes a viernes y 4 h el sábado.
+        """
+        if horas is None: horas = [8.0] * 5 + [4.0, 8.0]
+        elif np.isscalar(horas): horas = [horas] * 7
+        return cls([None if dia in cerrados else perfil.perfil_dia(dia, apertura_h, apertura_h + horas[dia])
+                    for dia in range(7)])
+
+    def perfil(self, dia_semana):
+        return self.perfiles[dia_semana]
+
+
+class _EscritorClientes:
+    """Registros por cliente a Parquet: un row group por día, esquema fijo"""
+
+    def __init__(self, ruta, clases):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        self._pa = pa
+        self.clases = [c.nombre for c in clases]
+        self.esquema = pa.schema([
+            ("Fecha", pa.date32()), ("ID", pa.int64()), ("Llegada", pa.float64()),
+            ("Inicio", pa.float64()), ("Salida", pa.float64()), ("Espera_Real_Min", pa.float64()),
+            ("Cola_Al_Llegar", pa.int32()), ("Clase", pa.dictionary(pa.int8(), pa.string())),
+        ])
+        self._escritor = pq.ParquetWriter(ruta, self.esquema, compression="zstd")
+
+    def escribir(self, fecha, clientes):
+        pa = self._pa
+        n = len(clientes)
+        llegada = np.fromiter((c.hora_llegada for c in clientes), dtype=np.float64, count=n)
+        inicio = np.fromiter((c.hora_inicio_atencion for c in clientes), dtype=np.float64, count=n)
+        columnas = [
+            pa.array(np.full(n, np.datetime64(fecha.date(), "D"))).cast(pa.date32()),
+            pa.array(np.fromiter((c.id for c in clientes), dtype=np.int64, count=n)),
+            pa.array(llegada),
+            pa.array(inicio),
+            pa.array(np.fromiter((c.hora_salida for c in clientes), dtype=np.float64, count=n)),
+            pa.array((inicio - llegada) * 60),
+            pa.array(np.fromiter((c.cola_al_llegar for c in clientes), dtype=np.int32, count=n)),
+            pa.DictionaryArray.from_arrays(
+                pa.array(np.fromiter((c.clase for c in clientes), dtype=np.int8, count=n)), self.clases),
+        ]
+        self._escritor.write_table(pa.Table.from_arrays(columnas, schema=self.esquema))
+
+    def cerrar(self):
+        self._escritor.close()
+
+
+class SimulacionHorizonte:
+    def __init__(self, calendario, dias, fecha_inicio="2024-01-01", directorio=None,
+                 guardar_clientes=False, **parametros):
+        """
+        calendario: CalendarioSemanal. dias: cantidad de días corridos (incluye los cerrados).
+        directorio: donde van 'dias.csv' y, con guardar_clientes, 'clientes.parquet'.
+        parametros: los de SimulacionMaster (salvo tasa_base / perfil / traza, que pone el calendario,
+        y solo_agregados, que se deduce de guardar_clientes).
+        """
+        for clave in ("tasa_base", "perfil", "traza", "solo_agregados"):
+            if clave in parametros:
+                raise ValueError(f"'{clave}' lo define SimulacionHorizonte (calendario / guardar_clientes)")
+        if guardar_clientes and directorio is None:
+            raise ValueError("guardar_clientes necesita un directorio de salida")
+        self.calendario = calendario
+        self.fechas = pd.date_range(fecha_inicio, periods=dias, freq="D")
+        self.directorio = directorio
+        self.guardar_clientes = guardar_clientes
+        self.parametros = parametros
+        self.ruta_dias = os.path.join(directorio, "dias.csv") if directorio else None
+        self.ruta_clientes = os.path.join(directorio, "clientes.parquet") if guardar_clientes else None
+        self.sim = None
+
+    def correr(self, progreso=None):
+        """
+        Simula todos los días y devuelve un DataFrame con una fila por día (COLUMNAS_DIA).
+        Con directorio, las filas se escriben a medida que cierra cada día y al final se leen del CSV.
+        """
+        filas = [] if self.directorio is None else None
+        archivo = escritor_clientes = None
+        if self.directorio is not None:
+            os.makedirs(self.directorio, exist_ok=True)
+            archivo = open(self.ruta_dias, "w", newline="", encoding="utf-8")
+            escritor_dias = csv.DictWriter(archivo, COLUMNAS_DIA)
+            escritor_dias.writeheader()
+        try:
+            total = len(self.fechas)
+            for d, fecha in enumerate(self.fechas):
+                dia_semana = fecha.dayofweek
+                perfil = self.calendario.perfil(dia_semana)
+                fila = {"Fecha": fecha.date().isoformat(), "Dia_Semana": DIAS_SEMANA[dia_semana],
+                        "Abierto": perfil is not None}
+                if perfil is None:
+                    fila.update(dict.fromkeys(COLUMNAS_DIA[3:], 0))
+                else:
+                    sim = self._motor_del_dia(perfil)
+                    avance = None
+                    if progreso is not None:
+                        avance = lambda f, d=d: progreso((d + f) / total)
+                    sim.avanzar(progreso=avance)
+                    fila.update(sim.indicadores())
+                    if self.guardar_clientes:
+                        if escritor_clientes is None:
+                            escritor_clientes = _EscritorClientes(self.ruta_clientes, sim.clases)
+                        escritor_clientes.escribir(fecha, sim.historial_clientes)
+                if filas is None:
+                    escritor_dias.writerow(fila)
+                    archivo.flush() # El día queda en disco aunque la corrida se corte después
+                else:
+                    filas.append(fila)
+                if progreso is not None: progreso((d + 1) / total)
+        finally:
+            if archivo is not None: archivo.close()
+            if escritor_clientes is not None: escritor_clientes.cerrar()
+
+        if filas is None:
+            return pd.read_csv(self.ruta_dias, parse_dates=["Fecha"])
+        df = pd.DataFrame(filas, columns=COLUMNAS_DIA)
+        df["Fecha"] = pd.to_datetime(df["Fecha"])
+        return df
+
+    def _motor_del_dia(self, perfil):
+        # Un solo motor para todo el horizonte: se construye una vez y se reinicia cada noche
+        if self.sim is None:
+            self.sim = SimulacionMaster(tasa_base=None, perfil=perfil, solo_agregados=not self.guardar_clientes,
+                                        **self.parametros)
+        else:
+            self.sim.nuevo_dia(perfil)
+        return self.sim
+
+
+# --- ZONA DE PRUEBAS ---
+
+if __name__ == "__main__":
+    import tempfile
+    import time
+    import tracemalloc
+
+    parametros = dict(tasa_servicio=20, min_serv=1, max_serv=15, umbral_up=15, umbral_down=3, semilla=42)
+    calendario = CalendarioSemanal.banco(150)
+    with tempfile.TemporaryDirectory() as directorio:
+        for dias, guardar in [(14, True), (56, True), (56, False)]:
+            tracemalloc.start()
+            t0 = time.perf_counter()
+            df = SimulacionHorizonte(calendario, dias, directorio=directorio, guardar_clientes=guardar,
+                                     **parametros).correr()
+            segundos = time.perf_counter() - t0
+            _, pico = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"{dias} días ({'con' if guardar else 'sin'} clientes): {segundos:.1f} s | "
+                  f"pico de memoria {pico / 2**20:.1f} MB | {int(df['Atendidos'].sum())} clientes")
+        print(df.groupby("Dia_Semana", sort=False)[["Llegadas", "Espera_Media_Min", "SLA_Pct", "Horas_Cajero"]].mean().round(1))
@@ -0,0 +1,112 @@
+import bisect
+import random
+import time
+
+from motor_master import SimulacionMaster
+from servicio_simulaciones import clave_trabajo
+
+# ==========================================
+# RE-SIMULACIÓN INCREMENTAL
+# ==========================================
+# Mover solo un umbral del auto-scaling no cambia las llegadas ni la trayectoria
+# hasta la primera decisión que la política nueva tomaría distinto. Entonces:
+#   1. La corrida base registra sus puntos de decisión (5 floats por evaluación)
+#      y deja un checkpoint cada `intervalo_checkpoint` horas (sin alterar la trayectoria).
+#   2. Ante un cambio de umbral_up / umbral_down se calcula (vectorizado) la hora de la
+#      primera decisión distinta y se re-simula desde el último checkpoint ANTERIOR a ella,
+#      con los mismos flujos aleatorios (números aleatorios comunes).
+#   3. Si ninguna decisión cambia, el resultado es idéntico y se devuelve sin simular.
+# Cualquier otro cambio de parámetros vuelve a simular desde cero.
+#
+# El resultado es bit a bit el mismo que una corrida completa con los parámetros nuevos.
+
+PARAMETROS_INCREMENTALES = ("umbral_up", "umbral_down")
+
+
+class SimulacionIncremental:
+    def __init__(self, intervalo_checkpoint=0.25):
+        self.intervalo_checkpoint = intervalo_checkpoint
+        self._parametros = None
+        self._clave_fija = None
+        self._checkpoints = []  # [(hora, Checkpoint)] en orden
+        self._resultado = None
+        self._sim = None
+        # Diagnóstico de la última llamada
+        self.reanudado_desde = None # Hora del checkpoint usado (0.0 = desde cero)
+        self.reutilizado = False    # True = no hubo que simular nada
+        self.segundos = 0.0
+
+    def correr(self, progreso=None, **parametros):
+        """
+        Mismos parámetros que SimulacionMaster. Devuelve (df_clientes, df_sistema, df_servidores, resumen).
+        Sin 'semilla' se fija una al azar en la primera corrida (la incrementalidad necesita CRN).
+        """
+        t0 = time.perf_counter()
+        if parametros.get("semilla") is None:
+            semilla = self._parametros["semilla"] if self._parametros else random.randrange(2**32)
+            parametros["semilla"] = semilla
+        fijos = {k: v for k, v in parametros.items() if k not in PARAMETROS_INCREMENTALES}
+        clave = clave_trabajo("incremental", fijos)
+
+        self.reutilizado = False
+        if self._sim is None or clave != self._clave_fija:
+            self._desde_cero(parametros, clave, progreso)
+        else:
+            # Siempre los dos umbrales: se comparan contra los que usó self._sim, que pueden
+            # no ser los de la llamada anterior si esa reutilizó el resultado sin simular
+            cambios = {k: parametros.get(k) for k in PARAMETROS_INCREMENTALES}
+            hora = self._sim.primera_divergencia(**cambios)
+            if hora is None:
+                self.reutilizado = True
+            else:
+                self._reanudar(hora, cambios, progreso)
+            self._parametros = parametros
+        self.segundos = time.perf_counter() - t0
+        return self._resultado
+
+    def _desde_cero(self, parametros, clave, progreso):
+        sim = SimulacionMaster(**parametros)
+        sim.registrar_decisiones()
+        self._checkpoints = []
+        self.reanudado_desde = 0.0
+        self._terminar(sim, progreso)
+        self._parametros = parametros
+        self._clave_fija = clave
+
+    def _reanudar(self, hora_divergencia, cambios, progreso):
+        # Último checkpoint estrictamente antes de la decisión que cambia
+        horas = [h for h, _ in self._checkpoints]
+        i = bisect.bisect_left(horas, hora_divergencia) - 1
+        if i < 0:
+            self._desde_cero({**self._parametros, **cambios}, self._clave_fija, progreso)
+            return
+        hora, checkpoint = self._checkpoints[i]
+        del self._checkpoints[i + 1:] # Los posteriores son de la trayectoria vieja
+        sim = SimulacionMaster.desde_checkpoint(checkpoint, **cambios)
+        self.reanudado_desde = hora
+        self._terminar(sim, progreso)
+
+    def _terminar(self, sim, progreso):
+        """Avanza por tramos dejando checkpoints y arma los reportes"""
+        hora = self._checkpoints[-1][0] if self._checkpoints else 0.0
+        while True:
+            hora += self.intervalo_checkpoint
+            if sim.avanzar(hasta=hora, progreso=progreso, exacto=False): break
+            self._checkpoints.append((hora, sim.checkpoint()))
+        df_clientes, df_sistema, df_servidores = sim.correr() # Solo arma los reportes
+        self._sim = sim
+        self._resultado = (df_clientes, df_sistema, df_servidores, sim.resumen())
+
+
+# --- ZONA DE PRUEBAS ---
+
+if __name__ == "__main__":
+    base = dict(tasa_base=400, tasa_servicio=20, min_serv=1, max_serv=40, umbral_up=15, umbral_down=3, semilla=11)
+    inc = SimulacionIncremental()
+    inc.correr(**base)
+    print(f"Base: {inc.segundos * 1000:.0f} ms, {len(inc._checkpoints)} checkpoints")
+    for down in [3, 4, 2, 6]:
+        df_clientes, _, _, _ = inc.correr(**{**base, "umbral_down": down})
+        completo = SimulacionMaster(**{**base, "umbral_down": down}).correr()[0]
+        print(f"umbral_down={down}: {inc.segundos * 1000:6.1f} ms | desde hora {inc.reanudado_desde} "
+              f"| reutilizado={inc.reutilizado} | idéntico a corrida completa: {df_clientes.equals(completo)}")
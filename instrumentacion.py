@@ -0,0 +1,164 @@
+import cProfile
+import io
+import pstats
+import time
+import tracemalloc
+from collections import defaultdict
+
+import pandas as pd
+
+# ==========================================
+# INSTRUMENTACIÓN DEL LOOP DE EVENTOS
+# ==========================================
+# Se decide al construir el motor. Apagada, no hay NADA en el loop: los métodos
+# del motor son los de la clase. Prendida, se reemplazan en la INSTANCIA por
+# versiones envueltas que cuentan y cronometran (el loop no cambia).
+#
+#   eventos:   manejador por tipo de evento (LLEGADA, SALIDA, ...) -> cantidad y tiempo
+#   secciones: partes del motor (FEL, snapshot, auto-scaling, pandas...) -> llamadas y tiempo
+#              Los tiempos son inclusivos: una sección llamada desde un manejador
+#              también suma en el tiempo de ese manejador.
+#   marcas:    máximos (high-water marks) de FEL y cola, medidos después de cada evento
+#
+# captura="cprofile" o "tracemalloc" agrega un perfil completo de la corrida
+# (mucho más caro: solo para diagnóstico puntual). Cada iniciar()/detener() SUMA al
+# perfil anterior: las pausas de avanzar() y el armado de reportes de correr() quedan
+# en el mismo perfil que el loop de eventos (la memoria pico es el máximo de todos).
+
+CAPTURAS = (None, "cprofile", "tracemalloc")
+
+
+class EstadisticasMotor:
+    """Resultado estructurado de una corrida instrumentada"""
+
+    def __init__(self):
+        self.eventos = defaultdict(int)         # tipo -> cantidad
+        self.tiempo_eventos = defaultdict(float) # tipo -> segundos (inclusivo)
+        self.llamadas = defaultdict(int)        # sección -> llamadas
+        self.tiempo_secciones = defaultdict(float)
+        self.max_fel = 0          # Eventos vivos agendados
+        self.max_fel_fisico = 0   # Entradas del heap (incluye lápidas de cancelaciones)
+        self.max_cola = 0
+        self.segundos_totales = 0.0
+        self.perfil = None        # pstats.Stats (captura="cprofile")
+        self.memoria_pico = None  # bytes (captura="tracemalloc")
+        self.memoria_top = None   # [(archivo:línea, bytes)] de las líneas que más asignan
+
+    @property
+    def eventos_totales(self):
+        return sum(self.eventos.values())
+
+    @property
+    def eventos_por_seg(self):
+        return self.eventos_totales / self.segundos_totales if self.segundos_totales > 0 else 0.0
+
+    def resumen(self):
+        """DataFrame con una fila por manejador de evento y por sección"""
+        filas = []
+        for tipo, n in self.eventos.items():
+            t = self.tiempo_eventos[tipo]
+            filas.append({"Tipo": "evento", "Nombre": tipo, "Llamadas": n, "Segundos": t})
+        for nombre, n in self.llamadas.items():
+            t = self.tiempo_secciones[nombre]
+            filas.append({"Tipo": "seccion", "Nombre": nombre, "Llamadas": n, "Segundos": t})
+        df = pd.DataFrame(filas, columns=["Tipo", "Nombre", "Llamadas", "Segundos"])
+        df["Pct_Total"] = df["Segundos"] / self.segundos_totales * 100 if self.segundos_totales else 0.0
+        df["Microseg_Por_Llamada"] = df["Segundos"] / df["Llamadas"].clip(lower=1) * 1e6
+        return df
+
+    def a_dict(self):
+        """Versión serializable (JSON) sin el perfil completo"""
+        return {
+            "eventos": dict(self.eventos),
+            "tiempo_eventos": dict(self.tiempo_eventos),
+            "llamadas": dict(self.llamadas),
+            "tiempo_secciones": dict(self.tiempo_secciones),
+            "max_fel": self.max_fel,
+            "max_fel_fisico": self.max_fel_fisico,
+            "max_cola": self.max_cola,
+            "segundos_totales": self.segundos_totales,
+            "eventos_por_seg": self.eventos_por_seg,
+            "memoria_pico": self.memoria_pico,
+            "memoria_top": self.memoria_top,
+        }
+
+    def texto_perfil(self, n=25, orden="cumulative"):
+        if self.perfil is None: return ""
+        salida = io.StringIO()
+        self.perfil.stream = salida
+        self.perfil.sort_stats(orden).print_stats(n)
+        return salida.getvalue()
+
+    def __repr__(self):
+        return (f"EstadisticasMotor({self.eventos_totales} eventos, {self.eventos_por_seg:,.0f} ev/s, "
+                f"max_fel={self.max_fel}, max_cola={self.max_cola})")
+
+
+class Instrumentador:
+    def __init__(self, captura=None):
+        if captura not in CAPTURAS:
+            raise ValueError(f"Captura desconocida: {captura!r} (opciones: cprofile, tracemalloc)")
+        self.captura = captura
+        self.stats = EstadisticasMotor()
+        self._perfilador = None
+        self._t0 = None
+
+    # --- Envolturas (se instalan como atributos de la instancia) ---
+
+    def envolver_evento(self, objeto, metodo, tipo, largo_fel, largo_heap, largo_cola):
+        """Reemplaza objeto.metodo(data) por una versión que cuenta, cronometra y mide máximos"""
+        funcion = getattr(objeto, metodo)
+        stats = self.stats
+        reloj = time.perf_counter
+
+        def envuelta(data):
+            t0 = reloj()
+            funcion(data)
+            stats.tiempo_eventos[tipo] += reloj() - t0
+            stats.eventos[tipo] += 1
+            n = largo_fel()
+            if n > stats.max_fel: stats.max_fel = n
+            n = largo_heap()
+            if n > stats.max_fel_fisico: stats.max_fel_fisico = n
+            n = largo_cola()
+            if n > stats.max_cola: stats.max_cola = n
+        setattr(objeto, metodo, envuelta)
+
+    def envolver_seccion(self, objeto, metodo, seccion):
+        """Reemplaza objeto.metodo por una versión cronometrada (cualquier firma)"""
+        funcion = getattr(objeto, metodo)
+        stats = self.stats
+        reloj = time.perf_counter
+
+        def envuelta(*args, **kwargs):
+            t0 = reloj()
+            try:
+                return funcion(*args, **kwargs)
+            finally:
+                stats.tiempo_secciones[seccion] += reloj() - t0
+                stats.llamadas[seccion] += 1
+        setattr(objeto, metodo, envuelta)
+
+    # --- Ciclo de la corrida ---
+
+    def iniciar(self):
+        if self.captura == "cprofile":
+            if self._perfilador is None: self._perfilador = cProfile.Profile()
+            self._perfilador.enable()
+        elif self.captura == "tracemalloc":
+            tracemalloc.start()
+        self._t0 = time.perf_counter()
+
+    def detener(self):
+        self.stats.segundos_totales += time.perf_counter() - self._t0
+        if self.captura == "cprofile":
+            self._perfilador.disable()
+            self.stats.perfil = pstats.Stats(self._perfilador)
+        elif self.captura == "tracemalloc":
+            foto = tracemalloc.take_snapshot()
+            _, pico = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            if self.stats.memoria_pico is None or pico > self.stats.memoria_pico:
+                self.stats.memoria_pico = pico
+                self.stats.memoria_top = [(str(s.traceback), s.size) for s in foto.statistics("lineno")[:10]]
+        return self.stats
@@ -1,12 +1,292 @@
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
+#include <pybind11/numpy.h>
 #include <vector>
 #include <random>
 #include <numeric>
 #include <algorithm>
+#include <string>
+#include <stdexcept>
+#include <cmath>
+#include <cstdint>
+#include <queue>
+#include <functional>
+#include <thread>
+#include <atomic>
+#include <memory>
+#include <type_traits>
+#include <limits>
+#include <deque>
+#include <cstring>
+#ifdef _WIN32
+#include <windows.h>
+#else
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <unistd.h>
+#endif
 
 namespace py = pybind11;
 
+// 0b. Generadores de números aleatorios
+// "mt19937": el histórico (std::mt19937 + distribuciones de la biblioteca estándar).
+// "xoshiro256++": 4 palabras de estado, ~1 ns por número, con salto de 2^128 pasos (saltar()):
+// cada flujo independiente es el anterior saltado, sin solapamiento posible. Las exponenciales
+// salen por ziggurat (Marsaglia-Tsang, 256 capas): ~99% de las veces un producto y una comparación.
+static inline uint64_t splitmix64(uint64_t& x) {
+    uint64_t z = (x += 0x9e3779b97f4a7c15ULL);
+    z = (z ^ (z >> 30)) * 0xbf58476d1ce4e5b9ULL;
+    z = (z ^ (z >> 27)) * 0x94d049bb133111ebULL;
+    return z ^ (z >> 31);
+}
+
+class Xoshiro256pp {
+public:
+    using result_type = uint64_t;
+    static constexpr result_type min() { return 0; }
+    static constexpr result_type max() { return std::numeric_limits<uint64_t>::max(); }
+
+    explicit Xoshiro256pp(uint64_t semilla = 0) { seed(semilla); }
+
+    // splitmix64 expande la semilla: nunca deja el estado en cero
+    void seed(uint64_t semilla) { for (uint64_t& x : s) x = splitmix64(semilla); }
+
+    result_type operator()() {
+        const uint64_t resultado = rotl(s[0] + s[3], 23) + s[0];
+        const uint64_t t = s[1] << 17;
+        s[2] ^= s[0]; s[3] ^= s[1]; s[1] ^= s[2]; s[0] ^= s[3];
+        s[2] ^= t;
+        s[3] = rotl(s[3], 45);
+        return resultado;
+    }
+
+    // Avanza 2^128 números (polinomio de salto de los autores del generador)
+    void saltar() {
+        static const uint64_t SALTO[] = {0x180ec6d33cfd0abaULL, 0xd5a61266f0c9392cULL,
+                                         0xa9582618e03fc9aaULL, 0x39abdc4529b1661cULL};
+        uint64_t t[4] = {0, 0, 0, 0};
+        for (uint64_t palabra : SALTO)
+            for (int b = 0; b < 64; ++b) {
+                if (palabra & (1ULL << b)) for (int i = 0; i < 4; ++i) t[i] ^= s[i];
+                (*this)();
+            }
+        std::copy(t, t + 4, s);
+    }
+
+private:
+    static inline uint64_t rotl(uint64_t x, int k) { return (x << k) | (x >> (64 - k)); }
+    uint64_t s[4];
+};
+
+// Uniforme en (0, 1] con 53 bits (nunca 0: se le puede tomar el logaritmo)
+template <class G>
+static inline double uniforme_abierta(G& g) { return ((g() >> 11) + 1) * 0x1.0p-53; }
+
+// Tablas del ziggurat exponencial con 256 capas (Marsaglia y Tsang 2000), versión de 53 bits
+struct ZigguratExponencial {
+    static constexpr double R = 7.697117470131487;       // Borde de la última capa
+    static constexpr double AREA = 3.949659822581572e-3;  // Área de cada capa
+    uint64_t k[256];
+    double w[256], f[256];
+
+    ZigguratExponencial() {
+        const double m = 0x1.0p53;
+        double de = R, te = R;
+        const double q = AREA / std::exp(-de);
+        k[0] = static_cast<uint64_t>((de / q) * m);
+        k[1] = 0;
+        w[0] = q / m;
+        w[255] = de / m;
+        f[0] = 1.0;
+        f[255] = std::exp(-de);
+        for (int i = 254; i >= 1; --i) {
+            de = -std::log(AREA / de + std::exp(-de));
+            k[i + 1] = static_cast<uint64_t>((de / te) * m);
+            te = de;
+            f[i] = std::exp(-de);
+            w[i] = de / m;
+        }
+    }
+
+    // Exponencial de media 1: capa = 8 bits bajos, posición = 53 bits altos del mismo número
+    template <class G>
+    double operator()(G& g) const {
+        for (;;) {
+            const uint64_t u = g();
+            const unsigned i = u & 255;
+            const uint64_t j = u >> 11;
+            if (j < k[i]) return j * w[i];                        // Dentro del rectángulo: aceptado
+            if (i == 0) return R - std::log(uniforme_abierta(g)); // Cola: R + Exp(1) (sin memoria)
+            const double x = j * w[i];
+            if (f[i] + uniforme_abierta(g) * (f[i - 1] - f[i]) < std::exp(-x)) return x; // Cuña
+        }
+    }
+};
+static const ZigguratExponencial ZIGGURAT_EXP;
+
+enum class TipoGenerador { MT19937, XOSHIRO256PP };
+static const std::vector<std::string> GENERADORES = {"mt19937", "xoshiro256++"};
+
+static TipoGenerador generador_desde_nombre(const std::string& nombre) {
+    if (nombre == "mt19937") return TipoGenerador::MT19937;
+    if (nombre == "xoshiro256++") return TipoGenerador::XOSHIRO256PP;
+    throw std::invalid_argument("Generador desconocido: " + nombre + " (opciones: mt19937, xoshiro256++)");
+}
+
+// Semilla negativa = no reproducible (random_device)
+static uint64_t semilla_o_azar(int64_t semilla) {
+    if (semilla >= 0) return static_cast<uint64_t>(semilla);
+    std::random_device rd;
+    return static_cast<uint64_t>(rd()) << 32 | rd();
+}
+
+static std::mt19937 crear_mt19937(uint64_t semilla, uint64_t flujo = 0) {
+    std::seed_seq semillas{static_cast<uint32_t>(semilla), static_cast<uint32_t>(semilla >> 32),
+                           static_cast<uint32_t>(flujo), static_cast<uint32_t>(flujo >> 32)};
+    return std::mt19937(semillas);
+}
+
+// 0. Distribuciones generales (mismo formato de spec que distribuciones.py)
+// {"tipo": "exponencial" | "erlang" | "gamma" | "lognormal" | "determinista" | "empirica" | "uniforme", ...}
+class Distribucion {
+public:
+    // Exponencial con la media dada (comportamiento histórico del simulador)
+    static Distribucion exponencial(double media) {
+        Distribucion d;
+        d.tipo = EXPONENCIAL;
+        d.exponencial_ = std::exponential_distribution<double>(1.0 / media);
+        d.valor_ = media;
+        return d;
+    }
+
+    // media_forzada > 0: reescala la spec a esa media (llegadas, que dependen de lambda)
+    // media_por_defecto: solo si la spec no trae su propia escala (servicio, 1/mu)
+    static Distribucion desde_spec(const py::dict& spec, double media_forzada, double media_por_defecto) {
+        std::string tipo = spec["tipo"].cast<std::string>();
+        double media = spec.contains("media") ? spec["media"].cast<double>() : media_por_defecto;
+        if (media_forzada > 0) media = media_forzada;
+
+        Distribucion d;
+        if (tipo == "exponencial") {
+            d = exponencial(media);
+        } else if (tipo == "erlang" || tipo == "gamma") {
+            double forma = tipo == "erlang" ? spec["k"].cast<int>() : spec["forma"].cast<double>();
+            d.tipo = GAMMA;
+            d.gamma_ = std::gamma_distribution<double>(forma, media / forma);
+        } else if (tipo == "lognormal") {
+            double cv = spec["cv"].cast<double>();
+            double sigma2 = std::log1p(cv * cv);
+            d.tipo = LOGNORMAL;
+            d.lognormal_ = std::lognormal_distribution<double>(std::log(media) - sigma2 / 2, std::sqrt(sigma2));
+        } else if (tipo == "determinista") {
+            d.tipo = DETERMINISTA;
+            d.valor_ = (media_forzada <= 0 && spec.contains("valor")) ? spec["valor"].cast<double>() : media;
+        } else if (tipo == "uniforme") {
+            double a = spec.contains("minimo") ? spec["minimo"].cast<double>() : 0.0;
+            double b = spec.contains("maximo") ? spec["maximo"].cast<double>() : 1.0;
+            if (media_forzada > 0) { double f = media_forzada / ((a + b) / 2); a *= f; b *= f; }
+            d.tipo = UNIFORME;
+            d.uniforme_ = std::uniform_real_distribution<double>(a, b);
+        } else if (tipo == "empirica") {
+            d.uniforme_ = std::uniform_real_distribution<double>(0.0, 1.0);
+            double media_emp;
+            if (spec.contains("valores")) {
+                // ECDF interpolada entre estadísticos de orden
+                d.tipo = EMPIRICA;
+                d.x_ = spec["valores"].cast<std::vector<double>>();
+                std::sort(d.x_.begin(), d.x_.end());
+                if (d.x_.size() == 1) { d.tipo = DETERMINISTA; d.valor_ = d.x_[0]; media_emp = d.x_[0]; }
+                else {
+                    double suma = 0.0;
+                    for (size_t i = 0; i + 1 < d.x_.size(); ++i) suma += d.x_[i] + d.x_[i + 1];
+                    media_emp = suma / (2.0 * (d.x_.size() - 1));
+                }
+            } else {
+                // Histograma: bordes + pesos
+                d.tipo = HISTOGRAMA;
+                d.x_ = spec["bordes"].cast<std::vector<double>>();
+                std::vector<double> pesos = spec["pesos"].cast<std::vector<double>>();
+                d.acum_.resize(pesos.size());
+                std::partial_sum(pesos.begin(), pesos.end(), d.acum_.begin());
+                media_emp = 0.0;
+                for (size_t i = 0; i < pesos.size(); ++i) media_emp += (d.x_[i] + d.x_[i + 1]) / 2 * pesos[i];
+                media_emp /= d.acum_.back();
+            }
+            if (media_forzada > 0) {
+                double f = media_forzada / media_emp;
+                for (double& v : d.x_) v *= f;
+                d.valor_ *= f;
+            }
+        } else {
+            throw std::invalid_argument("Distribución desconocida: " + tipo);
+        }
+        return d;
+    }
+
+    template <class RNG>
+    double operator()(RNG& rng) {
+        switch (tipo) {
+            case EXPONENCIAL:
+                if constexpr (std::is_same_v<RNG, Xoshiro256pp>) return valor_ * ZIGGURAT_EXP(rng);
+                else return exponencial_(rng);
+            case GAMMA: return gamma_(rng);
+            case LOGNORMAL: return lognormal_(rng);
+            case DETERMINISTA: return valor_;
+            case UNIFORME: return uniforme_(rng);
+            case EMPIRICA: {
+                double u = uniforme_(rng) * (x_.size() - 1);
+                size_t i = std::min(static_cast<size_t>(u), x_.size() - 2);
+                return x_[i] + (u - i) * (x_[i + 1] - x_[i]);
+            }
+            case HISTOGRAMA: {
+                double u = uniforme_(rng) * acum_.back();
+                size_t i = std::upper_bound(acum_.begin(), acum_.end(), u) - acum_.begin();
+                i = std::min(i, acum_.size() - 1);
+                return x_[i] + uniforme_(rng) * (x_[i + 1] - x_[i]);
+            }
+        }
+        return 0.0;
+    }
+
+    // Un bloque de m variables (el caso exponencial queda en un loop sin switch)
+    template <class RNG>
+    void llenar(RNG& rng, double* x, int m) {
+        if (tipo == EXPONENCIAL) {
+            if constexpr (std::is_same_v<RNG, Xoshiro256pp>) { for (int j = 0; j < m; ++j) x[j] = valor_ * ZIGGURAT_EXP(rng); }
+            else { for (int j = 0; j < m; ++j) x[j] = exponencial_(rng); }
+        } else {
+            for (int j = 0; j < m; ++j) x[j] = (*this)(rng);
+        }
+    }
+
+private:
+    enum Tipo { EXPONENCIAL, GAMMA, LOGNORMAL, DETERMINISTA, UNIFORME, EMPIRICA, HISTOGRAMA };
+    Tipo tipo = EXPONENCIAL;
+    std::exponential_distribution<double> exponencial_;
+    std::gamma_distribution<double> gamma_;
+    std::lognormal_distribution<double> lognormal_;
+    std::uniform_real_distribution<double> uniforme_;
+    double valor_ = 0.0;        // Constante (determinista) o media (exponencial)
+    std::vector<double> x_;     // Valores ordenados (empírica) o bordes (histograma)
+    std::vector<double> acum_;  // Pesos acumulados (histograma)
+};
+
+// Reparte n_tareas entre `hilos` std::thread (reparto dinámico: cada hilo toma la próxima tarea).
+// El hilo que llama también trabaja. hilos <= 0 = todos los núcleos.
+template <class F>
+static void en_paralelo(int64_t n_tareas, int hilos, F tarea) {
+    if (hilos <= 0) hilos = std::max(1u, std::thread::hardware_concurrency());
+    hilos = static_cast<int>(std::min<int64_t>(hilos, std::max<int64_t>(n_tareas, 1)));
+    std::atomic<int64_t> siguiente{0};
+    auto trabajar = [&]() {
+        for (int64_t i = siguiente++; i < n_tareas; i = siguiente++) tarea(i);
+    };
+    std::vector<std::thread> grupo;
+    for (int h = 1; h < hilos; ++h) grupo.emplace_back(trabajar);
+    trabajar();
+    for (auto& t : grupo) t.join();
+}
+
 // 1. Estructura para devolver los resultados ordenados a Python
 struct SimResult {
     double tiempo_promedio_espera;
@@ -17,55 +297,207 @@ struct SimResult {
     std::vector<double> tiempos_espera_muestra; 
 };
 
+// 1b. Registros por cliente en un archivo mapeado en memoria (formato documentado en registros_mmap.py)
+// Cabecera de 64 bytes + registros de 40 bytes, little-endian. Se lee con registros_mmap.leer_registros.
+#pragma pack(push, 1)
+struct Registro {
+    int64_t id;
+    double llegada, inicio, salida;
+    int32_t servidor, cola_al_llegar;
+};
+#pragma pack(pop)
+static_assert(sizeof(Registro) == 40, "El registro debe medir 40 bytes");
+
+class ArchivoRegistros {
+public:
+    static constexpr size_t TAMANO_CABECERA = 64;
+
+    // Crea (o pisa) el archivo con espacio exacto para n registros y lo mapea
+    ArchivoRegistros(const std::string& ruta, int64_t n) : tamano(TAMANO_CABECERA + sizeof(Registro) * static_cast<size_t>(n)) {
+#ifdef _WIN32
+        archivo = CreateFileA(ruta.c_str(), GENERIC_READ | GENERIC_WRITE, 0, nullptr, CREATE_ALWAYS, FILE_ATTRIBUTE_NORMAL, nullptr);
+        if (archivo == INVALID_HANDLE_VALUE) throw std::runtime_error("No se pudo crear " + ruta);
+        mapeo = CreateFileMappingA(archivo, nullptr, PAGE_READWRITE, static_cast<DWORD>(tamano >> 32),
+                                   static_cast<DWORD>(tamano & 0xFFFFFFFFu), nullptr);
+        if (mapeo == nullptr) { CloseHandle(archivo); throw std::runtime_error("No se pudo mapear " + ruta); }
+        base = static_cast<char*>(MapViewOfFile(mapeo, FILE_MAP_WRITE, 0, 0, tamano));
+        if (base == nullptr) { CloseHandle(mapeo); CloseHandle(archivo); throw std::runtime_error("No se pudo mapear " + ruta); }
+#else
+        fd = ::open(ruta.c_str(), O_RDWR | O_CREAT | O_TRUNC, 0644);
+        if (fd < 0) throw std::runtime_error("No se pudo crear " + ruta);
+        if (::ftruncate(fd, static_cast<off_t>(tamano)) != 0) { ::close(fd); throw std::runtime_error("No hay espacio para " + ruta); }
+        void* p = ::mmap(nullptr, tamano, PROT_READ | PROT_WRITE, MAP_SHARED, fd, 0);
+        if (p == MAP_FAILED) { ::close(fd); throw std::runtime_error("No se pudo mapear " + ruta); }
+        base = static_cast<char*>(p);
+#endif
+        // Cabecera: firma, versión, tamaño de registro, cantidad, reservado
+        std::memset(base, 0, TAMANO_CABECERA);
+        std::memcpy(base, "SIMCOLAS", 8);
+        uint32_t version = 1, tamano_registro = sizeof(Registro);
+        uint64_t cantidad = static_cast<uint64_t>(n);
+        std::memcpy(base + 8, &version, 4);
+        std::memcpy(base + 12, &tamano_registro, 4);
+        std::memcpy(base + 16, &cantidad, 8);
+    }
+
+    ~ArchivoRegistros() {
+#ifdef _WIN32
+        FlushViewOfFile(base, 0);
+        UnmapViewOfFile(base);
+        CloseHandle(mapeo);
+        CloseHandle(archivo);
+#else
+        ::munmap(base, tamano);
+        ::close(fd);
+#endif
+    }
+
+    ArchivoRegistros(const ArchivoRegistros&) = delete;
+    ArchivoRegistros& operator=(const ArchivoRegistros&) = delete;
+
+    Registro* registros() { return reinterpret_cast<Registro*>(base + TAMANO_CABECERA); }
+
+private:
+    size_t tamano;
+    char* base = nullptr;
+#ifdef _WIN32
+    HANDLE archivo, mapeo;
+#else
+    int fd = -1;
+#endif
+};
+
 // 2. La Clase Simulador
 class SimuladorMM1 {
 public:
-    SimuladorMM1(double tasa_llegada, double tasa_servicio) 
-        : lambda(tasa_llegada), mu(tasa_servicio) {
-            // Inicializar generador de números aleatorios (Mersenne Twister)
-            rng.seed(std::random_device{}());
+    // generador: "xoshiro256++" (rápido, exponenciales por ziggurat) o "mt19937" (el histórico)
+    // semilla < 0: no reproducible (random_device)
+    SimuladorMM1(double tasa_llegada, double tasa_servicio, const std::string& generador = "xoshiro256++",
+                 int64_t semilla = -1)
+        : lambda(tasa_llegada), mu(tasa_servicio),
+          dist_llegada(Distribucion::exponencial(1.0 / tasa_llegada)),
+          dist_servicio(Distribucion::exponencial(1.0 / tasa_servicio)) {
+            sembrar(generador, semilla);
+        }
+
+    // M/G/1 y G/G/1: mismas specs que distribuciones.py
+    // La llegada se reescala a media 1/lambda; el servicio usa 1/mu si la spec no trae media
+    SimuladorMM1(double tasa_llegada, double tasa_servicio, py::dict spec_llegadas, py::dict spec_servicio,
+                 const std::string& generador = "xoshiro256++", int64_t semilla = -1)
+        : lambda(tasa_llegada), mu(tasa_servicio),
+          dist_llegada(Distribucion::desde_spec(spec_llegadas, 1.0 / tasa_llegada, 1.0 / tasa_llegada)),
+          dist_servicio(Distribucion::desde_spec(spec_servicio, 0.0, 1.0 / tasa_servicio)) {
+            sembrar(generador, semilla);
         }
 
-    SimResult correr(int n_clientes) {
+    // ruta no vacía: además escribe un registro por cliente (orden de llegada) en un archivo mapeado.
+    // La RAM no depende de n: el sistema operativo baja las páginas a disco a medida que se llenan.
+    SimResult correr(int n_clientes, const std::string& ruta) {
+        if (tipo_generador == TipoGenerador::XOSHIRO256PP) return correr_con(xoshiro, n_clientes, ruta);
+        return correr_con(rng, n_clientes, ruta);
+    }
+
+    // Una corrida larga repartida en hilos: scan paralelo de Lindley en álgebra max-plus.
+    //   W_i = max(0, W_{i-1} + S_{i-1} - A_i). Con U_i = W_i + S_i (trabajo pendiente al llegar i):
+    //   U_i = max(U_{i-1} + (S_i - A_i), S_i)  ->  cada cliente es un mapa h(U) = max(U + a, b)
+    //   y la composición de dos mapas es otro del mismo tipo (asociativa):
+    //   h2(h1(U)) = max(U + a1 + a2, max(b1 + a2, b2))
+    // Fase 1 (paralela): cada bloque de clientes resume su composición (a, b) y su suma de llegadas.
+    // Fase 2 (secuencial, un paso por bloque): U y reloj al inicio de cada bloque.
+    // Fase 3 (paralela): cada bloque re-genera sus variables (mismo flujo) y acumula las esperas.
+    // Cada bloque tiene su propio flujo aleatorio (xoshiro: la semilla saltada k veces; mt19937:
+    // semilla + número de bloque): el resultado depende de la semilla y de tamano_bloque,
+    // NUNCA de la cantidad de hilos.
+    SimResult correr_paralelo(int64_t n_clientes, int hilos, int64_t semilla, int64_t tamano_bloque) {
+        if (n_clientes <= 0 || tamano_bloque <= 0)
+            throw std::invalid_argument("n_clientes y tamano_bloque deben ser > 0");
+        const uint64_t base = semilla >= 0 ? static_cast<uint64_t>(semilla)
+            : (tipo_generador == TipoGenerador::XOSHIRO256PP ? xoshiro() : static_cast<uint64_t>(rng()) << 32 | rng());
+        const int64_t n_bloques = (n_clientes + tamano_bloque - 1) / tamano_bloque;
+
+        if (tipo_generador == TipoGenerador::XOSHIRO256PP) {
+            std::vector<Xoshiro256pp> flujos(n_bloques, Xoshiro256pp(base));
+            for (int64_t k = 1; k < n_bloques; ++k) { flujos[k] = flujos[k - 1]; flujos[k].saltar(); }
+            return correr_paralelo_con(flujos, n_clientes, hilos, tamano_bloque);
+        }
+        std::vector<std::mt19937> flujos;
+        flujos.reserve(n_bloques);
+        for (int64_t k = 0; k < n_bloques; ++k) flujos.push_back(crear_mt19937(base, k));
+        return correr_paralelo_con(flujos, n_clientes, hilos, tamano_bloque);
+    }
+
+private:
+    // Variables de a bloques: primero BLOQUE llegadas, después BLOQUE servicios, y recién ahí
+    // la recursión de Lindley (loops cortos y sin dependencias para el generador)
+    static constexpr int BLOQUE = 256;
+
+    void sembrar(const std::string& generador, int64_t semilla) {
+        tipo_generador = generador_desde_nombre(generador);
+        uint64_t s = semilla_o_azar(semilla);
+        if (tipo_generador == TipoGenerador::XOSHIRO256PP) xoshiro.seed(s);
+        else rng = crear_mt19937(s);
+    }
+
+    template <class G>
+    SimResult correr_con(G& g, int n_clientes, const std::string& ruta) {
         std::vector<double> esperas;
-        esperas.reserve(n_clientes);
-        
-        // Distribuciones exponenciales (estándar en teoría de colas)
-        std::exponential_distribution<double> dist_llegada(lambda);
-        std::exponential_distribution<double> dist_servicio(mu);
+        esperas.reserve(std::min(n_clientes, 5000));
 
+        std::unique_ptr<ArchivoRegistros> archivo;
+        Registro* registros = nullptr;
+        std::deque<double> inicios_en_cola; // Inicio de atención de los que todavía esperan (FIFO)
+        if (!ruta.empty()) {
+            archivo = std::make_unique<ArchivoRegistros>(ruta, n_clientes);
+            registros = archivo->registros();
+        }
+        
         double reloj_actual = 0.0;
         double momento_servidor_libre = 0.0;
         double suma_esperas = 0.0;
         double suma_tiempo_sistema = 0.0;
         double tiempo_total_servicio = 0.0;
+        double interllegadas[BLOQUE], servicios[BLOQUE];
+
+        for (int desde = 0; desde < n_clientes; desde += BLOQUE) {
+            // 1. Generar tiempos hasta los próximos clientes y tiempos que tardarán en ser atendidos
+            const int m = std::min(BLOQUE, n_clientes - desde);
+            dist_llegada.llenar(g, interllegadas, m);
+            dist_servicio.llenar(g, servicios, m);
 
-        for (int i = 0; i < n_clientes; ++i) {
-            // 1. Generar tiempo hasta el próximo cliente y tiempo que tardará en ser atendido
-            double tiempo_interllegada = dist_llegada(rng);
-            double duracion_servicio = dist_servicio(rng);
-
-            // 2. Avanzar el reloj
-            reloj_actual += tiempo_interllegada;
-
-            // 3. Calcular tiempos
-            // El servicio comienza cuando llega el cliente O cuando el servidor se libera (lo que pase último)
-            double inicio_servicio = std::max(reloj_actual, momento_servidor_libre);
-            
-            double tiempo_espera = inicio_servicio - reloj_actual;
-            double tiempo_sistema = tiempo_espera + duracion_servicio;
-            
-            // 4. Actualizar estado
-            momento_servidor_libre = inicio_servicio + duracion_servicio;
-            tiempo_total_servicio += duracion_servicio;
-
-            // 5. Guardar estadísticas
-            suma_esperas += tiempo_espera;
-            suma_tiempo_sistema += tiempo_sistema;
-            
-            // Guardamos todos los datos (o solo una muestra si son demasiados)
-            if (i < 5000) { // Solo guardamos los primeros 5000 para graficar y no saturar RAM
-                esperas.push_back(tiempo_espera);
+            for (int j = 0; j < m; ++j) {
+                const int i = desde + j;
+                double duracion_servicio = servicios[j];
+
+                // 2. Avanzar el reloj
+                reloj_actual += interllegadas[j];
+
+                // 3. Calcular tiempos
+                // El servicio comienza cuando llega el cliente O cuando el servidor se libera (lo que pase último)
+                double inicio_servicio = std::max(reloj_actual, momento_servidor_libre);
+                
+                double tiempo_espera = inicio_servicio - reloj_actual;
+                double tiempo_sistema = tiempo_espera + duracion_servicio;
+                
+                // 4. Actualizar estado
+                momento_servidor_libre = inicio_servicio + duracion_servicio;
+                tiempo_total_servicio += duracion_servicio;
+
+                // 5. Guardar estadísticas
+                suma_esperas += tiempo_espera;
+                suma_tiempo_sistema += tiempo_sistema;
+                
+                // Guardamos todos los datos (o solo una muestra si son demasiados)
+                if (i < 5000) { // Solo guardamos los primeros 5000 para graficar y no saturar RAM
+                    esperas.push_back(tiempo_espera);
+                }
+
+                if (registros != nullptr) {
+                    // Cola al llegar: los anteriores que todavía no empezaron a atenderse
+                    while (!inicios_en_cola.empty() && inicios_en_cola.front() <= reloj_actual) inicios_en_cola.pop_front();
+                    registros[i] = Registro{i, reloj_actual, inicio_servicio, momento_servidor_libre, 0,
+                                            static_cast<int32_t>(inicios_en_cola.size())};
+                    if (inicio_servicio > reloj_actual) inicios_en_cola.push_back(inicio_servicio);
+                }
             }
         }
 
@@ -81,16 +513,210 @@ public:
         return res;
     }
 
-private:
+    // Recorre los clientes [desde, hasta) con el flujo g, de a BLOQUE: paso(A, S, i) por cliente
+    template <class G, class F>
+    void recorrer(G& g, Distribucion& dl, Distribucion& ds, int64_t desde, int64_t hasta, F paso) {
+        double interllegadas[BLOQUE], servicios[BLOQUE];
+        for (int64_t i = desde; i < hasta; i += BLOQUE) {
+            const int m = static_cast<int>(std::min<int64_t>(BLOQUE, hasta - i));
+            dl.llenar(g, interllegadas, m);
+            ds.llenar(g, servicios, m);
+            for (int j = 0; j < m; ++j) paso(interllegadas[j], servicios[j], i + j);
+        }
+    }
+
+    template <class G>
+    SimResult correr_paralelo_con(const std::vector<G>& flujos, int64_t n_clientes, int hilos, int64_t tamano_bloque) {
+        const int64_t n_bloques = static_cast<int64_t>(flujos.size());
+        const double menos_inf = -std::numeric_limits<double>::infinity();
+
+        // Fase 1: resumen de cada bloque
+        std::vector<double> a(n_bloques, 0.0), b(n_bloques, menos_inf), llegadas(n_bloques, 0.0);
+        en_paralelo(n_bloques, hilos, [&](int64_t k) {
+            G g = flujos[k]; // Copia: la fase 3 vuelve a partir del mismo estado
+            Distribucion dl = dist_llegada, ds = dist_servicio; // Copias: algunas guardan estado interno
+            double ak = 0.0, bk = menos_inf, suma_llegadas = 0.0;
+            recorrer(g, dl, ds, k * tamano_bloque, std::min(n_clientes, (k + 1) * tamano_bloque),
+                     [&](double A, double S, int64_t) {
+                // (ak, bk) seguido de (S - A, S)
+                bk = std::max(bk + S - A, S);
+                ak += S - A;
+                suma_llegadas += A;
+            });
+            a[k] = ak; b[k] = bk; llegadas[k] = suma_llegadas;
+        });
+
+        // Fase 2: prefijo secuencial sobre los bloques (U_{-1} = 0: el cajero arranca libre)
+        std::vector<double> u_inicio(n_bloques), reloj_inicio(n_bloques);
+        double u = 0.0, reloj = 0.0;
+        for (int64_t k = 0; k < n_bloques; ++k) {
+            u_inicio[k] = u;
+            reloj_inicio[k] = reloj;
+            u = std::max(u + a[k], b[k]);
+            reloj += llegadas[k];
+        }
+
+        // Fase 3: esperas de cada bloque desde su U inicial
+        const int64_t n_muestras = std::min<int64_t>(n_clientes, 5000);
+        std::vector<double> muestras(n_muestras), suma_espera(n_bloques), suma_servicio(n_bloques);
+        double ultima_salida = 0.0;
+        en_paralelo(n_bloques, hilos, [&](int64_t k) {
+            G g = flujos[k];
+            Distribucion dl = dist_llegada, ds = dist_servicio;
+            double uk = u_inicio[k], reloj_k = reloj_inicio[k], se = 0.0, ss = 0.0, espera = 0.0, ultimo_s = 0.0;
+            recorrer(g, dl, ds, k * tamano_bloque, std::min(n_clientes, (k + 1) * tamano_bloque),
+                     [&](double A, double S, int64_t i) {
+                reloj_k += A;
+                espera = std::max(uk - A, 0.0);
+                uk = espera + S;
+                se += espera;
+                ss += S;
+                ultimo_s = S;
+                if (i < n_muestras) muestras[i] = espera;
+            });
+            suma_espera[k] = se;
+            suma_servicio[k] = ss;
+            if (k == n_bloques - 1) ultima_salida = reloj_k + espera + ultimo_s;
+        });
+
+        double total_espera = 0.0, total_servicio = 0.0;
+        for (int64_t k = 0; k < n_bloques; ++k) { total_espera += suma_espera[k]; total_servicio += suma_servicio[k]; }
+        SimResult res;
+        res.clientes_totales = static_cast<int>(std::min<int64_t>(n_clientes, std::numeric_limits<int>::max()));
+        res.tiempo_promedio_espera = total_espera / n_clientes;
+        res.tiempo_promedio_sistema = (total_espera + total_servicio) / n_clientes;
+        res.utilizacion_servidor = total_servicio / ultima_salida;
+        res.tiempos_espera_muestra = std::move(muestras);
+        return res;
+    }
+
     double lambda; // Clientes por minuto
     double mu;     // Clientes atendidos por minuto
-    std::mt19937 rng; // Generador aleatorio eficiente
+    Distribucion dist_llegada;  // Exponencial por defecto (M/M/1)
+    Distribucion dist_servicio;
+    TipoGenerador tipo_generador;
+    std::mt19937 rng;     // Generador histórico
+    Xoshiro256pp xoshiro; // Generador rápido (por defecto)
 };
 
-// 3. El Binding (Conectar C++ con Python)
+// 2b. Microbenchmark / muestreo: n exponenciales de media `media` con el generador elegido
+py::array_t<double> exponenciales(int64_t n, double media, const std::string& generador, int64_t semilla) {
+    if (n < 0 || !(media > 0)) throw std::invalid_argument("n debe ser >= 0 y media > 0");
+    TipoGenerador tipo = generador_desde_nombre(generador);
+    const uint64_t s = semilla_o_azar(semilla);
+    py::array_t<double> salida(n);
+    double* x = salida.mutable_data();
+    {
+        py::gil_scoped_release sin_gil;
+        Distribucion d = Distribucion::exponencial(media);
+        if (tipo == TipoGenerador::XOSHIRO256PP) {
+            Xoshiro256pp g(s);
+            for (int64_t i = 0; i < n; i += 1 << 20) d.llenar(g, x + i, static_cast<int>(std::min<int64_t>(1 << 20, n - i)));
+        } else {
+            std::mt19937 g = crear_mt19937(s);
+            for (int64_t i = 0; i < n; i += 1 << 20) d.llenar(g, x + i, static_cast<int>(std::min<int64_t>(1 << 20, n - i)));
+        }
+    }
+    return salida;
+}
+
+// 3. Lote de configuraciones M/M/c en paralelo
+// Una sola llamada desde Python corre miles de (lambda, mu, c, semilla) repartidos en hilos.
+// El resultado es un array estructurado de NumPy (una fila por configuración).
+struct ResultadoLote {
+    double tasa_llegada;
+    double tasa_servicio;
+    int64_t servidores;
+    uint64_t semilla;
+    double espera_media;    // Horas (misma unidad que las tasas)
+    double sistema_media;
+    double utilizacion;     // Fracción del tiempo que los c cajeros estuvieron ocupados
+    double prob_espera;     // Fracción de clientes que tuvo que esperar
+    double espera_max;
+    int64_t clientes;       // Clientes medidos (sin el calentamiento)
+};
+
+// M/M/c FIFO: cada cliente toma el cajero que se libera primero (min-heap de c horas libres)
+static void simular_mmc(double lambda, double mu, int64_t c, uint64_t semilla,
+                        int64_t n_clientes, int64_t calentamiento, ResultadoLote& r) {
+    std::seed_seq semillas{static_cast<uint32_t>(semilla), static_cast<uint32_t>(semilla >> 32)};
+    std::mt19937 rng(semillas);
+    std::exponential_distribution<double> llegada(lambda), servicio(mu);
+    std::priority_queue<double, std::vector<double>, std::greater<double>> libre(
+        std::greater<double>(), std::vector<double>(c, 0.0));
+
+    double reloj = 0.0, inicio_medicion = 0.0, ultima_salida = 0.0;
+    double suma_espera = 0.0, suma_servicio = 0.0, espera_max = 0.0;
+    int64_t esperaron = 0;
+    for (int64_t i = 0; i < calentamiento + n_clientes; ++i) {
+        reloj += llegada(rng);
+        double duracion = servicio(rng);
+        double inicio = std::max(reloj, libre.top());
+        libre.pop();
+        libre.push(inicio + duracion);
+        ultima_salida = std::max(ultima_salida, inicio + duracion);
+        if (i < calentamiento) { inicio_medicion = reloj; continue; }
+        double espera = inicio - reloj;
+        suma_espera += espera;
+        suma_servicio += duracion;
+        espera_max = std::max(espera_max, espera);
+        esperaron += espera > 0.0;
+    }
+    r.tasa_llegada = lambda;
+    r.tasa_servicio = mu;
+    r.servidores = c;
+    r.semilla = semilla;
+    r.clientes = n_clientes;
+    r.espera_media = suma_espera / n_clientes;
+    r.sistema_media = (suma_espera + suma_servicio) / n_clientes;
+    r.utilizacion = suma_servicio / (c * (ultima_salida - inicio_medicion));
+    r.prob_espera = static_cast<double>(esperaron) / n_clientes;
+    r.espera_max = espera_max;
+}
+
+template <class T>
+using ArrayEntrada = py::array_t<T, py::array::c_style | py::array::forcecast>;
+
+py::array_t<ResultadoLote> correr_lote(ArrayEntrada<double> lambdas, ArrayEntrada<double> mus,
+                                       ArrayEntrada<int64_t> servidores, ArrayEntrada<uint64_t> semillas,
+                                       int64_t n_clientes, int64_t calentamiento, int hilos) {
+    // Largo del lote: los arrays de largo 1 se repiten (broadcast simple)
+    py::ssize_t n = std::max({lambdas.size(), mus.size(), servidores.size(), semillas.size()});
+    for (py::ssize_t largo : {lambdas.size(), mus.size(), servidores.size(), semillas.size()})
+        if (largo != n && largo != 1)
+            throw std::invalid_argument("lambdas, mus, servidores y semillas deben tener el mismo largo (o largo 1)");
+    if (n_clientes <= 0 || calentamiento < 0)
+        throw std::invalid_argument("n_clientes debe ser > 0 y calentamiento >= 0");
+
+    const double* l = lambdas.data();
+    const double* m = mus.data();
+    const int64_t* c = servidores.data();
+    const uint64_t* s = semillas.data();
+    auto paso = [](const py::array& a) { return a.size() == 1 ? 0 : 1; };
+    const int pl = paso(lambdas), pm = paso(mus), pc = paso(servidores), ps = paso(semillas);
+    for (py::ssize_t i = 0; i < n; ++i)
+        if (!(l[i * pl] > 0) || !(m[i * pm] > 0) || c[i * pc] < 1)
+            throw std::invalid_argument("Configuración " + std::to_string(i) + ": lambda y mu deben ser > 0 y servidores >= 1");
+
+    py::array_t<ResultadoLote> resultado(n);
+    ResultadoLote* r = resultado.mutable_data();
+    {
+        // Sin el GIL: Python sigue libre mientras corren los hilos
+        py::gil_scoped_release sin_gil;
+        en_paralelo(n, hilos, [&](int64_t i) {
+            simular_mmc(l[i * pl], m[i * pm], c[i * pc], s[i * ps], n_clientes, calentamiento, r[i]);
+        });
+    }
+    return resultado;
+}
+
+// 4. El Binding (Conectar C++ con Python)
 PYBIND11_MODULE(super_cpp, m) {
     m.doc() = "Módulo de Simulación de Colas M/M/1";
 
+    PYBIND11_NUMPY_DTYPE(ResultadoLote, tasa_llegada, tasa_servicio, servidores, semilla, espera_media,
+                         sistema_media, utilizacion, prob_espera, espera_max, clientes);
+
     // Exponer la struct SimResult para que Python pueda leer sus campos
     py::class_<SimResult>(m, "SimResult")
         .def_readonly("avg_wait", &SimResult::tiempo_promedio_espera)
@@ -101,6 +727,31 @@ PYBIND11_MODULE(super_cpp, m) {
 
     // Exponer la clase SimuladorMM1
     py::class_<SimuladorMM1>(m, "Simulador")
-        .def(py::init<double, double>()) // Constructor
-        .def("correr", &SimuladorMM1::correr); // Método
+        .def(py::init<double, double, const std::string&, int64_t>(),
+             py::arg("tasa_llegada"), py::arg("tasa_servicio"),
+             py::arg("generador") = "xoshiro256++", py::arg("semilla") = -1) // Constructor
+        .def(py::init<double, double, py::dict, py::dict, const std::string&, int64_t>(),
+             py::arg("tasa_llegada"), py::arg("tasa_servicio"),
+             py::arg("dist_llegadas"), py::arg("dist_servicio"),
+             py::arg("generador") = "xoshiro256++", py::arg("semilla") = -1) // Constructor G/G/1
+        .def("correr", &SimuladorMM1::correr, py::arg("n_clientes"), py::arg("ruta") = "",
+             py::call_guard<py::gil_scoped_release>()) // Método (ruta: registros por cliente, ver registros_mmap.py)
+        // Una corrida enorme en varios núcleos (scan paralelo de Lindley); sin el GIL
+        .def("correr_paralelo", &SimuladorMM1::correr_paralelo,
+             py::arg("n_clientes"), py::arg("hilos") = 0, py::arg("semilla") = -1,
+             py::arg("tamano_bloque") = 1 << 20, py::call_guard<py::gil_scoped_release>());
+
+    // Generadores disponibles y muestreo directo (microbenchmark de variables por segundo)
+    m.attr("GENERADORES") = GENERADORES;
+    m.def("exponenciales", &exponenciales,
+          py::arg("n"), py::arg("media") = 1.0, py::arg("generador") = "xoshiro256++", py::arg("semilla") = -1,
+          "Array de n exponenciales de media `media` generadas en C++ con el generador elegido");
+
+    // Barrido del plano (lambda, mu, c): un solo cruce Python <-> C++
+    m.def("correr_lote", &correr_lote,
+          py::arg("lambdas"), py::arg("mus"), py::arg("servidores"), py::arg("semillas"),
+          py::arg("n_clientes") = 100000, py::arg("calentamiento") = 0, py::arg("hilos") = 0,
+          "Corre un M/M/c por configuración en hilos de C++. Devuelve un array estructurado "
+          "(tasa_llegada, tasa_servicio, servidores, semilla, espera_media, sistema_media, "
+          "utilizacion, prob_espera, espera_max, clientes)");
 }
\ No newline at end of file
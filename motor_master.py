@@ -0,0 +1,1139 @@
+import bisect
+import itertools
+import math
+import pickle
+from array import array
+import types
+from collections import deque
+import numpy as np
+import pandas as pd
+
+from acumuladores import KPIsEspera
+from agenda_eventos import AgendaEventos
+from distribuciones import EXPONENCIAL, crear_flujo, semillas_independientes
+from estimadores_ewt import MarcadorEWT, crear_estimadores
+from perfil_demanda import FACTORES_DIA_BANCO, PerfilDemanda
+from registros_mmap import SIN_ATENDER_ABANDONO, SIN_ATENDER_BALKING, EscritorRegistros
+from ruteo import IndiceServidores, clave_estatica
+from instrumentacion import Instrumentador
+
+# Motor del simulador bancario (sin Streamlit): lo usan el dashboard
+# simulacion_master.py, los benchmarks y cualquier script o proceso en paralelo.
+
+# ==========================================
+# 1. LÓGICA DEL MOTOR DE SIMULACIÓN (DES)
+# ==========================================
+
+def curva_demanda_diaria(hora_actual, tasa_base):
+    """
+    Define la 'personalidad' del día.
+    Devuelve la tasa de llegada (lambda) para un instante específico.
+    """
+    # Patrón: Mañana tranquila -> Subida -> HORA PICO (Almuerzo) -> Bajada -> Cierre
+    # La tabla de factores vive en perfil_demanda.FACTORES_DIA_BANCO
+    for desde, hasta, factor in FACTORES_DIA_BANCO:
+        if desde <= hora_actual < hasta: return tasa_base * factor
+    return 0.0
+
+class Cliente:
+    def __init__(self, id_cliente, hora_llegada, clase=0):
+        self.id = id_cliente
+        self.hora_llegada = hora_llegada # Float exacto
+        self.hora_inicio_atencion = None
+        self.hora_salida = None
+        self.cola_al_llegar = 0
+        self.clase = clase           # Índice de prioridad (0 = la más alta)
+        # Abandono (reneging)
+        self.evento_abandono = None  # Ticket en la FEL para poder cancelarlo
+        self.abandono = False        # Lápida: sigue en la deque pero ya se fue
+        self.hora_abandono = None
+        # Servicio leído de una traza real (None = se sortea)
+        self.servicio_traza = None
+        # Preempción: lo que le faltaba cuando lo interrumpieron
+        self.servicio_restante = None
+        self.interrupciones = 0
+        # Esperas prometidas al llegar (una por estimador de EWT, en horas)
+        self.estimaciones = None
+
+class Servidor:
+    def __init__(self, id_servidor):
+        self.id = id_servidor
+        self.activo = False        # ¿Está en turno?
+        self.ocupado = False       # ¿Está atendiendo?
+        self.cliente_actual = None
+        self.evento_salida = None  # Ticket de la SALIDA (se cancela si hay preempción)
+        # Métricas precisas para utilización
+        self.tiempo_acumulado_activo = 0.0
+        self.tiempo_acumulado_trabajando = 0.0
+        # Cronómetro sin loop por evento: tramos cerrados + el abierto desde activo_desde
+        self.activo_desde = 0.0
+        self.horas_cerradas = 0.0
+        # Calendario de turnos (turnos.py)
+        self.disponible = True         # En la sucursal: en turno y fuera de descanso
+        self.salida_pendiente = False  # Terminó su turno atendiendo: se va al liberarse
+        self.bloqueado_hasta = 0.0     # Sesión mínima: el auto-scaling no lo apaga antes
+        # Cajeros heterogéneos (ver PerfilCajero): tasa propia / tasa general y clases que atiende
+        self.velocidad = 1.0
+        self.habilidades = None
+
+class ClaseCliente:
+    def __init__(self, nombre, proporcion, sla_min):
+        self.nombre = nombre
+        self.proporcion = proporcion # Fracción de las llegadas
+        self.sla_min = sla_min       # Espera objetivo (y umbral de escalado) de la clase
+        self.umbral_up = sla_min / 60.0
+
+class ConteoFenwick:
+    """Conteo por clase con sumas de prefijo (árbol de Fenwick): sumar y consultar en O(log K)"""
+
+    def __init__(self, n):
+        self.arbol = [0] * (n + 1)
+
+    def sumar(self, k, delta):
+        arbol = self.arbol
+        i = k + 1
+        while i < len(arbol):
+            arbol[i] += delta
+            i += i & -i
+
+    def prefijo(self, k):
+        """Total de las clases 0..k"""
+        arbol = self.arbol
+        i = k + 1
+        total = 0
+        while i:
+            total += arbol[i]
+            i &= i - 1
+        return total
+
+class PerfilCajero:
+    def __init__(self, tasa=None, habilidades=None):
+        self.tasa = tasa               # Clientes por hora (None = la tasa_servicio general)
+        self.habilidades = habilidades # Nombres de las ClaseCliente que sabe atender (None = todas)
+
+class Checkpoint:
+    """Estado serializado de una SimulacionMaster (bytes de pickle + hora de la foto)"""
+
+    def __init__(self, datos, reloj):
+        self.datos = datos
+        self.reloj = reloj
+
+    def guardar(self, ruta):
+        with open(ruta, "wb") as f:
+            pickle.dump((self.reloj, self.datos), f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def cargar(cls, ruta):
+        with open(ruta, "rb") as f:
+            reloj, datos = pickle.load(f)
+        return cls(datos, reloj)
+
+    def __len__(self):
+        return len(self.datos)
+
+    def __repr__(self):
+        return f"Checkpoint(hora={self.reloj:.3f}, {len(self.datos) / 1024:.0f} KB)"
+
+# Claves de SimulacionMaster.indicadores()
+INDICADORES = [
+    "Horas_Apertura", "Llegadas", "Atendidos", "Abandonos", "Balking", "Espera_Media_Min",
+    "Espera_P95_Min", "SLA_Pct", "Horas_Cajero", "Horas_Trabajadas", "Utilizacion_Pct",
+    "Activaciones", "Desactivaciones", "Cola_Max_Al_Llegar", "Cierre_Real_H", "Eventos",
+]
+
+# Atributos que no viajan en un checkpoint
+_NO_SERIALIZABLE = ("instrumentacion", "estadisticas", "_filas_traza", "registros")
+
+class SimulacionMaster:
+    def __init__(self, tasa_base, tasa_servicio, min_serv, max_serv, umbral_up, umbral_down,
+                 paciencia_min=None, cola_max_balking=None, clases=None, preemptivo=False,
+                 dist_servicio=None, dist_llegadas=None, semilla=None, traza=None, perfil=None,
+                 instrumentar=False, solo_agregados=False, sla_min=10.0, estimadores=None,
+                 registros=None, cajeros=None, ruteo=None, turnos=None):
+        self.tasa_base = tasa_base
+        self.mu = tasa_servicio
+        self.min_servers = min_serv
+        self.max_servers = max_serv
+        # Convertimos minutos a horas (float)
+        self.umbral_up = umbral_up / 60.0
+        self.umbral_down = umbral_down / 60.0
+        # Comportamiento del cliente (None = desactivado)
+        # Paciencia media en minutos (exponencial): si la espera la supera, abandona
+        self.paciencia = paciencia_min / 60.0 if paciencia_min else None
+        # Largo de cola a partir del cual el cliente ni siquiera entra (balking)
+        self.cola_max_balking = cola_max_balking
+        
+        # Clases de prioridad (ordenadas: la primera es la más urgente)
+        # Sin clases = una sola fila FIFO con el umbral general
+        self.clases = clases or [ClaseCliente("General", 1.0, umbral_up)]
+        self.preemptivo = preemptivo
+        total = sum(c.proporcion for c in self.clases)
+        self._proporciones_acum = list(itertools.accumulate(c.proporcion / total for c in self.clases))
+        n_clases = len(self.clases)
+        
+        # Flujos de variables aleatorias (pre-generadas en bloques, uno por proceso)
+        # Llegadas: forma con media 1, se escala por la tasa del momento (demanda variable)
+        # Servicio: si la spec no trae media, se usa 1/mu
+        s_lleg, s_serv, s_pac, s_clase = semillas_independientes(semilla, 4)
+        self.flujo_llegadas = crear_flujo(dist_llegadas, s_lleg, media=1.0)
+        self.flujo_servicio = crear_flujo(dist_servicio, s_serv, media_por_defecto=1.0 / self.mu)
+        self.flujo_paciencia = crear_flujo(EXPONENCIAL, s_pac, media=self.paciencia) if self.paciencia else None
+        self.flujo_clases = crear_flujo({"tipo": "uniforme"}, s_clase)
+        
+        # Replay de una traza real (trazas.TrazaLlegadas): reemplaza a la curva de demanda.
+        # Se consume en streaming, de a una llegada agendada por vez.
+        self.traza = traza
+        self._filas_traza = iter(traza) if traza is not None else None
+        self._filas_leidas = 0 # Para reposicionar la traza al restaurar un checkpoint
+        
+        # Intensidad de llegadas lambda(t) como tabla (perfil_demanda.PerfilDemanda).
+        # Por defecto, el patrón histórico del banco escalado por la tasa base.
+        if perfil is not None and perfil.ciclico:
+            raise ValueError("El motor simula un día: recortar el perfil semanal con perfil.perfil_dia() "
+                             "(varios días: horizonte.py)")
+        self.perfil = perfil or PerfilDemanda.desde_factores(FACTORES_DIA_BANCO, tasa_base)
+        self.hora_cierre = self.perfil.periodo # El perfil del día define la hora de cierre
+        
+        self.horizonte = self.hora_cierre # Horas simuladas (para la barra de progreso)
+        if traza is not None:
+            self.horizonte = traza.horizonte() or 8.0
+        
+        self.reloj = 0.0
+        # Una deque por clase. Pueden contener lápidas de clientes que abandonaron,
+        # por eso el largo REAL se lleva aparte
+        self.colas_clientes = [deque() for _ in range(n_clases)]
+        self.largo_por_clase = [0] * n_clases
+        # Gente esperando de las clases 0..k (lo que tiene delante la clase k); con una sola clase es largo_cola
+        self.largo_hasta_clase = ConteoFenwick(n_clases) if n_clases > 1 else None
+        self.largo_cola = 0
+        # Bit k encendido <=> la clase k tiene gente esperando (despacho O(1))
+        self.mascara_colas = 0
+        # Creamos la flota de servidores
+        self.servidores = [Servidor(i) for i in range(max_serv)]
+        
+        # Calendario de turnos (turnos.CalendarioTurnos): quién está en la sucursal y cuándo.
+        # Con calendario todos arrancan fuera; los eventos DISPONIBLE de la FEL los van trayendo
+        self.turnos = turnos
+        if turnos is not None:
+            fuera = [i for i in turnos.cajeros if not 0 <= i < max_serv]
+            if fuera:
+                raise ValueError(f"El calendario tiene cajeros fuera de la flota (0..{max_serv - 1}): {fuera}")
+            for s in self.servidores:
+                s.disponible = False
+        else:
+            # Encendemos los servidores mínimos
+            for i in range(min_serv): 
+                self.servidores[i].activo = True
+        
+        # Cajeros heterogéneos: un PerfilCajero por ID (tasa y habilidades) y política de ruteo
+        # (ruteo.RUTEOS). Sin ellos, flota homogénea con máscaras de bits por ID (el comportamiento de siempre)
+        self.cajeros = cajeros
+        self.ruteo = None
+        if cajeros is not None or ruteo is not None:
+            self._configurar_cajeros(cajeros or [PerfilCajero() for _ in range(max_serv)], ruteo or "mas_rapido")
+        
+        # Índices para no recorrer la flota en cada evento
+        self.n_activos = min_serv if turnos is None else 0
+        self.n_ocupados = 0
+        self._armar_indices()
+        # Servidores atendiendo a cada clase (para elegir víctima de preempción)
+        self.en_servicio_por_clase = [set() for _ in range(n_clases)]
+        self.mascara_en_servicio = 0
+            
+        self.eventos = AgendaEventos() # Priority Queue con cancelación
+        self.historial_clientes = []
+        self.historial_abandonos = []
+        self.log_sistema = [] # Foto del sistema en cada evento
+        
+        # Contadores Gerenciales
+        self.contador_activaciones = 0
+        self.contador_desactivaciones = 0
+        self.contador_llegadas = 0
+        self.contador_abandonos = 0
+        self.contador_balking = 0
+        self.contador_preempciones = 0
+        self.eventos_procesados = 0
+        self._iniciada = False # ¿Ya se agendó la primera llegada?
+        self.decisiones = None  # Registro de puntos de decisión (ver registrar_decisiones)
+        
+        # Modo solo agregados (barridos, horizontes largos): sin historial por cliente ni
+        # fotos por evento; las esperas van a acumuladores en streaming (acumuladores.KPIsEspera)
+        # y correr() devuelve indicadores() en lugar de los DataFrames
+        self.sla_min = sla_min # Espera objetivo para el KPI de nivel de servicio
+        self.kpis = KPIsEspera(sla_min) if solo_agregados else None
+        
+        # Estimadores de espera a comparar (estimadores_ewt): cada llegada guarda la promesa
+        # de cada uno y el marcador los puntúa por hora cuando el cliente pasa a la caja
+        self.estimadores = None
+        self.marcador = None
+        if estimadores:
+            self.estimadores = crear_estimadores(estimadores)
+            self.marcador = MarcadorEWT([e.nombre for e in self.estimadores])
+        
+        # Registros por cliente a un archivo mapeado (registros_mmap): ruta o EscritorRegistros.
+        # Se escribe cuando el cliente se va; correr() lo cierra, avanzar() no (ver cerrar_registros)
+        self.registros = None
+        if registros is not None:
+            self.registros = registros if isinstance(registros, EscritorRegistros) else EscritorRegistros(registros)
+        
+        # Instrumentación (instrumentacion.py): False / True / "cprofile" / "tracemalloc"
+        # Apagada no agrega nada al loop; el resultado queda en self.estadisticas
+        self.instrumentacion = None
+        self.estadisticas = None
+        if instrumentar:
+            self._instalar_instrumentacion(None if instrumentar is True else instrumentar)
+
+    def _configurar_cajeros(self, cajeros, ruteo):
+        if len(cajeros) != self.max_servers:
+            raise ValueError(f"Hacen falta {self.max_servers} perfiles de cajero (uno por ID), llegaron {len(cajeros)}")
+        indice_clase = {c.nombre: k for k, c in enumerate(self.clases)}
+        todas = tuple(range(len(self.clases)))
+        for s, perfil in zip(self.servidores, cajeros):
+            tasa = perfil.tasa or self.mu
+            s.velocidad = tasa / self.mu
+            if perfil.habilidades is None:
+                s.habilidades = todas
+            else:
+                desconocidas = set(perfil.habilidades) - set(indice_clase)
+                if desconocidas:
+                    raise ValueError(f"Cajero {s.id}: habilidades sin clase de cliente {sorted(desconocidas)}")
+                s.habilidades = tuple(sorted(indice_clase[h] for h in perfil.habilidades))
+        self.cajeros = cajeros
+        self.ruteo = ruteo
+        self._claves = [clave_estatica(ruteo, s.velocidad * self.mu, len(s.habilidades)) for s in self.servidores]
+        huerfanas = [c.nombre for k, c in enumerate(self.clases) if not any(k in s.habilidades for s in self.servidores)]
+        if huerfanas:
+            raise ValueError(f"Ningún cajero atiende a: {', '.join(huerfanas)}")
+
+    def _armar_indices(self):
+        """Libres / apagados según los cajeros activos (arranque o día nuevo)"""
+        if self.ruteo is None:
+            # Máscaras de bits (bit i = cajero i): el bit más bajo atiende / se prende, el más alto se apaga
+            self.libres = sum(1 << s.id for s in self.servidores if s.activo)                      # Activos y ociosos
+            self.inactivos = sum(1 << s.id for s in self.servidores if not s.activo and s.disponible)  # Apagados
+            return
+        habilidades = [s.habilidades for s in self.servidores]
+        n_clases = len(self.clases)
+        self.libres = IndiceServidores(habilidades, n_clases)
+        self.inactivos = IndiceServidores(habilidades, n_clases, sacar_peor=False)
+        # Capacidad en turno (clientes por hora): total y de quienes atienden cada clase (para el EWT)
+        self.tasa_activa = 0.0
+        self.tasa_activa_por_clase = [0.0] * n_clases
+        for s in self.servidores:
+            if s.activo:
+                self.libres.agregar(s.id, self._clave_libre(s.id))
+                self._sumar_capacidad(s, 1)
+            elif s.disponible:
+                self.inactivos.agregar(s.id, s.id)
+
+    def _clave_libre(self, i):
+        clave = self._claves[i]
+        return self.reloj if clave is None else clave
+
+    def _sumar_capacidad(self, s, signo):
+        tasa = signo * s.velocidad * self.mu
+        self.tasa_activa += tasa
+        for k in s.habilidades:
+            self.tasa_activa_por_clase[k] += tasa
+
+    def _agregar_libre(self, s):
+        if self.ruteo is None: self.libres |= 1 << s.id
+        else: self.libres.agregar(s.id, self._clave_libre(s.id))
+
+    def _quitar_libre(self, s):
+        if self.ruteo is None: self.libres &= ~(1 << s.id)
+        else: self.libres.quitar(s.id)
+
+    def _agregar_inactivo(self, s):
+        if self.ruteo is None: self.inactivos |= 1 << s.id
+        else: self.inactivos.agregar(s.id, s.id)
+
+    def _quitar_inactivo(self, s):
+        if self.ruteo is None: self.inactivos &= ~(1 << s.id)
+        else: self.inactivos.quitar(s.id)
+
+    def _instalar_instrumentacion(self, captura):
+        inst = self.instrumentacion = Instrumentador(captura)
+        largo_fel = self.eventos.__len__
+        largo_heap = lambda: len(self.eventos._heap)
+        largo_cola = lambda: self.largo_cola
+        for metodo, tipo in [("_evento_llegada", "LLEGADA"), ("_evento_salida", "SALIDA"),
+                             ("_evento_abandono", "ABANDONO"), ("_evento_disponible", "DISPONIBLE"),
+                             ("_evento_no_disponible", "NO_DISPONIBLE"), ("_evento_sesion_minima", "SESION_MINIMA")]:
+            inst.envolver_evento(self, metodo, tipo, largo_fel, largo_heap, largo_cola)
+        for metodo, seccion in [("extraer", "FEL: extraer"), ("programar", "FEL: programar"),
+                                ("cancelar", "FEL: cancelar")]:
+            inst.envolver_seccion(self.eventos, metodo, seccion)
+        for metodo, seccion in [("_sincronizar_cronometros", "Cronómetros de servidores"),
+                                ("programar_llegada", "Generar llegada"),
+                                ("_gestionar_auto_scaling", "Auto-scaling"),
+                                ("intentar_asignar", "Asignación a cajero"),
+                                ("_registrar_snapshot", "Snapshot (log_sistema)"),
+                                ("_generar_reportes", "Reportes (pandas)")]:
+            inst.envolver_seccion(self, metodo, seccion)
+
+    def _sincronizar_cronometros(self):
+        """
+        Lleva tiempo_acumulado_activo hasta el reloj (tramos cerrados + el abierto).
+        Cada encendido / apagado cierra su tramo en O(1); esto recorre la flota una vez
+        por pausa de avanzar(), no por evento.
+        """
+        for s in self.servidores:
+            if s.activo:
+                s.tiempo_acumulado_activo = s.horas_cerradas + (self.reloj - s.activo_desde)
+
+    def _get_tasa_actual(self):
+        if self.traza is not None: return float('nan') # La traza no tiene tasa teórica
+        return self.perfil.tasa(self.reloj)
+
+    def _sortear_clase(self):
+        if len(self.clases) == 1: return 0
+        return min(bisect.bisect_right(self._proporciones_acum, self.flujo_clases.siguiente()), len(self.clases) - 1)
+
+    def _calcular_ewt(self, clase=None):
+        """Estimated Wait Time (Tiempo Estimado por el Sistema)"""
+        if self.n_activos == 0: return 999.0 # Infinito
+        # Delante de un cliente de la clase k solo están las clases 0..k
+        delante = self.largo_cola if clase is None else self.delante(clase)
+        # EWT = Lq / (n * mu)
+        return delante / self.capacidad(clase)
+
+    def delante(self, clase):
+        """Gente que espera delante de un cliente de `clase` que llega ahora (clases 0..k)"""
+        if self.largo_hasta_clase is None: return self.largo_cola
+        return self.largo_hasta_clase.prefijo(clase)
+
+    def capacidad(self, clase=None):
+        """Clientes por hora que puede atender hoy la flota en turno (los que atienden `clase`)"""
+        if self.ruteo is None: return self.n_activos * self.mu
+        tasa = self.tasa_activa if clase is None else self.tasa_activa_por_clase[clase]
+        return tasa if tasa > 1e-9 else 1e-9 # Nadie en turno sabe atenderla: EWT enorme
+
+    def hay_libre(self, clase=0):
+        """¿Hay un cajero en turno y ocioso que pueda atender a `clase`?"""
+        if self.ruteo is None: return bool(self.libres)
+        return self.libres.por_clase[clase] > 0
+
+    def _registrar_snapshot(self):
+        """Toma una foto del estado actual para el análisis posterior"""
+        if self.kpis is not None: return # Solo agregados: sin log por evento
+        foto = {
+            'Tiempo': self.reloj,
+            'Cola': self.largo_cola,
+            'Servidores_Activos': self.n_activos,
+            'Servidores_Ocupados': self.n_ocupados,
+            'Tasa_Llegada_Instantanea': self._get_tasa_actual(),
+            'Wait_Time_Estimado_Min': self._calcular_ewt() * 60
+        }
+        if len(self.clases) > 1:
+            for k, clase in enumerate(self.clases):
+                foto[f'Cola_{clase.nombre}'] = self.largo_por_clase[k]
+                foto[f'EWT_{clase.nombre}_Min'] = self._calcular_ewt(k) * 60
+        self.log_sistema.append(foto)
+
+    def _gestionar_auto_scaling(self, ewt_actual, clase=0):
+        """CEREBRO: Decide si prende o apaga servidores según EWT"""
+        # REGLA 1: Escalar Hacia Arriba (Emergencia) - cada clase con su propio SLA
+        if ewt_actual > self.clases[clase].umbral_up and self.n_activos < self.max_servers:
+            self._activar_servidor(clase)
+        
+        # REGLA 2: Escalar Hacia Abajo (Ahorro) - mirando la fila completa
+        elif self.n_activos > self.min_servers and self.libres and self._calcular_ewt() < self.umbral_down:
+            # Sesión mínima: si el próximo a apagar todavía no la cumplió, se espera a su evento
+            if self.turnos is not None and self.servidores[self._proximo_a_apagar()].bloqueado_hasta > self.reloj:
+                return
+            # Solo apagamos servidores libres (sin ruteo, el de ID más alto)
+            if self.ruteo is None:
+                i = self.libres.bit_length() - 1
+                self.libres &= ~(1 << i)
+            else:
+                i = self.libres.pop()
+            s = self.servidores[i]
+            self._apagar(s)
+            self._agregar_inactivo(s)
+            self.contador_desactivaciones += 1
+
+    def _proximo_a_apagar(self):
+        return self.libres.bit_length() - 1 if self.ruteo is None else self.libres.ver()
+
+    def _apagar(self, s):
+        """Cierra el tramo activo del cajero (ya fuera de los libres)"""
+        s.activo = False
+        s.horas_cerradas += self.reloj - s.activo_desde
+        s.tiempo_acumulado_activo = s.horas_cerradas
+        self.n_activos -= 1
+        if self.ruteo is not None: self._sumar_capacidad(s, -1)
+
+    def _activar_servidor(self, clase=None):
+        if not self.inactivos: return # Con calendario puede no haber nadie disponible
+        if self.ruteo is None:
+            # El primer inactivo (bit más bajo)
+            m = self.inactivos
+            s = self.servidores[(m & -m).bit_length() - 1]
+            self.inactivos = m & (m - 1)
+        else:
+            # El de ID más bajo que sepa atender a la clase que se demora (si no hay, nadie)
+            if clase is None: i = self.inactivos.pop()
+            elif self.inactivos.por_clase[clase]: i = self.inactivos.tomar(clase)
+            else: return
+            s = self.servidores[i]
+            self._sumar_capacidad(s, 1)
+        s.activo = True
+        s.activo_desde = self.reloj
+        self.n_activos += 1
+        self._agregar_libre(s)
+        self.contador_activaciones += 1
+        if self.turnos is not None and self.turnos.sesion_minima > 0:
+            s.bloqueado_hasta = self.reloj + self.turnos.sesion_minima
+            self.eventos.programar(s.bloqueado_hasta, "SESION_MINIMA", s.id)
+
+    def _completar_minimo(self):
+        """Prende disponibles hasta min_serv y reparte la fila entre los libres"""
+        while self.n_activos < self.min_servers and self.inactivos:
+            self._activar_servidor()
+        while self.intentar_asignar():
+            pass
+
+    def programar_llegada(self):
+        if self._filas_traza is not None:
+            # Próxima fila de la traza real (el servicio viaja con el evento)
+            fila = next(self._filas_traza, None)
+            if fila is not None:
+                self._filas_leidas += 1
+                self.eventos.programar(fila[0], "LLEGADA", fila[1])
+            return
+        
+        # Inversión exacta de la intensidad acumulada: Lambda(t_sig) = Lambda(t) + E
+        # (los tramos con tasa 0 se saltean solos; inf = no hay más demanda)
+        hora_evento = self.perfil.siguiente_llegada(self.reloj, self.flujo_llegadas.siguiente())
+        
+        # Solo agendar si es antes del cierre
+        if hora_evento <= self.hora_cierre:
+            self.eventos.programar(hora_evento, "LLEGADA")
+
+    def _programar_abandono(self, cliente):
+        """Agenda el momento en que el cliente se cansa de esperar"""
+        limite = self.reloj + self.flujo_paciencia.siguiente()
+        cliente.evento_abandono = self.eventos.programar(limite, "ABANDONO", cliente)
+
+    def _procesar_abandono(self, cliente):
+        # Borrado perezoso: la deque no se toca (O(1)), el cliente queda como lápida
+        cliente.abandono = True
+        cliente.hora_abandono = self.reloj
+        cliente.evento_abandono = None
+        self._descontar_de_cola(cliente.clase)
+        self.contador_abandonos += 1
+        if self.kpis is None: self.historial_abandonos.append(cliente)
+        if self.registros is not None:
+            self.registros.agregar(cliente.id, cliente.hora_llegada, math.nan, self.reloj,
+                                   SIN_ATENDER_ABANDONO, cliente.cola_al_llegar)
+
+    def _encolar(self, cliente, al_frente=False):
+        k = cliente.clase
+        if al_frente: self.colas_clientes[k].appendleft(cliente)
+        else: self.colas_clientes[k].append(cliente)
+        self.largo_por_clase[k] += 1
+        if self.largo_hasta_clase is not None: self.largo_hasta_clase.sumar(k, 1)
+        self.largo_cola += 1
+        self.mascara_colas |= 1 << k
+
+    def _descontar_de_cola(self, k):
+        self.largo_por_clase[k] -= 1
+        if self.largo_hasta_clase is not None: self.largo_hasta_clase.sumar(k, -1)
+        self.largo_cola -= 1
+        if not self.largo_por_clase[k]:
+            # No queda nadie vivo en la clase: tiramos las lápidas de una vez
+            self.colas_clientes[k].clear()
+            self.mascara_colas &= ~(1 << k)
+
+    def _desencolar(self, k=None):
+        """Saca al próximo cliente de la clase `k` o, sin k, de la más urgente con gente (bit más bajo)"""
+        if k is None:
+            m = self.mascara_colas
+            k = (m & -m).bit_length() - 1
+        cola = self.colas_clientes[k]
+        # Descartar lápidas de la cabeza (amortizado O(1))
+        cliente = cola.popleft()
+        while cliente.abandono:
+            cliente = cola.popleft()
+        self._descontar_de_cola(k)
+        return cliente
+
+    def cabeza_viva(self, clase):
+        """Primer cliente vivo de la fila de `clase` (None si no hay). Solo mira: las lápidas las saca _desencolar"""
+        if not self.largo_por_clase[clase]: return None
+        return next(c for c in self.colas_clientes[clase] if not c.abandono)
+
+    def _liberar_servidor(self, servidor):
+        k = servidor.cliente_actual.clase
+        grupo = self.en_servicio_por_clase[k]
+        grupo.discard(servidor.id)
+        if not grupo: self.mascara_en_servicio &= ~(1 << k)
+        servidor.ocupado = False
+        servidor.cliente_actual = None
+        servidor.evento_salida = None
+        self.n_ocupados -= 1
+        self._agregar_libre(servidor)
+
+    def _intentar_preempcion(self, clase):
+        """Interrumpe al cliente menos prioritario en servicio si es de una clase peor"""
+        if not self.mascara_en_servicio: return False
+        # Clase menos urgente que hoy ocupa un servidor (bit más alto)
+        peor = self.mascara_en_servicio.bit_length() - 1
+        if peor <= clase: return False
+        
+        # Víctima: el cajero de ID más bajo. El orden de un set no sobrevive a pickle y
+        # reanudar un checkpoint tiene que elegir a la misma que la corrida sin cortes
+        if self.ruteo is None:
+            servidor = self.servidores[min(self.en_servicio_por_clase[peor])]
+        else:
+            # Solo sirve liberar a un cajero que sepa atender a la clase que llega
+            i = min((i for i in self.en_servicio_por_clase[peor]
+                     if clase in self.servidores[i].habilidades), default=None)
+            if i is None: return False
+            servidor = self.servidores[i]
+        victima = servidor.cliente_actual
+        self.eventos.cancelar(servidor.evento_salida)
+        
+        # Preemptive-resume: conserva lo que le faltaba y vuelve al frente de su fila
+        restante = victima.hora_salida - self.reloj
+        servidor.tiempo_acumulado_trabajando -= restante
+        victima.servicio_restante = restante
+        victima.interrupciones += 1
+        self.contador_preempciones += 1
+        self._liberar_servidor(servidor)
+        self._encolar(victima, al_frente=True)
+        return True
+
+    def intentar_asignar(self):
+        """Busca match entre servidor libre y cliente en cola. Devuelve True si hubo uno"""
+        if self.ruteo is None:
+            if not self.largo_cola or not self.libres: return False
+            m = self.libres # El libre de ID más bajo (bit más bajo)
+            candidato = self.servidores[(m & -m).bit_length() - 1]
+            self.libres = m & (m - 1)
+            cliente = self._desencolar()
+        else:
+            # La clase más urgente que tiene gente esperando Y un cajero libre que la sabe atender
+            m = self.mascara_colas & self.libres.mascara
+            if not m: return False
+            k = (m & -m).bit_length() - 1
+            candidato = self.servidores[self.libres.tomar(k)]
+            cliente = self._desencolar(k)
+        
+        # Ya no va a abandonar: cancelamos su timer en la FEL
+        if cliente.evento_abandono is not None:
+            self.eventos.cancelar(cliente.evento_abandono)
+            cliente.evento_abandono = None
+        
+        candidato.ocupado = True
+        candidato.cliente_actual = cliente
+        self.n_ocupados += 1
+        self.en_servicio_por_clase[cliente.clase].add(candidato.id)
+        self.mascara_en_servicio |= 1 << cliente.clase
+        
+        if cliente.servicio_restante is None:
+            # Primera vez que lo atienden
+            cliente.hora_inicio_atencion = self.reloj
+            if cliente.servicio_traza is not None: duracion = cliente.servicio_traza
+            else: duracion = self.flujo_servicio.siguiente() / candidato.velocidad
+            if self.kpis is None: self.historial_clientes.append(cliente)
+            else: self.kpis.agregar((self.reloj - cliente.hora_llegada) * 60, cliente.cola_al_llegar)
+            if self.marcador is not None: self._puntuar_estimaciones(cliente)
+        else:
+            # Retoma un servicio interrumpido
+            duracion = cliente.servicio_restante
+            cliente.servicio_restante = None
+        cliente.hora_salida = self.reloj + duracion
+        
+        # Registrar uso
+        candidato.tiempo_acumulado_trabajando += duracion
+        
+        candidato.evento_salida = self.eventos.programar(cliente.hora_salida, "SALIDA", candidato.id)
+        return True
+
+    def _puntuar_estimaciones(self, cliente):
+        espera = self.reloj - cliente.hora_llegada
+        self.marcador.registrar(cliente.hora_llegada, espera, cliente.estimaciones)
+        for e in self.estimadores:
+            e.observar(espera)
+
+    def correr(self, progreso=None):
+        """
+        Corre el día completo (o lo que falta, si viene de un checkpoint)
+        y devuelve (df_clientes, df_sistema, df_servidores); con solo_agregados, indicadores().
+        progreso: callable opcional que recibe la fracción simulada (0-1), ej: st.progress(0).progress
+        """
+        self.avanzar(progreso=progreso)
+        self.cerrar_registros()
+        if self.kpis is not None: return self.indicadores()
+        
+        # --- PROCESAMIENTO DE DATOS AL FINALIZAR ---
+        inst = self.instrumentacion
+        if inst is not None: inst.iniciar()
+        reportes = self._generar_reportes()
+        if inst is not None: self.estadisticas = inst.detener()
+        return reportes
+
+    def avanzar(self, hasta=None, progreso=None, exacto=True):
+        """
+        Procesa eventos hasta la hora `hasta` (None = hasta vaciar la FEL).
+        Al pausar, el reloj queda EXACTAMENTE en `hasta` (listo para checkpoint()).
+        exacto=False deja el reloj en el último evento: pausar así no altera ni un bit
+        de la trayectoria (los cronómetros suman los mismos deltas que sin pausa).
+        Devuelve True si la simulación terminó.
+        """
+        inst = self.instrumentacion
+        if inst is not None: inst.iniciar()
+        
+        if not self._iniciada:
+            # Primer evento (y el calendario de turnos completo, si hay)
+            self._iniciada = True
+            if self.turnos is not None:
+                for hora, tipo, cajero in self.turnos.eventos():
+                    self.eventos.programar(hora, tipo, cajero)
+            self.programar_llegada()
+        
+        while self.eventos:
+            if hasta is not None and self.eventos.proximo_tiempo() > hasta:
+                if exacto: self.reloj = hasta
+                break
+            tiempo_evento, tipo, data = self.eventos.extraer()
+            self.eventos_procesados += 1
+            
+            # 1. Actualizar Reloj (los cronómetros de los cajeros se cierran al apagarlos)
+            self.reloj = tiempo_evento
+            
+            # 2. Manejar Evento
+            if tipo == "LLEGADA": self._evento_llegada(data)
+            elif tipo == "SALIDA": self._evento_salida(data)
+            elif tipo == "ABANDONO": self._evento_abandono(data)
+            elif tipo == "DISPONIBLE": self._evento_disponible(data)
+            elif tipo == "NO_DISPONIBLE": self._evento_no_disponible(data)
+            elif tipo == "SESION_MINIMA": self._evento_sesion_minima(data)
+            
+            # Actualizar UI cada tanto (no siempre para no frenar)
+            if progreso is not None and not self.eventos_procesados & 1023:
+                progreso(min(self.reloj / self.horizonte, 1.0))
+        
+        self._sincronizar_cronometros()
+        if inst is not None: self.estadisticas = inst.detener()
+        return not self.eventos
+
+    # --- Manejadores de eventos ---
+
+    def _evento_llegada(self, servicio_traza):
+        # Nace Cliente
+        c = Cliente(self.contador_llegadas, self.reloj, self._sortear_clase())
+        c.servicio_traza = servicio_traza
+        self.contador_llegadas += 1
+        c.cola_al_llegar = self.largo_cola
+        if self.estimadores is not None:
+            c.estimaciones = tuple(e.estimar(self, c.clase) for e in self.estimadores)
+        
+        # Calcular métricas para decisión (EWT de SU clase)
+        ewt = self._calcular_ewt(c.clase)
+        self._gestionar_auto_scaling(ewt, c.clase)
+        
+        # Balking: ve la fila demasiado larga y se va sin entrar
+        if self.cola_max_balking is not None and self.largo_cola >= self.cola_max_balking:
+            self.contador_balking += 1
+            if self.registros is not None:
+                self.registros.agregar(c.id, c.hora_llegada, math.nan, self.reloj,
+                                       SIN_ATENDER_BALKING, c.cola_al_llegar)
+        else:
+            self._encolar(c)
+            self.intentar_asignar()
+            if c.hora_inicio_atencion is None and self.preemptivo and self._intentar_preempcion(c.clase):
+                self.intentar_asignar()
+            # Si no lo atendieron en el acto, arranca su reloj de paciencia
+            if self.paciencia and c.hora_inicio_atencion is None:
+                self._programar_abandono(c)
+        self.programar_llegada()
+        self._registrar_snapshot() # FOTO
+
+    def _evento_salida(self, srv_id):
+        servidor = self.servidores[srv_id]
+        if self.registros is not None:
+            c = servidor.cliente_actual
+            self.registros.agregar(c.id, c.hora_llegada, c.hora_inicio_atencion, self.reloj,
+                                   srv_id, c.cola_al_llegar)
+        self._liberar_servidor(servidor)
+        # Terminó su turno atendiendo: se va, salvo que deje a una fila sin nadie (horas extra)
+        if servidor.salida_pendiente and not self._lo_necesitan(servidor):
+            self._retirar(servidor)
+        
+        self.intentar_asignar()
+        if not self.largo_cola: self._gestionar_auto_scaling(0.0)
+        self._registrar_snapshot() # FOTO
+
+    def _evento_abandono(self, cliente):
+        self._procesar_abandono(cliente)
+        if not self.largo_cola: self._gestionar_auto_scaling(0.0)
+        self._registrar_snapshot() # FOTO
+
+    def _evento_disponible(self, srv_id):
+        s = self.servidores[srv_id]
+        s.disponible = True
+        if s.activo: s.salida_pendiente = False # Seguía en horas extra: empalma con el turno nuevo
+        else: self._agregar_inactivo(s)
+        self._completar_minimo()
+        self._registrar_snapshot() # FOTO
+
+    def _evento_no_disponible(self, srv_id):
+        s = self.servidores[srv_id]
+        s.disponible = False
+        if not s.activo: self._quitar_inactivo(s)
+        elif s.ocupado: s.salida_pendiente = True
+        else: self._retirar(s)
+        self._completar_minimo()
+        self._registrar_snapshot() # FOTO
+
+    def _evento_sesion_minima(self, srv_id):
+        # Recién ahora se lo puede apagar: se re-evalúa la regla de bajada
+        self._gestionar_auto_scaling(0.0)
+        self._registrar_snapshot() # FOTO
+
+    def _lo_necesitan(self, s):
+        """Es el último en ventanilla que atiende a una clase con gente en la fila"""
+        if self.ruteo is None: return self.n_activos == 1 and self.largo_cola > 0
+        # Solo en salidas pendientes (fin de turno), no en cada evento
+        return any(self.mascara_colas >> k & 1
+                   and not any(o.activo and o is not s and k in o.habilidades for o in self.servidores)
+                   for k in s.habilidades)
+
+    def _retirar(self, s):
+        """Sale de ventanilla por el calendario (no cuenta como desactivación del auto-scaling)"""
+        self._quitar_libre(s)
+        s.salida_pendiente = False
+        self._apagar(s)
+        self._completar_minimo()
+
+    def cerrar_registros(self):
+        """Cierra el archivo de registros (si hay). Devuelve su ruta; leerlo con registros_mmap.leer_registros"""
+        if self.registros is None: return None
+        return self.registros.cerrar()
+
+    # --- Horizonte de varios días ---
+
+    def nuevo_dia(self, perfil):
+        """
+        Cierre nocturno: deja el motor listo para simular otro día con `perfil`
+        (reloj en 0, flota en el mínimo, historiales y contadores vacíos).
+        Los flujos aleatorios NO se reinician: cada día sigue la secuencia (días independientes).
+        Solo vale con la FEL vacía (el día anterior atendió a todos los que quedaron en la fila).
+        """
+        if self.eventos:
+            raise ValueError("El día anterior no terminó: la FEL todavía tiene eventos")
+        if self.traza is not None:
+            raise ValueError("Una traza real ya define su propio horizonte (no se encadenan días)")
+        if self.largo_cola:
+            raise ValueError(f"Quedaron {self.largo_cola} clientes en la fila sin cajero que los atienda "
+                             "(el calendario de turnos no cubre hasta el cierre)")
+        if perfil.ciclico:
+            raise ValueError("nuevo_dia necesita el perfil de un día: recortarlo con perfil.perfil_dia()")
+        self.perfil = perfil
+        self.hora_cierre = self.horizonte = perfil.periodo
+        self.reloj = 0.0
+
+        for s in self.servidores:
+            s.activo = self.turnos is None and s.id < self.min_servers
+            s.disponible = self.turnos is None
+            s.salida_pendiente = False
+            s.bloqueado_hasta = 0.0
+            s.activo_desde = 0.0
+            s.horas_cerradas = 0.0
+            s.tiempo_acumulado_activo = 0.0
+            s.tiempo_acumulado_trabajando = 0.0
+        self.n_activos = self.min_servers if self.turnos is None else 0
+        self._armar_indices()
+        # Colas y servicio ya están vacíos (FEL vacía); solo pueden quedar lápidas
+        for cola in self.colas_clientes: cola.clear()
+
+        # Listas nuevas: quien guardó las del día anterior las conserva intactas
+        self.historial_clientes = []
+        self.historial_abandonos = []
+        self.log_sistema = []
+        self.contador_activaciones = 0
+        self.contador_desactivaciones = 0
+        self.contador_llegadas = 0
+        self.contador_abandonos = 0
+        self.contador_balking = 0
+        self.contador_preempciones = 0
+        self.eventos_procesados = 0
+        self._iniciada = False
+        if self.kpis is not None: self.kpis = KPIsEspera(self.sla_min)
+        if self.marcador is not None:
+            self.marcador = MarcadorEWT(self.marcador.nombres, self.marcador.tolerancia * 60)
+            for e in self.estimadores: e.reiniciar()
+        if self.decisiones is not None: del self.decisiones[:]
+
+    # --- Checkpoint / Fork / Resume ---
+
+    def __getstate__(self):
+        # Fuera del estado: la instrumentación (closures instaladas en la instancia)
+        # y el iterador de la traza (se reposiciona con _filas_leidas)
+        return {k: v for k, v in self.__dict__.items()
+                if k not in _NO_SERIALIZABLE and not isinstance(v, types.FunctionType)}
+
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        self.instrumentacion = None
+        self.estadisticas = None
+        self.registros = None # Una rama restaurada no escribe en el archivo del original
+        if self.decisiones is not None: self._instalar_registro_decisiones()
+        self._filas_traza = None
+        if self.traza is not None:
+            self._filas_traza = iter(self.traza)
+            # Saltear lo ya agendado (consume sin crear objetos)
+            deque(itertools.islice(self._filas_traza, self._filas_leidas), maxlen=0)
+
+    def checkpoint(self):
+        """
+        Foto completa del estado (reloj, FEL, colas, servidores, flujos aleatorios
+        con su buffer, acumuladores e historiales) como bytes inmutables.
+        Copiarla es gratis; cada restauración es una rama independiente.
+        """
+        return Checkpoint(pickle.dumps(self, protocol=pickle.HIGHEST_PROTOCOL), self.reloj)
+
+    @classmethod
+    def desde_checkpoint(cls, checkpoint, instrumentar=False, **cambios):
+        """Nueva simulación que sigue desde el checkpoint; `cambios` van a aplicar_cambios()"""
+        sim = pickle.loads(checkpoint.datos)
+        if instrumentar:
+            sim._instalar_instrumentacion(None if instrumentar is True else instrumentar)
+        if cambios: sim.aplicar_cambios(**cambios)
+        return sim
+
+    def aplicar_cambios(self, min_serv=None, max_serv=None, umbral_up=None, umbral_down=None, semilla=None):
+        """
+        What-if en caliente (típicamente sobre una rama recién restaurada):
+        capacidad, política de auto-scaling o una semilla nueva para el futuro.
+        Subir min_serv prende cajeros en el acto ("abrir 3 cajas más a las 12:00").
+        """
+        if umbral_up is not None:
+            self.umbral_up = umbral_up / 60.0
+            if len(self.clases) == 1: # Sin segmentos el SLA de la única clase ES el umbral
+                self.clases[0].sla_min = umbral_up
+                self.clases[0].umbral_up = self.umbral_up
+        if umbral_down is not None:
+            self.umbral_down = umbral_down / 60.0
+        
+        if max_serv is not None and max_serv != self.max_servers:
+            if self.ruteo is not None:
+                raise ValueError("Con cajeros heterogéneos la flota es fija (cambiar min_serv o los perfiles)")
+            if self.turnos is not None:
+                raise ValueError("Con calendario de turnos la flota es la del calendario")
+            if max_serv > self.max_servers:
+                nuevos = list(range(self.max_servers, max_serv))
+                self.servidores.extend(Servidor(i) for i in nuevos)
+                # IDs más altos: se prenden después de los que ya estaban
+                self.inactivos |= sum(1 << i for i in nuevos)
+            else:
+                if any(s.activo for s in self.servidores[max_serv:]):
+                    raise ValueError(f"No se puede bajar max_serv a {max_serv}: hay cajeros activos con ID mayor")
+                del self.servidores[max_serv:]
+                self.inactivos &= (1 << max_serv) - 1
+            self.max_servers = max_serv
+        
+        if min_serv is not None:
+            self.min_servers = min(min_serv, self.max_servers)
+            self._completar_minimo()
+        
+        if semilla is not None:
+            # Rama con su propio futuro aleatorio (réplicas de la tarde sobre la misma mañana)
+            flujos = [self.flujo_llegadas, self.flujo_servicio, self.flujo_paciencia, self.flujo_clases]
+            for flujo, semilla_flujo in zip(flujos, semillas_independientes(semilla, 4)):
+                if flujo is not None: flujo.resembrar(semilla_flujo)
+
+    # --- Puntos de decisión (re-simulación incremental) ---
+
+    def registrar_decisiones(self):
+        """
+        Desde ahora, cada evaluación del auto-scaling deja un registro de 5 floats:
+        (hora, EWT de la clase, clase, ¿puede subir?, EWT total si puede bajar / NaN).
+        Con eso se sabe, sin re-simular, en qué evento otra política habría decidido distinto.
+        """
+        self.decisiones = array("d")
+        self._instalar_registro_decisiones()
+
+    def _instalar_registro_decisiones(self):
+        original = self._gestionar_auto_scaling
+        registro = self.decisiones
+        nan = math.nan
+
+        def gestionar(ewt_actual, clase=0):
+            puede_bajar = self.n_activos > self.min_servers and self.libres
+            registro.extend((self.reloj, ewt_actual, clase, self.n_activos < self.max_servers,
+                             self._calcular_ewt() if puede_bajar else nan))
+            original(ewt_actual, clase)
+        self._gestionar_auto_scaling = gestionar
+
+    def primera_divergencia(self, umbral_up=None, umbral_down=None):
+        """
+        Hora de la primera decisión de auto-scaling que cambiaría con los umbrales nuevos
+        (minutos, misma semántica que aplicar_cambios). None = la trayectoria sería idéntica.
+        """
+        if self.decisiones is None:
+            raise ValueError("La corrida no registró decisiones (llamar a registrar_decisiones() antes de avanzar)")
+        r = np.frombuffer(self.decisiones, dtype=np.float64).reshape(-1, 5)
+        hora, ewt, clase, puede_subir, ewt_total = r.T
+        clase = clase.astype(np.int64)
+
+        def decisiones(umbrales_up, umbral_down_h):
+            sube = (puede_subir > 0) & (ewt > np.asarray(umbrales_up)[clase])
+            baja = ~sube & (ewt_total < umbral_down_h) # NaN (no puede bajar) compara False
+            return sube, baja
+
+        actuales = [c.umbral_up for c in self.clases]
+        nuevos = list(actuales)
+        if umbral_up is not None and len(self.clases) == 1: nuevos = [umbral_up / 60.0]
+        nuevo_down = self.umbral_down if umbral_down is None else umbral_down / 60.0
+        sube_a, baja_a = decisiones(actuales, self.umbral_down)
+        sube_b, baja_b = decisiones(nuevos, nuevo_down)
+        distintas = np.flatnonzero((sube_a != sube_b) | (baja_a != baja_b))
+        return float(hora[distintas[0]]) if len(distintas) else None
+
+    def resumen(self):
+        """Contadores de la corrida (liviano y picklable, para devolver desde otro proceso)"""
+        return {
+            "contador_llegadas": self.contador_llegadas,
+            "contador_activaciones": self.contador_activaciones,
+            "contador_desactivaciones": self.contador_desactivaciones,
+            "contador_abandonos": self.contador_abandonos,
+            "contador_balking": self.contador_balking,
+            "contador_preempciones": self.contador_preempciones,
+            "eventos_procesados": self.eventos_procesados,
+            "estadisticas": self.estadisticas,
+            "marcador_ewt": self.marcador,
+        }
+
+    def indicadores(self):
+        """
+        KPIs de la corrida en un dict plano (INDICADORES). Con solo_agregados salen de los
+        acumuladores (p95 con error relativo <= 1%); si no, exactos desde el historial.
+        """
+        kpis = self.kpis
+        if kpis is None:
+            n = len(self.historial_clientes)
+            espera = np.fromiter(((c.hora_inicio_atencion - c.hora_llegada) * 60 for c in self.historial_clientes),
+                                 dtype=np.float64, count=n)
+            cola_max = max((c.cola_al_llegar for c in self.historial_clientes), default=0)
+            media = float(espera.mean()) if n else 0.0
+            p95 = float(np.quantile(espera, 0.95)) if n else 0.0
+            sla = float((espera <= self.sla_min).mean() * 100) if n else 100.0
+        else:
+            n, media, p95, sla, cola_max = kpis.n, kpis.media, kpis.cuantil(0.95), kpis.sla_pct, kpis.cola_max
+        horas_activo = sum(s.tiempo_acumulado_activo for s in self.servidores)
+        horas_trabajo = sum(s.tiempo_acumulado_trabajando for s in self.servidores)
+        return {
+            "Horas_Apertura": self.hora_cierre,
+            "Llegadas": self.contador_llegadas,
+            "Atendidos": n,
+            "Abandonos": self.contador_abandonos,
+            "Balking": self.contador_balking,
+            "Espera_Media_Min": media,
+            "Espera_P95_Min": p95,
+            "SLA_Pct": sla,
+            "Horas_Cajero": horas_activo,
+            "Horas_Trabajadas": horas_trabajo,
+            "Utilizacion_Pct": horas_trabajo / horas_activo * 100 if horas_activo > 0.001 else 0.0,
+            "Activaciones": self.contador_activaciones,
+            "Desactivaciones": self.contador_desactivaciones,
+            "Cola_Max_Al_Llegar": cola_max,
+            "Cierre_Real_H": self.reloj, # > Horas_Apertura: se atendió a la fila después del cierre
+            "Eventos": self.eventos_procesados,
+        }
+
+    def _generar_reportes(self):
+        # 1. DF Clientes (Realidad)
+        data_c = []
+        for c in self.historial_clientes:
+            wait = (c.hora_inicio_atencion - c.hora_llegada) * 60
+            data_c.append({
+                "ID": c.id,
+                "Llegada": c.hora_llegada,
+                "Espera_Real_Min": wait,
+                "Cola_Al_Llegar": c.cola_al_llegar,
+                "Clase": self.clases[c.clase].nombre
+            })
+        df_clientes = pd.DataFrame(data_c)
+        # Promesa de cada estimador (una columna por estimador)
+        if self.estimadores is not None and len(df_clientes):
+            promesas = np.array([c.estimaciones for c in self.historial_clientes]) * 60
+            for i, e in enumerate(self.estimadores):
+                df_clientes[f"EWT_{e.nombre}_Min"] = promesas[:, i]
+        
+        # 2. DF Sistema (Estimaciones y Estado)
+        df_sistema = pd.DataFrame(self.log_sistema)
+        
+        # 3. DF Servidores (Eficiencia)
+        data_s = []
+        for s in self.servidores:
+            if s.tiempo_acumulado_activo > 0.001:
+                util = (s.tiempo_acumulado_trabajando / s.tiempo_acumulado_activo) * 100
+            else:
+                util = 0.0
+            
+            data_s.append({
+                "ID": f"Cajero {s.id}",
+                "Horas_Activo": s.tiempo_acumulado_activo,
+                "Horas_Trabajadas": s.tiempo_acumulado_trabajando,
+                "Utilizacion_Pct": util
+            })
+        df_servidores = pd.DataFrame(data_s)
+        if self.ruteo is not None:
+            df_servidores["Tasa"] = [s.velocidad * self.mu for s in self.servidores]
+            df_servidores["Habilidades"] = [", ".join(self.clases[k].nombre for k in s.habilidades)
+                                            for s in self.servidores]
+        
+        return df_clientes, df_sistema, df_servidores
+
+# ==========================================
+# 2. FUNCIONES DE ANÁLISIS DE DATOS (ETL)
+# ==========================================
+
+def fusionar_realidad_vs_estimado(df_sistema, df_clientes):
+    """
+    Crea el Dataset Maestro cruzando lo que el sistema 'veía' vs lo que 'pasó'.
+    Usa resampling de 1 minuto para suavizar ruido visual.
+    """
+    # Crear índice temporal ficticio (asumiendo apertura 8:00 AM)
+    base_time = pd.Timestamp("2024-01-01 08:00:00")
+    
+    # 1. Procesar Sistema
+    df_sistema['datetime'] = base_time + pd.to_timedelta(df_sistema['Tiempo'], unit='h')
+    df_sys_resampled = df_sistema.set_index('datetime').resample('1T').agg({
+        'Cola': 'max', # Peor caso del minuto
+        'Servidores_Activos': 'last', # Estado final del minuto
+        'Wait_Time_Estimado_Min': 'mean', # Promedio de estimación
+        'Tasa_Llegada_Instantanea': 'mean'
+    })
+    
+    # 2. Procesar Clientes (Realidad)
+    df_clientes['datetime'] = base_time + pd.to_timedelta(df_clientes['Llegada'], unit='h')
+    df_cl_resampled = df_clientes.set_index('datetime').resample('1T').agg({
+        'Espera_Real_Min': 'mean', # Promedio real de los que llegaron en ese minuto
+        'ID': 'count' # Cantidad de llegadas (Volumen)
+    })
+    
+    # 3. Join
+    df_master = df_sys_resampled.join(df_cl_resampled)
+    
+    # Limpieza: Si nadie llegó, interpolamos la espera real para que el gráfico no se corte
+    df_master['Espera_Real_Min'] = df_master['Espera_Real_Min'].interpolate(method='linear')
+    df_master['Volumen_Clientes'] = df_master['ID'].fillna(0)
+    
+    # Calcular el Sesgo (Bias)
+    df_master['Sesgo_Algoritmo'] = df_master['Espera_Real_Min'] - df_master['Wait_Time_Estimado_Min']
+    
+    return df_master
+
+# --- ZONA DE PRUEBAS ---
+
+if __name__ == "__main__":
+    sim = SimulacionMaster(150, 20, 1, 15, 15, 3, semilla=42)
+    df_clientes, df_sistema, df_servidores = sim.correr()
+    print(f"Clientes atendidos: {len(df_clientes)} | Eventos: {sim.eventos_procesados}")
+    print(f"Espera media: {df_clientes['Espera_Real_Min'].mean():.2f} min | P95: {df_clientes['Espera_Real_Min'].quantile(0.95):.2f} min")
+    print(f"Activaciones: {sim.contador_activaciones} | Desactivaciones: {sim.contador_desactivaciones}")
@@ -0,0 +1,214 @@
+import bisect
+import math
+
+import numpy as np
+
+# ==========================================
+# PERFILES DE DEMANDA (NHPP) AJUSTADOS
+# ==========================================
+# Un perfil es una intensidad lambda(t) constante por tramos sobre una grilla
+# regular (ej: 15 min). Se guarda como tabla compacta:
+#   tasas[i]      -> clientes/hora del tramo i            (lookup O(1))
+#   acumulada[i]  -> Lambda(t) = integral de lambda hasta el borde i
+# Generar la próxima llegada es invertir Lambda EXACTAMENTE:
+#   Lambda(t_sig) = Lambda(t_actual) + E,  E ~ Exp(1)
+# sin thinning ni aproximar la tasa como constante hasta el próximo evento.
+
+# Patrón histórico del banco: (desde_h, hasta_h, factor sobre la tasa base)
+# Mañana tranquila -> Subida -> HORA PICO (Almuerzo) -> Bajada -> Cierre
+FACTORES_DIA_BANCO = [
+    (0, 2, 0.4),
+    (2, 3, 0.8),
+    (3, 5, 1.8),
+    (5, 7, 1.2),
+    (7, 8, 0.6),
+]
+
+# Sábado: media jornada (4 h) con el pico a media mañana
+FACTORES_SABADO_BANCO = [
+    (0, 1, 0.8),
+    (1, 3, 1.4),
+    (3, 4, 0.7),
+]
+
+DIAS_SEMANA = ["Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sábado", "Domingo"]
+
+
+class PerfilDemanda:
+    def __init__(self, tasas, ancho_h, ciclico=False):
+        """
+        tasas: clientes/hora por tramo. ancho_h: duración de cada tramo (horas).
+        ciclico: el perfil se repite (ej: semana de 168 h); si no, la tasa es 0 después del final.
+        """
+        tasas = np.asarray(tasas, dtype=np.float64)
+        if (tasas < 0).any():
+            raise ValueError("Las tasas de un perfil no pueden ser negativas")
+        self.tasas_np = tasas
+        self.ancho_h = float(ancho_h)
+        self.ciclico = ciclico
+        self.n = len(tasas)
+        self.periodo = self.n * self.ancho_h
+        # Listas de Python: indexar una lista es más rápido que un ndarray desde el loop de eventos
+        self.tasas = tasas.tolist()
+        self.acumulada = np.concatenate([[0.0], np.cumsum(tasas) * self.ancho_h]).tolist()
+        self.total_periodo = self.acumulada[-1]
+
+    # --- Constructores ---
+
+    @classmethod
+    def desde_factores(cls, factores, tasa_base, ancho_h=0.25):
+        """Perfil de un día a partir de una tabla (desde_h, hasta_h, factor)"""
+        fin = max(hasta for _, hasta, _ in factores)
+        n = int(round(fin / ancho_h))
+        tasas = np.zeros(n)
+        for desde, hasta, factor in factores:
+            tasas[int(round(desde / ancho_h)):int(round(hasta / ancho_h))] = tasa_base * factor
+        return cls(tasas, ancho_h)
+
+    @classmethod
+    def desde_curva(cls, curva, tasa_base, horizonte=8.0, ancho_h=1 / 60.0):
+        """Tabula una función curva(hora, tasa_base) (ej: las curva_demanda_diaria de los dashboards)"""
+        n = int(round(horizonte / ancho_h))
+        centros = (np.arange(n) + 0.5) * ancho_h
+        return cls([curva(h, tasa_base) for h in centros], ancho_h)
+
+    @classmethod
+    def cargar(cls, ruta):
+        datos = np.load(ruta)
+        return cls(datos["tasas"], float(datos["ancho_h"]), bool(datos["ciclico"]))
+
+    def guardar(self, ruta):
+        np.savez_compressed(ruta, tasas=self.tasas_np, ancho_h=self.ancho_h, ciclico=self.ciclico)
+
+    # --- Consultas ---
+
+    def tasa(self, t):
+        """lambda(t) en O(1)"""
+        i = int(t // self.ancho_h)
+        if self.ciclico: i %= self.n
+        elif i < 0 or i >= self.n: return 0.0
+        return self.tasas[i]
+
+    def lambda_acumulada(self, t):
+        """Lambda(t): llegadas esperadas en [0, t]"""
+        vueltas = 0.0
+        if self.ciclico:
+            k = math.floor(t / self.periodo)
+            vueltas = k * self.total_periodo
+            t -= k * self.periodo
+        elif t >= self.periodo:
+            return self.total_periodo
+        elif t <= 0:
+            return 0.0
+        i = min(int(t // self.ancho_h), self.n - 1)
+        return vueltas + self.acumulada[i] + self.tasas[i] * (t - i * self.ancho_h)
+
+    def invertir(self, objetivo):
+        """Menor t con Lambda(t) = objetivo (inf si el perfil no llega nunca)"""
+        base = 0.0
+        if self.ciclico:
+            if self.total_periodo <= 0: return math.inf
+            k = math.floor(objetivo / self.total_periodo)
+            base = k * self.periodo
+            objetivo -= k * self.total_periodo
+            if objetivo >= self.total_periodo: # Redondeo en el borde del período
+                base += self.periodo
+                objetivo = 0.0
+        elif objetivo >= self.total_periodo:
+            return math.inf
+        # Tramo donde cae el objetivo: bisect_right saltea solo los tramos con tasa 0 (planos)
+        i = max(bisect.bisect_right(self.acumulada, objetivo) - 1, 0)
+        return base + i * self.ancho_h + (objetivo - self.acumulada[i]) / self.tasas[i]
+
+    def siguiente_llegada(self, t, e):
+        """Próxima llegada desde t consumiendo e unidades de 'tiempo operacional' (E ~ Exp(1) para NHPP)"""
+        return self.invertir(self.lambda_acumulada(t) + e)
+
+    def perfil_dia(self, dia, desde_h=0.0, hasta_h=24.0):
+        """Recorta un día (0 = lunes) de un perfil semanal, re-basado para que t=0 sea `desde_h`"""
+        i0 = int(round((dia * 24 + desde_h) / self.ancho_h))
+        i1 = int(round((dia * 24 + hasta_h) / self.ancho_h))
+        return PerfilDemanda(self.tasas_np[i0:i1], self.ancho_h)
+
+    def escalado(self, factor):
+        return PerfilDemanda(self.tasas_np * factor, self.ancho_h, self.ciclico)
+
+
+# ==========================================
+# AJUSTE DESDE DATOS HISTÓRICOS
+# ==========================================
+
+def _contar(conteos, dias, hora, ancho_h, semanal):
+    """Suma al histograma las llegadas de un bloque (dias: días desde 1970, hora: hora del día)"""
+    tramos_dia = int(round(24 / ancho_h))
+    tramo = np.minimum((hora / ancho_h).astype(np.int64), tramos_dia - 1)
+    if semanal:
+        # Día de la semana (0 = lunes). 1970-01-01 fue jueves -> +3
+        tramo = ((dias + 3) % 7) * tramos_dia + tramo
+    conteos += np.bincount(tramo, minlength=len(conteos))
+
+
+def _intensidad(conteos, dia_inicial, dia_final, ancho_h, semanal, suavizado_min):
+    tramos_dia = int(round(24 / ancho_h))
+    # Exposición: cuántos días de cada tipo abarca la historia (incluye días sin llegadas)
+    todos = np.arange(dia_inicial, dia_final + 1)
+    if semanal:
+        exposicion = np.repeat(np.bincount((todos + 3) % 7, minlength=7).astype(np.float64), tramos_dia)
+    else:
+        exposicion = np.full(tramos_dia, float(len(todos)))
+
+    tasas = np.divide(conteos, exposicion * ancho_h, out=np.zeros_like(conteos), where=exposicion > 0)
+
+    if suavizado_min > 0:
+        # Convolución circular por FFT: O(n log n), respeta el cierre semanal/diario
+        sigma = suavizado_min / (ancho_h * 60)
+        d = np.arange(len(tasas))
+        d = np.minimum(d, len(tasas) - d)
+        nucleo = np.exp(-0.5 * (d / sigma) ** 2)
+        nucleo /= nucleo.sum()
+        tasas = np.fft.irfft(np.fft.rfft(tasas) * np.fft.rfft(nucleo), n=len(tasas))
+        tasas = np.maximum(tasas, 0.0)
+
+    return PerfilDemanda(tasas, ancho_h, ciclico=True)
+
+
+def ajustar_perfil(llegadas, ancho_min=15, semanal=True, suavizado_min=0.0):
+    """
+    Estima la intensidad NHPP a partir de timestamps de llegada (datetime64 / pd.Series / lista).
+    semanal=True -> perfil de 168 h (día de semana x hora del día); False -> un día típico de 24 h.
+    La tasa de cada tramo = llegadas observadas / (días observados de ese tipo x ancho del tramo).
+    suavizado_min > 0 aplica un núcleo gaussiano circular (perfil suave en vez de escalonado).
+    """
+    t = np.sort(np.asarray(llegadas, dtype="datetime64[ns]"))
+    if not len(t):
+        raise ValueError("No hay llegadas para ajustar el perfil")
+    ancho_h = ancho_min / 60.0
+    conteos = np.zeros((7 if semanal else 1) * int(round(24 / ancho_h)))
+
+    dias = t.astype("datetime64[D]")
+    _contar(conteos, dias.astype(np.int64), (t - dias) / np.timedelta64(1, "h"), ancho_h, semanal)
+    return _intensidad(conteos, int(dias[0].astype(np.int64)), int(dias[-1].astype(np.int64)),
+                       ancho_h, semanal, suavizado_min)
+
+
+def ajustar_perfil_traza(traza, ancho_min=15, semanal=True, suavizado_min=0.0):
+    """
+    Igual que ajustar_perfil pero recorriendo una trazas.TrazaLlegadas en streaming
+    (memoria constante, sirve para años de ticketera).
+    Si la traza es numérica y sin origen, la hora 0 se toma como un lunes a las 00:00.
+    """
+    ancho_h = ancho_min / 60.0
+    conteos = np.zeros((7 if semanal else 1) * int(round(24 / ancho_h)))
+    dia_inicial = dia_final = None
+    for llegadas, _ in traza.bloques():
+        if dia_inicial is None:
+            # 1970-01-05 fue lunes
+            dia0 = int(traza.origen.astype("datetime64[D]").astype(np.int64)) if traza.origen is not None else 4
+        dia_rel = np.floor(llegadas / 24.0)
+        dias = dia_rel.astype(np.int64) + dia0
+        _contar(conteos, dias, llegadas - dia_rel * 24.0, ancho_h, semanal)
+        if dia_inicial is None: dia_inicial = int(dias[0])
+        dia_final = int(dias[-1])
+    if dia_inicial is None:
+        raise ValueError("No hay llegadas para ajustar el perfil")
+    return _intensidad(conteos, dia_inicial, dia_final, ancho_h, semanal, suavizado_min)
@@ -0,0 +1,338 @@
+import math
+import multiprocessing as mp
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from distribuciones import muestrear_bloque
+from motor_master import SimulacionMaster
+
+# ==========================================
+# PRONÓSTICO DE ESPERA EN VIVO (NOWCASTING)
+# ==========================================
+# En vez de prometer cola / (activos * mu), se simula hacia adelante desde el estado
+# ACTUAL del banco cientos de veces y se informa la distribución de la espera de un
+# cliente que llega ahora.
+#
+# Motor compacto: solo importa lo que puede cambiar la espera del cliente "marcado"
+# (fila única FIFO). Por réplica se guarda:
+#   libre[j]        hora en que el cajero j queda disponible (inf = apagado)
+#   delante, detras clientes en la fila antes y después del marcado
+#   n_activos       cajeros prendidos
+# y todas las réplicas avanzan JUNTAS, un evento por paso (vectorizado con NumPy):
+#   - un cajero se libera -> atiende al primero de adelante o, si no queda nadie, al marcado (fin)
+#   - llega alguien       -> misma regla de auto-scaling que el motor (EWT > umbral_up prende
+#                            un cajero) y, si no hace balking, se suma atrás
+#   - alguien abandona    -> paciencia exponencial: sin memoria, se sortea de nuevo en cada paso
+# Mientras el marcado espera hay fila, así que el motor nunca apaga cajeros: la política
+# de bajada no influye. Los servicios en curso se continúan con su residual condicionado
+# a lo que ya lleva cada cliente en la caja.
+#
+# Pool caliente: los procesos se crean (y calientan) una sola vez; cada pronóstico solo
+# les manda el estado (unos bytes) y un bloque de réplicas.
+
+REPLICAS = 400
+HORIZONTE_MAX_H = 2.0 # Esperas más largas se informan como censuradas en este valor
+_INTENTOS_RESIDUAL = 50
+
+
+class EstadoVivo:
+    def __init__(self, hora, cola, transcurridos_min=(), activos=None):
+        """
+        hora: horas desde la apertura. cola: clientes esperando.
+        transcurridos_min: minutos que lleva cada cliente que está en caja (uno por cajero ocupado).
+        activos: cajeros prendidos (por defecto, los ocupados).
+        """
+        self.hora = float(hora)
+        self.cola = int(cola)
+        self.transcurridos = np.asarray(transcurridos_min, dtype=np.float64) / 60.0
+        self.activos = len(self.transcurridos) if activos is None else int(activos)
+        if self.activos < len(self.transcurridos):
+            raise ValueError("Hay más cajeros ocupados que activos")
+
+    @classmethod
+    def desde_simulacion(cls, sim):
+        """Foto del estado de una SimulacionMaster en curso (ej: pausada con avanzar(hasta=...))"""
+        transcurridos = [(sim.reloj - s.cliente_actual.hora_inicio_atencion) * 60
+                         for s in sim.servidores if s.ocupado]
+        return cls(sim.reloj, sim.largo_cola, transcurridos, sim.n_activos)
+
+    def __repr__(self):
+        return (f"EstadoVivo(hora={self.hora:.2f}, cola={self.cola}, "
+                f"ocupados={len(self.transcurridos)}/{self.activos})")
+
+
+class PronosticoEspera:
+    """Esperas simuladas (minutos) de un cliente que llega ahora"""
+
+    def __init__(self, esperas_min, censuradas, milisegundos):
+        self.esperas = esperas_min
+        self.censuradas = censuradas # Réplicas que superaron HORIZONTE_MAX_H
+        self.milisegundos = milisegundos
+
+    @property
+    def media(self):
+        return float(self.esperas.mean())
+
+    def cuantil(self, q):
+        return float(np.quantile(self.esperas, q))
+
+    def prob_menor(self, minutos):
+        """P(espera <= minutos)"""
+        return float((self.esperas <= minutos).mean())
+
+    def __len__(self):
+        return len(self.esperas)
+
+    def __repr__(self):
+        return (f"PronosticoEspera({len(self)} réplicas, media={self.media:.1f} min, "
+                f"p50={self.cuantil(0.5):.1f}, p90={self.cuantil(0.9):.1f}, {self.milisegundos:.1f} ms)")
+
+
+# --- Motor compacto ---
+
+def configuracion(sim):
+    """Lo que el motor compacto necesita de una SimulacionMaster (dict chico y picklable)"""
+    if len(sim.clases) > 1:
+        raise ValueError("El pronóstico asume una sola fila FIFO (sin clases de prioridad)")
+    if sim.traza is not None:
+        raise ValueError("El pronóstico usa el perfil de demanda, no una traza")
+    if sim.ruteo is not None:
+        raise ValueError("El pronóstico asume cajeros idénticos (sin perfiles de cajero)")
+    if sim.turnos is not None:
+        raise ValueError("El pronóstico no modela el calendario de turnos")
+    perfil = sim.perfil
+    n = int(math.ceil(sim.hora_cierre / perfil.ancho_h - 1e-9))
+    idx = np.arange(n)
+    if perfil.ciclico: idx %= perfil.n
+    tasas = np.where(idx < perfil.n, perfil.tasas_np[np.minimum(idx, perfil.n - 1)], 0.0)
+    return {
+        "ancho_h": perfil.ancho_h,
+        "tasas": tasas,
+        "acumulada": np.concatenate([[0.0], np.cumsum(tasas) * perfil.ancho_h]),
+        "hora_cierre": sim.hora_cierre,
+        "mu": sim.mu,
+        "max_servers": sim.max_servers,
+        "umbral_up": sim.clases[0].umbral_up,
+        "tasa_abandono": 1.0 / sim.paciencia if sim.paciencia else 0.0,
+        "cola_max_balking": sim.cola_max_balking,
+        "spec_servicio": sim.flujo_servicio.spec,
+        "spec_llegadas": sim.flujo_llegadas.spec,
+    }
+
+
+def _lambda_acumulada(cfg, t):
+    ancho, tasas, acum = cfg["ancho_h"], cfg["tasas"], cfg["acumulada"]
+    i = np.clip((t // ancho).astype(np.int64), 0, len(tasas) - 1)
+    return np.where(t >= len(tasas) * ancho, acum[-1], acum[i] + tasas[i] * (t - i * ancho))
+
+
+def _invertir(cfg, objetivo):
+    ancho, tasas, acum = cfg["ancho_h"], cfg["tasas"], cfg["acumulada"]
+    # bisect_right saltea los tramos con tasa 0 (igual que PerfilDemanda.invertir)
+    i = np.clip(np.searchsorted(acum, objetivo, side="right") - 1, 0, len(tasas) - 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = i * ancho + (objetivo - acum[i]) / tasas[i]
+    t = np.where(objetivo >= acum[-1], np.inf, t)
+    return np.where(t <= cfg["hora_cierre"], t, np.inf) # Después del cierre no entra nadie
+
+
+def _residuales(spec, rng, transcurridos):
+    """Servicio restante de cada cliente en caja, condicionado a lo que ya lleva (rechazo)"""
+    if spec["tipo"] == "exponencial": # Sin memoria
+        return muestrear_bloque(spec, rng, transcurridos.shape)
+    total = muestrear_bloque(spec, rng, transcurridos.size).reshape(transcurridos.shape)
+    for _ in range(_INTENTOS_RESIDUAL):
+        malos = total <= transcurridos
+        if not malos.any(): break
+        total[malos] = muestrear_bloque(spec, rng, int(malos.sum()))
+    else:
+        # Colas muy improbables: se aproxima con un servicio nuevo completo
+        nuevos = muestrear_bloque(spec, rng, total.size).reshape(total.shape)
+        total = np.where(total <= transcurridos, transcurridos + nuevos, total)
+    return total - transcurridos
+
+
+def simular_espera(cfg, estado, replicas, semilla=None):
+    """Motor compacto: `replicas` continuaciones en paralelo (NumPy). Devuelve esperas en horas"""
+    rng = np.random.default_rng(semilla)
+    R, C = replicas, cfg["max_servers"]
+    t0 = estado.hora
+    fila = np.arange(R)
+    ocupados = len(estado.transcurridos)
+
+    libre = np.full((R, C), np.inf)
+    if ocupados:
+        libre[:, :ocupados] = t0 + _residuales(cfg["spec_servicio"], rng, np.tile(estado.transcurridos, (R, 1)))
+    libre[:, ocupados:estado.activos] = t0 # Prendidos y ociosos
+    n_activos = np.full(R, estado.activos)
+    delante = np.full(R, estado.cola)
+    detras = np.zeros(R, dtype=np.int64)
+
+    # El propio cliente marcado pasa por la regla de auto-scaling al llegar
+    ewt = estado.cola / (n_activos * cfg["mu"]) if estado.activos else np.full(R, np.inf)
+    sube = (ewt > cfg["umbral_up"]) & (n_activos < C)
+    libre[fila[sube], n_activos[sube]] = t0
+    n_activos += sube
+
+    espera = np.full(R, np.nan)
+    vivas = np.ones(R, dtype=bool)
+    t = np.full(R, t0)
+    proxima = _invertir(cfg, _lambda_acumulada(cfg, t) + muestrear_bloque(cfg["spec_llegadas"], rng, R))
+    limite = t0 + HORIZONTE_MAX_H
+    mu, umbral, tasa_ab = cfg["mu"], cfg["umbral_up"], cfg["tasa_abandono"]
+    balking = cfg["cola_max_balking"]
+
+    while vivas.any():
+        j = libre.argmin(axis=1)
+        t_srv = libre[fila, j]
+        t_ab = np.full(R, np.inf)
+        if tasa_ab:
+            en_fila = delante + detras
+            with np.errstate(divide="ignore"):
+                t_ab = t + rng.exponential(1.0, R) / (en_fila * tasa_ab)
+        t_sig = np.minimum(np.minimum(t_srv, proxima), t_ab)
+        t_sig[~vivas] = np.inf
+        censuradas = vivas & (t_sig > limite)
+        espera[censuradas] = HORIZONTE_MAX_H
+        vivas &= ~censuradas
+        t = np.where(vivas, t_sig, t)
+
+        # 1. Se libera un cajero
+        es_srv = vivas & (t_srv == t_sig)
+        atendido = es_srv & (delante == 0)
+        espera[atendido] = t[atendido] - t0
+        vivas &= ~atendido
+        toma = es_srv & (delante > 0)
+        delante -= toma
+        if toma.any():
+            libre[fila[toma], j[toma]] = t[toma] + muestrear_bloque(cfg["spec_servicio"], rng, int(toma.sum()))
+
+        # 2. Llega alguien (detrás del marcado)
+        llega = vivas & ~es_srv & (proxima == t_sig)
+        if llega.any():
+            cola = delante + 1 + detras
+            sube = llega & (cola / (n_activos * mu) > umbral) & (n_activos < C)
+            libre[fila[sube], n_activos[sube]] = t[sube]
+            n_activos += sube
+            entra = llega if balking is None else llega & (cola < balking)
+            detras += entra
+            nuevas = _invertir(cfg, _lambda_acumulada(cfg, t[llega]) +
+                               muestrear_bloque(cfg["spec_llegadas"], rng, int(llega.sum())))
+            proxima[llega] = nuevas
+
+        # 3. Alguien de la fila abandona (proporcional a cuántos hay adelante y atrás)
+        abandona = vivas & ~es_srv & ~llega & (t_ab == t_sig)
+        if abandona.any():
+            adelante = abandona & (rng.random(R) * (delante + detras) < delante)
+            delante -= adelante
+            detras -= abandona & ~adelante
+    return espera
+
+
+# --- Pool caliente ---
+
+_cfg_trabajador = None
+
+
+def _inicializar_trabajador(cfg):
+    global _cfg_trabajador
+    _cfg_trabajador = cfg
+    simular_espera(cfg, EstadoVivo(0.0, 0, activos=1), 8) # Calienta NumPy y el código
+
+
+def _bloque(estado, replicas, semilla):
+    return simular_espera(_cfg_trabajador, estado, replicas, semilla)
+
+
+class PronosticadorEspera:
+    def __init__(self, replicas=REPLICAS, max_procesos=None, **parametros):
+        """
+        parametros: los de SimulacionMaster (tasa_base, tasa_servicio, min_serv, max_serv, umbral_up,
+        umbral_down, paciencia_min, cola_max_balking, dist_servicio, dist_llegadas, perfil).
+        max_procesos: 1 = en el mismo proceso (la opción más rápida con pocos núcleos).
+        """
+        self.replicas = replicas
+        self.cfg = configuracion(SimulacionMaster(**parametros))
+        self.max_procesos = max_procesos or os.cpu_count() or 1
+        self._pool = None
+        self._semillas = np.random.SeedSequence(parametros.get("semilla"))
+        if self.max_procesos > 1:
+            contexto = mp.get_context("spawn")
+            self._pool = ProcessPoolExecutor(self.max_procesos, mp_context=contexto,
+                                             initializer=_inicializar_trabajador, initargs=(self.cfg,))
+            # Arranca y calienta todos los procesos ahora, no en el primer pronóstico
+            list(self._pool.map(_bloque, [EstadoVivo(0.0, 0, activos=1)] * self.max_procesos,
+                                [1] * self.max_procesos, range(self.max_procesos)))
+        else:
+            simular_espera(self.cfg, EstadoVivo(0.0, 0, activos=1), 8)
+
+    def predecir(self, estado, replicas=None):
+        """Distribución de la espera (minutos) de un cliente que llega en `estado`"""
+        t0 = time.perf_counter()
+        replicas = replicas or self.replicas
+        if self._pool is None:
+            esperas = simular_espera(self.cfg, estado, replicas, self._semillas.spawn(1)[0])
+        else:
+            partes = np.array_split(np.arange(replicas), self.max_procesos)
+            semillas = self._semillas.spawn(len(partes))
+            esperas = np.concatenate(list(self._pool.map(_bloque, [estado] * len(partes),
+                                                          [len(p) for p in partes], semillas)))
+        censuradas = int((esperas >= HORIZONTE_MAX_H).sum())
+        return PronosticoEspera(esperas * 60, censuradas, (time.perf_counter() - t0) * 1000)
+
+    def cerrar(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.cerrar()
+
+
+# --- ZONA DE PRUEBAS ---
+
+def _espera_en_motor(sim):
+    """Espera (min) de un cliente que llega ahora a `sim`, simulada con el motor completo"""
+    from motor_master import Cliente
+    # Las SALIDAS y los ABANDONOS ya están agendados en el checkpoint: se re-sortean
+    # (exponenciales, sin memoria) para comparar contra la misma incertidumbre que ve el pronóstico
+    for s in sim.servidores:
+        if s.ocupado:
+            sim.eventos.cancelar(s.evento_salida)
+            s.cliente_actual.hora_salida = sim.reloj + sim.flujo_servicio.siguiente()
+            s.evento_salida = sim.eventos.programar(s.cliente_actual.hora_salida, "SALIDA", s.id)
+    for cola in sim.colas_clientes:
+        for c in cola:
+            if c.evento_abandono is not None:
+                sim.eventos.cancelar(c.evento_abandono)
+                sim._programar_abandono(c)
+    marcado = Cliente(-1, sim.reloj)
+    sim._gestionar_auto_scaling(sim._calcular_ewt(0), 0)
+    sim._encolar(marcado)
+    sim.intentar_asignar()
+    sim.avanzar()
+    return (marcado.hora_inicio_atencion - marcado.hora_llegada) * 60
+
+
+if __name__ == "__main__":
+    # Validación: pausamos el motor completo, pronosticamos, y comparamos con la espera de un
+    # cliente que llega en ese mismo estado en 300 futuros distintos (ramas desde un checkpoint)
+    parametros = dict(tasa_base=150, tasa_servicio=20, min_serv=1, max_serv=15, umbral_up=15, umbral_down=3,
+                      paciencia_min=25, semilla=3)
+    with PronosticadorEspera(max_procesos=1, **parametros) as pronosticador:
+        for hora in [1.0, 3.5, 4.5, 6.5]:
+            sim = SimulacionMaster(**parametros)
+            sim.avanzar(hasta=hora)
+            estado = EstadoVivo.desde_simulacion(sim)
+            p = pronosticador.predecir(estado)
+            cp = sim.checkpoint()
+            reales = np.array([_espera_en_motor(SimulacionMaster.desde_checkpoint(cp, semilla=1000 + r))
+                               for r in range(300)])
+            print(f"{estado} -> {p}")
+            print(f"    motor completo: media={reales.mean():.1f} min, p50={np.quantile(reales, 0.5):.1f}, "
+                  f"p90={np.quantile(reales, 0.9):.1f} | heurística EWT: {sim._calcular_ewt() * 60:.1f} min")
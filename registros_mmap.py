@@ -0,0 +1,162 @@
+import os
+import struct
+
+import numpy as np
+
+# ==========================================
+# REGISTROS POR CLIENTE EN ARCHIVO MAPEADO (MMAP)
+# ==========================================
+# Para corridas que no entran en RAM (1e9 clientes): cada cliente se escribe directo
+# a un archivo mapeado en memoria y después se lee como np.memmap (análisis fuera de RAM).
+# El mismo formato lo escriben super_cpp.Simulador.correr(n, ruta) y SimulacionMaster(registros=...).
+#
+# FORMATO (little-endian, sin padding)
+#   Cabecera, 64 bytes:
+#     0   8 bytes  firma b"SIMCOLAS"
+#     8   uint32   versión (1)
+#     12  uint32   tamaño de registro en bytes (40)
+#     16  uint64   cantidad de registros
+#     24  40 bytes reservado (ceros)
+#   Registros, 40 bytes cada uno, desde el byte 64:
+#     0   int64    id del cliente (orden de llegada)
+#     8   float64  llegada  (horas)
+#     16  float64  inicio de atención (NaN si no lo atendieron)
+#     24  float64  salida: fin del servicio, o el momento en que se fue sin atenderse
+#     32  int32    servidor (>= 0) | SIN_ATENDER_ABANDONO (-1) | SIN_ATENDER_BALKING (-2)
+#     36  int32    cola al llegar (gente esperando delante, sin contar a los atendidos)
+#
+# Orden de los registros: super_cpp escribe en orden de llegada (id = posición);
+# SimulacionMaster escribe cuando el cliente se va (salida, abandono o balking).
+
+FIRMA = b"SIMCOLAS"
+VERSION = 1
+TAMANO_CABECERA = 64
+DTYPE_REGISTRO = np.dtype([
+    ("id", "<i8"), ("llegada", "<f8"), ("inicio", "<f8"), ("salida", "<f8"),
+    ("servidor", "<i4"), ("cola_al_llegar", "<i4"),
+])
+SIN_ATENDER_ABANDONO = -1
+SIN_ATENDER_BALKING = -2
+
+_CABECERA = struct.Struct("<8sIIQ40x")
+
+
+def _escribir_cabecera(archivo, n):
+    archivo.seek(0)
+    archivo.write(_CABECERA.pack(FIRMA, VERSION, DTYPE_REGISTRO.itemsize, n))
+
+
+def leer_cabecera(ruta):
+    """Cantidad de registros del archivo (valida firma, versión y tamaño de registro)"""
+    with open(ruta, "rb") as f:
+        firma, version, tamano, n = _CABECERA.unpack(f.read(TAMANO_CABECERA))
+    if firma != FIRMA:
+        raise ValueError(f"{ruta} no es un archivo de registros (firma {firma!r})")
+    if version != VERSION or tamano != DTYPE_REGISTRO.itemsize:
+        raise ValueError(f"{ruta}: versión {version} / registro de {tamano} bytes no soportados")
+    return n
+
+
+def leer_registros(ruta):
+    """np.memmap de solo lectura con DTYPE_REGISTRO (nada se carga en RAM hasta que se usa)"""
+    n = leer_cabecera(ruta)
+    if n == 0: return np.empty(0, dtype=DTYPE_REGISTRO)
+    return np.memmap(ruta, dtype=DTYPE_REGISTRO, mode="r", offset=TAMANO_CABECERA, shape=(n,))
+
+
+class EscritorRegistros:
+    """
+    Escritor en streaming para motores en Python: junta registros en un buffer chico
+    y los copia de a bloques al archivo mapeado, que crece al doble cuando se llena.
+    La cabecera se actualiza en cada bloque: si la corrida se corta, lo ya volcado se puede leer.
+    """
+
+    def __init__(self, ruta, capacidad=1 << 20, bloque=1 << 14):
+        self.ruta = os.fspath(ruta)
+        self.n = 0
+        self.bloque = bloque
+        self._buffer = []
+        self._archivo = open(self.ruta, "w+b")
+        _escribir_cabecera(self._archivo, 0)
+        self._mapear(max(capacidad, bloque))
+
+    def _mapear(self, capacidad):
+        self._archivo.truncate(TAMANO_CABECERA + capacidad * DTYPE_REGISTRO.itemsize)
+        self.capacidad = capacidad
+        self._mapa = np.memmap(self._archivo, dtype=DTYPE_REGISTRO, mode="r+",
+                               offset=TAMANO_CABECERA, shape=(capacidad,))
+
+    def agregar(self, id_cliente, llegada, inicio, salida, servidor, cola_al_llegar):
+        self._buffer.append((id_cliente, llegada, inicio, salida, servidor, cola_al_llegar))
+        if len(self._buffer) >= self.bloque: self.volcar()
+
+    def volcar(self):
+        """Pasa el buffer al archivo mapeado y actualiza la cabecera"""
+        if not self._buffer: return
+        k = len(self._buffer)
+        if self.n + k > self.capacidad:
+            self._mapa.flush()
+            del self._mapa
+            self._mapear(max(2 * self.capacidad, self.n + k))
+        self._mapa[self.n:self.n + k] = np.array(self._buffer, dtype=DTYPE_REGISTRO)
+        self.n += k
+        self._buffer.clear()
+        _escribir_cabecera(self._archivo, self.n)
+
+    def cerrar(self):
+        """Vuelca lo pendiente y recorta el archivo al tamaño exacto. Devuelve la ruta"""
+        if self._archivo.closed: return self.ruta
+        self.volcar()
+        self._mapa.flush()
+        del self._mapa
+        self._archivo.truncate(TAMANO_CABECERA + self.n * DTYPE_REGISTRO.itemsize)
+        self._archivo.close()
+        return self.ruta
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+# --- ZONA DE PRUEBAS ---
+
+if __name__ == "__main__":
+    import tempfile
+    import time
+
+    from motor_master import SimulacionMaster
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "master.reg")
+        sim = SimulacionMaster(150, 20, 1, 15, 15, 3, paciencia_min=20, cola_max_balking=40,
+                               semilla=42, registros=ruta)
+        df_clientes, _, _ = sim.correr()
+        reg = leer_registros(ruta)
+        atendidos = reg[reg["servidor"] >= 0]
+        print(f"SimulacionMaster: {len(reg)} registros ({len(atendidos)} atendidos, "
+              f"{(reg['servidor'] == SIN_ATENDER_ABANDONO).sum()} abandonos, "
+              f"{(reg['servidor'] == SIN_ATENDER_BALKING).sum()} balking) | "
+              f"espera media {((atendidos['inicio'] - atendidos['llegada']).mean() * 60):.3f} min "
+              f"vs df_clientes {df_clientes['Espera_Real_Min'].mean():.3f} min")
+
+        try:
+            import super_cpp
+        except ImportError:
+            super_cpp = None
+        if super_cpp is not None:
+            ruta = os.path.join(directorio, "mm1.reg")
+            n = 20_000_000
+            t0 = time.perf_counter()
+            res = super_cpp.Simulador(9.0, 10.0).correr(n, ruta)
+            segundos = time.perf_counter() - t0
+            reg = leer_registros(ruta)
+            # Análisis fuera de RAM: de a bloques sobre el memmap
+            suma = 0.0
+            for i in range(0, len(reg), 1 << 22):
+                b = reg[i:i + (1 << 22)]
+                suma += (b["inicio"] - b["llegada"]).sum()
+            print(f"super_cpp: {n:,} clientes a {os.path.getsize(ruta) / 2**20:.0f} MB en {segundos:.1f} s | "
+                  f"espera media {suma / len(reg):.4f} h (motor: {res.avg_wait:.4f} h, teoría 0.9) | "
+                  f"cola máx. al llegar {reg['cola_al_llegar'].max()}")
@@ -0,0 +1,138 @@
+import heapq
+
+# ==========================================
+# RUTEO CON CAJEROS HETEROGÉNEOS (VELOCIDAD Y HABILIDADES)
+# ==========================================
+# Cada cajero atiende un subconjunto de clases (habilidades) a su propia tasa.
+# IndiceServidores guarda los cajeros disponibles en un heap por clase, ordenados por la
+# política de ruteo; un cajero con 3 habilidades está en 3 heaps a la vez. Sacarlo de uno
+# deja lápidas en los otros (versión vieja) que se descartan al llegar a la cima, igual que
+# las lápidas de la fila en SimulacionMaster: O(h log n) por alta/baja con h habilidades.
+#
+#   mas_rapido    el de mayor tasa (empate: ID más bajo)
+#   mas_ocioso    el que lleva más tiempo libre (reparte la carga)
+#   especialista  el que sabe menos cosas (guarda a los polivalentes); empate: el más rápido
+#
+# La misma estructura indexa a los cajeros apagados (clave = ID) para que el auto-scaling
+# prenda a alguien que sepa atender a la clase que se está demorando.
+
+RUTEOS = ("mas_rapido", "mas_ocioso", "especialista")
+
+
+def clave_estatica(ruteo, tasa, n_habilidades):
+    """Clave fija de un cajero (menor = se elige primero); mas_ocioso usa la hora en que quedó libre"""
+    if ruteo == "mas_rapido": return -tasa
+    if ruteo == "especialista": return n_habilidades * 1e9 - tasa
+    if ruteo == "mas_ocioso": return None
+    raise ValueError(f"Ruteo desconocido: {ruteo!r} (opciones: {', '.join(RUTEOS)})")
+
+
+class IndiceServidores:
+    def __init__(self, habilidades, n_clases, sacar_peor=True):
+        """
+        habilidades: por cajero, la tupla de clases (índices) que atiende.
+        sacar_peor: pop() devuelve el de clave más alta (apagar al menos valioso) o la más baja.
+        """
+        self.habilidades = habilidades
+        self.sacar_peor = sacar_peor
+        self._heaps = [[] for _ in range(n_clases)]
+        self._todos = []
+        self._version = [0] * len(habilidades)
+        self.por_clase = [0] * n_clases
+        # Bit k encendido <=> hay al menos un cajero disponible que atiende la clase k
+        self.mascara = 0
+        self._n = 0
+
+    def __len__(self):
+        return self._n
+
+    def __bool__(self):
+        return self._n > 0
+
+    def agregar(self, i, clave):
+        v = self._version[i] = self._version[i] + 1
+        self._n += 1
+        for k in self.habilidades[i]:
+            heap = self._heaps[k]
+            heapq.heappush(heap, (clave, i, v))
+            self.por_clase[k] += 1
+            self.mascara |= 1 << k
+            if len(heap) > 2 * self.por_clase[k] + 32: self._compactar(heap)
+        heapq.heappush(self._todos, (-clave if self.sacar_peor else clave, i, v))
+        if len(self._todos) > 2 * self._n + 32: self._compactar(self._todos)
+
+    def _compactar(self, heap):
+        # Demasiadas lápidas (el cajero salió por otro heap): se reconstruye con los vigentes
+        heap[:] = [e for e in heap if e[2] == self._version[e[1]]]
+        heapq.heapify(heap)
+
+    def _quitar(self, i):
+        self._version[i] += 1 # Todas sus entradas pasan a ser lápidas
+        self._n -= 1
+        for k in self.habilidades[i]:
+            self.por_clase[k] -= 1
+            if not self.por_clase[k]:
+                self._heaps[k].clear() # Solo quedaban lápidas
+                self.mascara &= ~(1 << k)
+        if not self._n: self._todos.clear()
+
+    def _sacar_de(self, heap):
+        version = self._version
+        while True:
+            _, i, v = heapq.heappop(heap)
+            if v == version[i]:
+                self._quitar(i)
+                return i
+
+    def tomar(self, clase):
+        """El mejor cajero disponible que atiende `clase` (precondición: por_clase[clase] > 0)"""
+        return self._sacar_de(self._heaps[clase])
+
+    def quitar(self, i):
+        """Saca a un cajero puntual (precondición: está disponible)"""
+        self._quitar(i)
+
+    def ver(self):
+        """El cajero que devolvería pop(), sin sacarlo"""
+        heap, version = self._todos, self._version
+        while heap[0][2] != version[heap[0][1]]:
+            heapq.heappop(heap)
+        return heap[0][1]
+
+    def pop(self):
+        """Cualquier cajero disponible (según sacar_peor), sin mirar habilidades"""
+        return self._sacar_de(self._todos)
+
+
+# --- ZONA DE PRUEBAS ---
+
+if __name__ == "__main__":
+    import time
+
+    import numpy as np
+
+    from motor_master import ClaseCliente, PerfilCajero, SimulacionMaster
+
+    # Sucursal mixta: 4 senior (rápidos, todo), 6 junior (solo caja), 3 mesas de créditos
+    clases = [ClaseCliente("Caja", 0.85, 10), ClaseCliente("Creditos", 0.15, 20)]
+    cajeros = ([PerfilCajero(30) for _ in range(4)] + [PerfilCajero(15, ["Caja"]) for _ in range(6)]
+               + [PerfilCajero(10, ["Creditos"]) for _ in range(3)])
+    for ruteo in RUTEOS:
+        sim = SimulacionMaster(150, 20, 10, 13, 10, 3, clases=clases, cajeros=cajeros, ruteo=ruteo, semilla=42)
+        df_clientes, _, df_servidores = sim.correr()
+        espera = df_clientes.groupby("Clase")["Espera_Real_Min"].mean().round(1).to_dict()
+        uso = df_servidores.groupby("Habilidades")["Horas_Trabajadas"].sum().round(1).to_dict()
+        print(f"{ruteo:<13} espera {espera} | horas trabajadas {uso}")
+
+    # Costo por evento con 120 cajeros y 12 tipos de cliente (3 habilidades cada uno)
+    rng = np.random.default_rng(0)
+    clases = [ClaseCliente(f"Tipo{k}", 1, 15) for k in range(12)]
+    cajeros = [PerfilCajero(float(rng.uniform(10, 30)), [f"Tipo{k}" for k in rng.choice(12, 3, replace=False)])
+               for _ in range(120)]
+    for ruteo in RUTEOS:
+        sim = SimulacionMaster(2000, 20, 60, 120, 15, 3, clases=clases, cajeros=cajeros, ruteo=ruteo,
+                               semilla=1, solo_agregados=True)
+        t0 = time.perf_counter()
+        kpis = sim.correr()
+        print(f"{ruteo:<13} 120 cajeros / 12 tipos: {kpis['Eventos'] / (time.perf_counter() - t0):,.0f} eventos/s | "
+              f"espera media {kpis['Espera_Media_Min']:.1f} min")
@@ -0,0 +1,180 @@
+import math
+import multiprocessing as mp
+import os
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from barrido import correr_kpis
+
+# ==========================================
+# RANKING & SELECCIÓN (OCBA): LA MEJOR POLÍTICA CON POCAS RÉPLICAS
+# ==========================================
+# Entre un puñado de configuraciones de escalado candidatas, repartir las réplicas en
+# partes iguales gasta casi todo en las que ya se sabe que pierden. OCBA (Optimal
+# Computing Budget Allocation, Chen et al.) reparte cada tanda según
+#
+#   N_i / N_j = (s_i / d_i)^2 / (s_j / d_j)^2          candidatas i, j que no son la mejor b
+#   N_b       = s_b * sqrt(sum_i N_i^2 / s_i^2)
+#
+# con d_i = |media_i - media_b|: más réplicas a las que están cerca de la mejor o son ruidosas.
+# Se frena cuando la probabilidad aproximada de selección correcta (cota de Bonferroni)
+#
+#   PCS >= 1 - sum_i Phi(-d_i / sqrt(s_b^2 / n_b + s_i^2 / n_i))
+#
+# llega al objetivo. `diferencia_minima` es la zona de indiferencia: dos candidatas a
+# menos de eso se consideran igual de buenas (si no, un empate exacto no termina nunca).
+#
+# Cada tanda corre en paralelo (barrido.correr_kpis, solo agregados). La réplica r usa la
+# misma semilla en todas las candidatas (números aleatorios comunes): la PCS de arriba
+# supone independencia, así que con correlación positiva queda del lado conservador.
+
+
+def _semilla(semilla, replica):
+    # Semilla de la réplica r sin fijar de antemano cuántas habrá
+    return int(np.random.SeedSequence([semilla, replica]).generate_state(1)[0])
+
+
+def pcs_aproximada(medias, desvios, replicas, mejor, diferencia_minima=0.0):
+    """Cota inferior (Bonferroni) de la probabilidad de que `mejor` sea realmente la mejor"""
+    phi = NormalDist().cdf
+    pcs = 1.0
+    for i in range(len(medias)):
+        if i == mejor: continue
+        d = max(abs(medias[i] - medias[mejor]), diferencia_minima)
+        error = math.sqrt(desvios[mejor] ** 2 / replicas[mejor] + desvios[i] ** 2 / replicas[i])
+        pcs -= phi(-d / error) if error > 0 else (0.0 if d > 0 else 0.5)
+    return pcs
+
+
+def asignacion_ocba(medias, desvios, mejor, total, diferencia_minima=0.0):
+    """Réplicas ideales por candidata (fraccionarias) para un presupuesto `total`"""
+    k = len(medias)
+    s = np.maximum(np.asarray(desvios, dtype=np.float64), 1e-12)
+    d = np.maximum(np.abs(np.asarray(medias, dtype=np.float64) - medias[mejor]), max(diferencia_minima, 1e-12))
+    pesos = (s / d) ** 2
+    otros = np.arange(k) != mejor
+    pesos[mejor] = s[mejor] * math.sqrt(np.sum(pesos[otros] ** 2 / s[otros] ** 2))
+    return total * pesos / pesos.sum()
+
+
+class ResultadoSeleccion:
+    def __init__(self, tabla, mejor, pcs, historia, candidatos):
+        self.tabla = tabla             # DataFrame por candidata (réplicas, media, desvío)
+        self.mejor = mejor             # Índice de la candidata elegida
+        self.pcs = pcs                 # PCS aproximada al frenar
+        self.historia = historia       # [(réplicas totales, PCS)] por tanda
+        self.candidatos = candidatos
+
+    @property
+    def parametros(self):
+        return self.candidatos[self.mejor]
+
+    @property
+    def replicas(self):
+        return int(self.tabla["Replicas"].sum())
+
+    def __repr__(self):
+        return (f"ResultadoSeleccion(mejor={self.mejor} {self.parametros}, PCS={self.pcs:.3f}, "
+                f"{self.replicas} réplicas en {len(self.historia)} tandas)")
+
+
+def seleccionar_mejor(candidatos, base, objetivo="Espera_Media_Min", minimizar=True, pcs=0.95,
+                      replicas_iniciales=5, tanda=None, max_replicas=2000, diferencia_minima=0.0,
+                      semilla=0, max_procesos=None):
+    """
+    candidatos: lista de dicts con los parámetros que cambian (ej: {"umbral_up": 10, "umbral_down": 3}).
+    base: parámetros comunes de SimulacionMaster (tasa_base, tasa_servicio, min_serv, ...).
+    objetivo: KPI de SimulacionMaster.indicadores() o función kpis -> float (ej: costo de cajeros + espera).
+    tanda: réplicas nuevas por iteración (por defecto, una por candidata o lo que entre en el pool).
+    Frena al llegar a `pcs` o al gastar `max_replicas` en total.
+    """
+    if len(candidatos) < 2:
+        raise ValueError("Se necesitan al menos 2 candidatas")
+    if replicas_iniciales < 2:
+        raise ValueError("replicas_iniciales debe ser al menos 2 (para estimar el desvío)")
+    medir = objetivo if callable(objetivo) else (lambda kpis: kpis[objetivo])
+    signo = 1.0 if minimizar else -1.0
+    k = len(candidatos)
+    max_procesos = max_procesos or os.cpu_count() or 1
+    tanda = tanda or max(k, max_procesos)
+    valores = [[] for _ in range(k)]
+    historia = []
+    pool = ProcessPoolExecutor(max_procesos, mp_context=mp.get_context("spawn")) if max_procesos > 1 else None
+
+    def correr(pedidos):
+        # pedidos: índice de candidata por réplica nueva; la semilla es la próxima de esa candidata
+        siguientes = [len(v) for v in valores]
+        tareas = []
+        for i in pedidos:
+            tareas.append({**base, **candidatos[i], "semilla": _semilla(semilla, siguientes[i])})
+            siguientes[i] += 1
+        resultados = pool.map(correr_kpis, tareas) if pool is not None else map(correr_kpis, tareas)
+        for i, kpis in zip(pedidos, resultados):
+            valores[i].append(signo * medir(kpis))
+
+    try:
+        correr([i for i in range(k) for _ in range(replicas_iniciales)])
+        while True:
+            n = np.array([len(v) for v in valores])
+            medias = np.array([np.mean(v) for v in valores])
+            desvios = np.array([np.std(v, ddof=1) for v in valores])
+            mejor = int(np.argmin(medias))
+            actual = pcs_aproximada(medias, desvios, n, mejor, diferencia_minima)
+            historia.append((int(n.sum()), actual))
+            if actual >= pcs or n.sum() >= max_replicas: break
+            # Réplicas nuevas: lo que le falta a cada una para la asignación ideal con el nuevo total
+            presupuesto = min(tanda, max_replicas - int(n.sum()))
+            ideal = asignacion_ocba(medias, desvios, mejor, n.sum() + presupuesto, diferencia_minima)
+            faltan = np.maximum(ideal - n, 0)
+            if faltan.sum() <= 0: faltan[mejor] = 1.0
+            pedidos = np.floor(faltan / faltan.sum() * presupuesto).astype(int)
+            # Lo que se pierde al redondear va a las más postergadas
+            for i in np.argsort(-(faltan / faltan.sum() * presupuesto - pedidos))[:presupuesto - pedidos.sum()]:
+                pedidos[i] += 1
+            correr([i for i in range(k) for _ in range(pedidos[i])])
+    finally:
+        if pool is not None: pool.shutdown()
+
+    variables = sorted({clave for c in candidatos for clave in c})
+    tabla = pd.DataFrame([{**{v: c.get(v) for v in variables}} for c in candidatos])
+    tabla["Replicas"] = n
+    tabla["Media"] = signo * medias
+    tabla["Desvio"] = desvios
+    tabla["Error_Std"] = desvios / np.sqrt(n)
+    tabla["Mejor"] = np.arange(k) == mejor
+    return ResultadoSeleccion(tabla, mejor, actual, historia, candidatos)
+
+
+# --- ZONA DE PRUEBAS ---
+
+if __name__ == "__main__":
+    import time
+
+    base = {"tasa_base": 150, "tasa_servicio": 20, "max_serv": 15, "umbral_down": 3}
+    candidatos = [{"min_serv": m, "umbral_up": up} for m, up in
+                  [(1, 6), (3, 6), (1, 10), (3, 10), (6, 6), (1, 15)]]
+
+    # Costo del día: horas-cajero + horas de espera de los clientes (20 horas de espera = 1 hora-cajero)
+    def costo(kpis):
+        return kpis["Horas_Cajero"] + kpis["Atendidos"] * kpis["Espera_Media_Min"] / 1200
+
+    t0 = time.perf_counter()
+    res = seleccionar_mejor(candidatos, base, objetivo=costo, pcs=0.95, diferencia_minima=0.5)
+    print(f"OCBA: {res} en {time.perf_counter() - t0:.1f} s")
+    print(res.tabla.round(2).to_string(index=False))
+
+    # Comparación: réplicas iguales para todas hasta la misma PCS
+    n = 5
+    valores = [[costo(correr_kpis({**base, **c, "semilla": _semilla(0, r)})) for r in range(n)] for c in candidatos]
+    while True:
+        medias = np.array([np.mean(v) for v in valores])
+        desvios = np.array([np.std(v, ddof=1) for v in valores])
+        mejor = int(np.argmin(medias))
+        if pcs_aproximada(medias, desvios, [n] * len(candidatos), mejor, 0.5) >= 0.95 or n >= 300: break
+        for c, v in zip(candidatos, valores):
+            v.append(costo(correr_kpis({**base, **c, "semilla": _semilla(0, n)})))
+        n += 1
+    print(f"Réplicas iguales: {n * len(candidatos)} réplicas (mejor = {mejor}) vs OCBA {res.replicas}")
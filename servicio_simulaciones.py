@@ -0,0 +1,229 @@
+import asyncio
+import hashlib
+import json
+import multiprocessing as mp
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+
+import numpy as np
+
+# ==========================================
+# SERVICIO LOCAL DE SIMULACIONES
+# ==========================================
+# Los dashboards no corren el DES en el hilo del script de Streamlit: le piden
+# el trabajo a este servicio y esperan el resultado por su 'handle'.
+#
+#   front-end: loop de asyncio en un hilo propio (recibe pedidos, deduplica, limita)
+#   back-end:  ProcessPoolExecutor (los DES corren en paralelo, sin el GIL)
+#
+# - Deduplicación: dos pedidos idénticos (misma tarea + mismos parámetros) mientras
+#   el primero sigue en curso reciben el MISMO trabajo. Con semilla fija el resultado
+#   también se reutiliza después de terminado (es determinístico).
+# - Límite de concurrencia: a lo sumo max_concurrentes trabajos corriendo, el resto espera en cola.
+# - Progreso: los procesos reportan la fracción simulada por una multiprocessing.Queue.
+# Todo local: procesos del mismo equipo, sin red.
+
+ESTADOS = ("en cola", "corriendo", "listo", "error")
+
+
+# --- Lado del proceso trabajador ---
+
+_cola_progreso = None
+
+
+def _inicializar_trabajador(cola):
+    global _cola_progreso
+    _cola_progreso = cola
+
+
+def tarea_dia_master(progreso, **parametros):
+    """Un día de SimulacionMaster. Devuelve (df_clientes, df_sistema, df_servidores, resumen)"""
+    from motor_master import SimulacionMaster
+    sim = SimulacionMaster(**parametros)
+    df_clientes, df_sistema, df_servidores = sim.correr(progreso=progreso)
+    if sim.estadisticas is not None:
+        sim.estadisticas.perfil = None # pstats.Stats no viaja entre procesos
+    return df_clientes, df_sistema, df_servidores, sim.resumen()
+
+
+def tarea_kpis_master(progreso, **parametros):
+    """Un día de SimulacionMaster en modo solo agregados (barridos): dict de KPIs, sin DataFrames"""
+    from motor_master import SimulacionMaster
+    return SimulacionMaster(solo_agregados=True, **parametros).correr(progreso=progreso)
+
+
+# Tareas que el servicio sabe correr (nombre -> función a nivel de módulo, picklable)
+TAREAS = {
+    "dia_master": tarea_dia_master,
+    "kpis_master": tarea_kpis_master,
+}
+
+
+def _ejecutar(id_trabajo, tarea, parametros):
+    cola = _cola_progreso
+    ultimo = [0.0]
+
+    def progreso(fraccion):
+        # Solo avisamos cada 1% para no inundar la cola
+        if fraccion - ultimo[0] >= 0.01:
+            ultimo[0] = fraccion
+            cola.put((id_trabajo, fraccion))
+    return TAREAS[tarea](progreso, **parametros)
+
+
+# --- Identidad de un pedido ---
+
+def _canonico(valor):
+    """Convierte parámetros (objetos, arrays, specs) a algo JSON-estable para hashear"""
+    if isinstance(valor, np.ndarray):
+        return {"__ndarray__": hashlib.sha1(np.ascontiguousarray(valor).tobytes()).hexdigest(),
+                "dtype": str(valor.dtype), "shape": valor.shape}
+    if hasattr(valor, "clave_cache"):
+        # Objetos que leen de disco (ej: trazas.TrazaLlegadas): el contenido del archivo es parte de la clave
+        return {"__clase__": type(valor).__name__, **valor.clave_cache()}
+    if hasattr(valor, "__dict__"):
+        return {"__clase__": type(valor).__name__, **vars(valor)}
+    return repr(valor)
+
+
+def clave_trabajo(tarea, parametros):
+    texto = json.dumps([tarea, parametros], sort_keys=True, default=_canonico)
+    return hashlib.sha1(texto.encode()).hexdigest()[:16]
+
+
+# --- Handle ---
+
+class Trabajo:
+    """Handle de un pedido. Se puede compartir entre sesiones (deduplicación)"""
+
+    def __init__(self, id_trabajo, tarea, parametros):
+        self.id = id_trabajo
+        self.tarea = tarea
+        self.parametros = parametros
+        self.estado = "en cola"
+        self.progreso = 0.0
+        self.pedidos = 1 # Cuántos pedidos idénticos comparten este trabajo
+        self.creado = time.time()
+        self.inicio = None
+        self.fin = None
+        self._futuro = Future()
+
+    def terminado(self):
+        return self._futuro.done()
+
+    def resultado(self, timeout=None):
+        """Bloquea hasta que termine (relanza la excepción del trabajador si falló)"""
+        return self._futuro.result(timeout)
+
+    async def esperar(self):
+        return await asyncio.wrap_future(self._futuro)
+
+    @property
+    def segundos(self):
+        if self.inicio is None: return 0.0
+        return (self.fin or time.time()) - self.inicio
+
+    def __repr__(self):
+        return f"Trabajo({self.id}, {self.tarea}, {self.estado}, {self.progreso:.0%}, pedidos={self.pedidos})"
+
+
+# --- Servicio ---
+
+class ServicioSimulaciones:
+    def __init__(self, max_procesos=None, max_concurrentes=None, max_resultados=32):
+        self.max_procesos = max_procesos or os.cpu_count() or 1
+        self.max_concurrentes = max_concurrentes or self.max_procesos
+        self.max_resultados = max_resultados # Trabajos terminados que se conservan (para consultar por id)
+
+        # spawn: los trabajadores no heredan los hilos de Streamlit (fork + hilos = bloqueos)
+        contexto = mp.get_context("spawn")
+        self._cola_progreso = contexto.Queue()
+        self._pool = ProcessPoolExecutor(self.max_procesos, mp_context=contexto,
+                                         initializer=_inicializar_trabajador,
+                                         initargs=(self._cola_progreso,))
+        self._trabajos = OrderedDict() # id -> Trabajo (en curso + últimos terminados)
+
+        self._loop = asyncio.new_event_loop()
+        self._semaforo = asyncio.Semaphore(self.max_concurrentes)
+        threading.Thread(target=self._loop.run_forever, name="servicio-simulaciones", daemon=True).start()
+        threading.Thread(target=self._leer_progreso, name="servicio-progreso", daemon=True).start()
+
+    # --- Front-end asyncio ---
+
+    async def enviar_async(self, tarea, **parametros):
+        """Pide un trabajo y devuelve su handle (el existente si ya hay uno idéntico)"""
+        if tarea not in TAREAS:
+            raise ValueError(f"Tarea desconocida: {tarea!r} (opciones: {', '.join(TAREAS)})")
+        clave = clave_trabajo(tarea, parametros)
+        trabajo = self._trabajos.get(clave)
+        if trabajo is not None and self._reutilizable(trabajo):
+            trabajo.pedidos += 1
+            return trabajo
+
+        trabajo = Trabajo(clave, tarea, parametros)
+        self._trabajos[clave] = trabajo
+        self._trabajos.move_to_end(clave)
+        asyncio.ensure_future(self._correr(trabajo))
+        return trabajo
+
+    def _reutilizable(self, trabajo):
+        if not trabajo.terminado(): return True # En curso: siempre se comparte
+        if trabajo.estado == "error": return False
+        # Terminado: solo si el resultado es reproducible (semilla fija)
+        return trabajo.parametros.get("semilla") is not None
+
+    async def _correr(self, trabajo):
+        async with self._semaforo:
+            trabajo.estado = "corriendo"
+            trabajo.inicio = time.time()
+            try:
+                resultado = await self._loop.run_in_executor(
+                    self._pool, _ejecutar, trabajo.id, trabajo.tarea, trabajo.parametros)
+            except Exception as error:
+                trabajo.fin = time.time()
+                trabajo.estado = "error"
+                trabajo._futuro.set_exception(error)
+            else:
+                trabajo.fin = time.time()
+                trabajo.estado = "listo"
+                trabajo.progreso = 1.0
+                trabajo._futuro.set_result(resultado)
+        self._podar()
+
+    def _podar(self):
+        terminados = [k for k, t in self._trabajos.items() if t.terminado()]
+        for clave in terminados[:max(len(terminados) - self.max_resultados, 0)]:
+            del self._trabajos[clave]
+
+    def _leer_progreso(self):
+        while True:
+            try:
+                id_trabajo, fraccion = self._cola_progreso.get()
+            except (EOFError, OSError, ValueError):
+                return # Servicio cerrado
+            trabajo = self._trabajos.get(id_trabajo)
+            if trabajo is not None and not trabajo.terminado():
+                trabajo.progreso = fraccion
+
+    # --- API sincrónica (para los scripts de Streamlit) ---
+
+    def enviar(self, tarea, **parametros):
+        return asyncio.run_coroutine_threadsafe(self.enviar_async(tarea, **parametros), self._loop).result()
+
+    def trabajo(self, id_trabajo):
+        """Handle de un trabajo por id (None si no existe o ya se descartó)"""
+        return self._trabajos.get(id_trabajo)
+
+    def trabajos(self):
+        return list(self._trabajos.values())
+
+    def en_curso(self):
+        return sum(1 for t in self._trabajos.values() if not t.terminado())
+
+    def cerrar(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._cola_progreso.close()
@@ -1,8 +1,9 @@
 import heapq
-import random
 from collections import deque
 import math
 
+from distribuciones import crear_flujo, semillas_independientes
+
 # --- ESTRUCTURAS DE DATOS ---
 
 class Cliente:
@@ -33,7 +34,10 @@ class SimulacionBancoInteligente:
                  min_servidores=1, 
                  max_servidores=10,
                  umbral_activar_min=15.0,   # Si espera > 15 min -> Activar
-                 umbral_desactivar_min=5.0  # Si espera < 5 min -> Desactivar
+                 umbral_desactivar_min=5.0, # Si espera < 5 min -> Desactivar
+                 dist_servicio=None,        # Spec de distribuciones.py (default: exponencial)
+                 dist_llegadas=None,
+                 semilla=None
                  ):
         
         # Parámetros (No hardcodeados)
@@ -44,6 +48,11 @@ class SimulacionBancoInteligente:
         self.umbral_up = umbral_activar_min / 60.0   # Convertir a horas
         self.umbral_down = umbral_desactivar_min / 60.0 # Convertir a horas
         
+        # Variables aleatorias pre-generadas en bloques (una llamada a NumPy cada miles de eventos)
+        s_lleg, s_serv = semillas_independientes(semilla, 2)
+        self.flujo_llegadas = crear_flujo(dist_llegadas, s_lleg, media=1.0 / self.lambd)
+        self.flujo_servicio = crear_flujo(dist_servicio, s_serv, media_por_defecto=1.0 / self.mu)
+        
         # Estado del Sistema
         self.reloj = 0.0
         self.cola_clientes = deque()
@@ -101,8 +110,8 @@ class SimulacionBancoInteligente:
                     return
 
     def programar_llegada(self):
-        # Generar próxima llegada (distribución exponencial)
-        tiempo_hasta_proximo = random.expovariate(self.lambd)
+        # Generar próxima llegada (exponencial por defecto)
+        tiempo_hasta_proximo = self.flujo_llegadas.siguiente()
         proxima_llegada = self.reloj + tiempo_hasta_proximo
         heapq.heappush(self.eventos, (proxima_llegada, "LLEGADA", None))
 
@@ -185,7 +194,7 @@ class SimulacionBancoInteligente:
             cliente.hora_inicio_atencion = self.reloj
             
             # Generar tiempo de servicio
-            duracion = random.expovariate(self.mu)
+            duracion = self.flujo_servicio.siguiente()
             cliente.hora_salida = self.reloj + duracion
             candidato.tiempo_fin_servicio = cliente.hora_salida
             
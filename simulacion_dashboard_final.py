@@ -1,12 +1,14 @@
 import streamlit as st
 import heapq
-import random
 from collections import deque
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
 
+from distribuciones import crear_flujo, semillas_independientes
+from exportacion import boton_descarga, selector_formato
+
 # Configuración inicial
 st.set_page_config(page_title="Simulador Bancario - Analytics", layout="wide")
 
@@ -40,13 +42,18 @@ class Servidor:
         self.tiempo_acumulado_trabajando = 0.0
 
 class SimulacionMaster:
-    def __init__(self, tasa_base, tasa_servicio, min_serv, max_serv, umbral_up, umbral_down):
+    def __init__(self, tasa_base, tasa_servicio, min_serv, max_serv, umbral_up, umbral_down, semilla=None):
         self.tasa_base = tasa_base
         self.mu = tasa_servicio
         self.min_servers = min_serv
         self.max_servers = max_serv
         self.umbral_up = umbral_up / 60.0
         self.umbral_down = umbral_down / 60.0
+
+        # Variables aleatorias pre-generadas en bloques (distribuciones.py): una llamada a NumPy cada miles de eventos
+        s_lleg, s_serv = semillas_independientes(semilla, 2)
+        self.flujo_llegadas = crear_flujo(None, s_lleg, media=1.0)
+        self.flujo_servicio = crear_flujo(None, s_serv, media_por_defecto=1.0 / self.mu)
         
         self.reloj = 0.0
         self.cola_clientes = deque()
@@ -106,6 +113,7 @@ class SimulacionMaster:
         # UI: Barra de progreso vacía al inicio
         progress_bar = st.progress(0)
         
+        eventos_procesados = 0
         while self.eventos:
             tiempo_evento, tipo, data = heapq.heappop(self.eventos)
             
@@ -134,7 +142,8 @@ class SimulacionMaster:
                 if not self.cola_clientes: self._gestionar_auto_scaling(0.0)
                 self._registrar_snapshot()
             
-            if random.random() < 0.05:
+            eventos_procesados += 1
+            if not eventos_procesados % 20:
                 progress_bar.progress(min(self.reloj / 8.0, 1.0))
         
         progress_bar.empty()
@@ -143,7 +152,7 @@ class SimulacionMaster:
     def _programar_llegada(self):
         tasa = self._get_tasa_actual()
         if tasa <= 0: return
-        tiempo = random.expovariate(tasa)
+        tiempo = self.flujo_llegadas.siguiente() / tasa # Exp(1) escalada por la tasa del momento
         if self.reloj + tiempo <= 8.0:
             heapq.heappush(self.eventos, (self.reloj + tiempo, "LLEGADA", None))
 
@@ -154,7 +163,7 @@ class SimulacionMaster:
             cliente = self.cola_clientes.popleft()
             candidato.ocupado = True
             cliente.hora_inicio_atencion = self.reloj
-            duracion = random.expovariate(self.mu)
+            duracion = self.flujo_servicio.siguiente()
             
             candidato.tiempo_acumulado_trabajando += duracion
             
@@ -329,23 +338,12 @@ if results:
         st.subheader("Descarga de Datos")
         st.info("Ahora puedes descargar sin que desaparezca el dashboard.")
         
+        # Generación diferida: el archivo se escribe recién cuando se hace clic
+        formato = selector_formato(st, key="formato_final")
         col1, col2 = st.columns(2)
         
-        csv_master = df_master.to_csv().encode('utf-8')
-        col1.download_button(
-            "📥 Descargar Serie Temporal (CSV)", 
-            csv_master, 
-            "serie_tiempo_completa.csv", 
-            "text/csv"
-        )
-        
-        csv_clientes = df_clientes.to_csv().encode('utf-8')
-        col2.download_button(
-            "📥 Descargar Clientes Raw (CSV)", 
-            csv_clientes, 
-            "clientes_raw.csv", 
-            "text/csv"
-        )
+        boton_descarga(col1, "📥 Descargar Serie Temporal", df_master, "serie_tiempo_completa", formato)
+        boton_descarga(col2, "📥 Descargar Clientes Raw", df_clientes, "clientes_raw", formato)
         
         st.dataframe(df_master.head(10))
 
@@ -1,12 +1,13 @@
 import streamlit as st
 import heapq
-import random
 from collections import deque
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
 
+from distribuciones import crear_flujo, semillas_independientes
+
 # ==========================================
 # 1. CLASES Y LÓGICA (BACKEND)
 # ==========================================
@@ -38,13 +39,18 @@ class Servidor:
         self.tiempo_acumulado_trabajando = 0.0 # Ocupado atendiendo
 
 class SimulacionFinal:
-    def __init__(self, tasa_base, tasa_servicio, min_serv, max_serv, umbral_up, umbral_down):
+    def __init__(self, tasa_base, tasa_servicio, min_serv, max_serv, umbral_up, umbral_down, semilla=None):
         self.tasa_base = tasa_base
         self.mu = tasa_servicio
         self.min_servers = min_serv
         self.max_servers = max_serv
         self.umbral_up = umbral_up / 60.0
         self.umbral_down = umbral_down / 60.0
+
+        # Variables aleatorias pre-generadas en bloques (distribuciones.py): una llamada a NumPy cada miles de eventos
+        s_lleg, s_serv = semillas_independientes(semilla, 2)
+        self.flujo_llegadas = crear_flujo(None, s_lleg, media=1.0)
+        self.flujo_servicio = crear_flujo(None, s_serv, media_por_defecto=1.0 / self.mu)
         
         self.reloj = 0.0
         self.cola_clientes = deque()
@@ -117,6 +123,7 @@ class SimulacionFinal:
         
         progress_bar = st.progress(0)
         
+        eventos_procesados = 0
         while self.eventos:
             tiempo_evento, tipo, data = heapq.heappop(self.eventos)
             
@@ -154,7 +161,8 @@ class SimulacionFinal:
                 self._registrar_estado()
             
             # UI
-            if random.random() < 0.1: # Optimización visual
+            eventos_procesados += 1
+            if not eventos_procesados % 10: # Optimización visual
                 progress_bar.progress(min(self.reloj / 8.0, 1.0))
 
         progress_bar.empty()
@@ -163,7 +171,7 @@ class SimulacionFinal:
     def _programar_llegada(self):
         tasa = self._get_tasa_actual()
         if tasa <= 0: return
-        tiempo = random.expovariate(tasa)
+        tiempo = self.flujo_llegadas.siguiente() / tasa # Exp(1) escalada por la tasa del momento
         heapq.heappush(self.eventos, (self.reloj + tiempo, "LLEGADA", None))
 
     def _intentar_asignar(self):
@@ -175,7 +183,7 @@ class SimulacionFinal:
             candidato.ocupado = True
             
             cliente.hora_inicio_atencion = self.reloj
-            duracion = random.expovariate(self.mu)
+            duracion = self.flujo_servicio.siguiente()
             cliente.hora_salida = self.reloj + duracion
             
             # Registrar tiempo trabajado
@@ -1,12 +1,19 @@
 import streamlit as st
-import heapq
-import random
-from collections import deque
+import time
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
 
+from motor_master import ClaseCliente, fusionar_realidad_vs_estimado
+from servicio_simulaciones import ServicioSimulaciones
+from incremental import SimulacionIncremental
+from trazas import TrazaLlegadas
+from perfil_demanda import DIAS_SEMANA, ajustar_perfil
+from exportacion import boton_descarga, selector_formato
+from estimadores_ewt import ESTIMADORES
+from graficos import serie
+
 # Configuración de página al inicio (Requerido por Streamlit)
 st.set_page_config(
     page_title="Simulador Bancario Master AI",
@@ -15,279 +22,14 @@ st.set_page_config(
 )
 
 # ==========================================
-# 1. LÓGICA DEL MOTOR DE SIMULACIÓN (DES)
-# ==========================================
-
-def curva_demanda_diaria(hora_actual, tasa_base):
-    """
-    Define la 'personalidad' del día.
-    Devuelve la tasa de llegada (lambda) para un instante específico.
-    """
-    # Patrón: Mañana tranquila -> Subida -> HORA PICO (Almuerzo) -> Bajada -> Cierre
-    if 0 <= hora_actual < 2:   factor = 0.4
-    elif 2 <= hora_actual < 3: factor = 0.8
-    elif 3 <= hora_actual < 5: factor = 1.8  # 🔥 HORA PICO (x1.8 demanda normal)
-    elif 5 <= hora_actual < 7: factor = 1.2
-    elif 7 <= hora_actual <= 8: factor = 0.6
-    else: factor = 0.0
-    return tasa_base * factor
-
-class Cliente:
-    def __init__(self, id_cliente, hora_llegada):
-        self.id = id_cliente
-        self.hora_llegada = hora_llegada # Float exacto
-        self.hora_inicio_atencion = None
-        self.hora_salida = None
-        self.cola_al_llegar = 0
-
-class Servidor:
-    def __init__(self, id_servidor):
-        self.id = id_servidor
-        self.activo = False        # ¿Está en turno?
-        self.ocupado = False       # ¿Está atendiendo?
-        # Métricas precisas para utilización
-        self.tiempo_acumulado_activo = 0.0
-        self.tiempo_acumulado_trabajando = 0.0
-
-class SimulacionMaster:
-    def __init__(self, tasa_base, tasa_servicio, min_serv, max_serv, umbral_up, umbral_down):
-        self.tasa_base = tasa_base
-        self.mu = tasa_servicio
-        self.min_servers = min_serv
-        self.max_servers = max_serv
-        # Convertimos minutos a horas (float)
-        self.umbral_up = umbral_up / 60.0
-        self.umbral_down = umbral_down / 60.0
-        
-        self.reloj = 0.0
-        self.cola_clientes = deque()
-        # Creamos la flota de servidores
-        self.servidores = [Servidor(i) for i in range(max_serv)]
-        
-        # Encendemos los servidores mínimos
-        for i in range(min_serv): 
-            self.servidores[i].activo = True
-            
-        self.eventos = [] # Priority Queue
-        self.historial_clientes = []
-        self.log_sistema = [] # Foto del sistema en cada evento
-        
-        # Contadores Gerenciales
-        self.contador_activaciones = 0
-        self.contador_desactivaciones = 0
-
-    def _actualizar_cronometros(self, delta_tiempo):
-        """Suma tiempo a los contadores de los servidores activos"""
-        for s in self.servidores:
-            if s.activo:
-                s.tiempo_acumulado_activo += delta_tiempo
-
-    def _get_tasa_actual(self):
-        return curva_demanda_diaria(self.reloj, self.tasa_base)
-
-    def _calcular_ewt(self):
-        """Estimated Wait Time (Tiempo Estimado por el Sistema)"""
-        activos = sum(1 for s in self.servidores if s.activo)
-        if activos == 0: return 999.0 # Infinito
-        # EWT = Lq / (n * mu)
-        return len(self.cola_clientes) / (activos * self.mu)
-
-    def _registrar_snapshot(self):
-        """Toma una foto del estado actual para el análisis posterior"""
-        activos = sum(1 for s in self.servidores if s.activo)
-        ocupados = sum(1 for s in self.servidores if s.ocupado)
-        
-        self.log_sistema.append({
-            'Tiempo': self.reloj,
-            'Cola': len(self.cola_clientes),
-            'Servidores_Activos': activos,
-            'Servidores_Ocupados': ocupados,
-            'Tasa_Llegada_Instantanea': self._get_tasa_actual(),
-            'Wait_Time_Estimado_Min': self._calcular_ewt() * 60
-        })
-
-    def _gestionar_auto_scaling(self, ewt_actual):
-        """CEREBRO: Decide si prende o apaga servidores según EWT"""
-        activos = sum(1 for s in self.servidores if s.activo)
-        
-        # REGLA 1: Escalar Hacia Arriba (Emergencia)
-        if ewt_actual > self.umbral_up and activos < self.max_servers:
-            # Buscar el primer inactivo
-            for s in self.servidores:
-                if not s.activo:
-                    s.activo = True
-                    self.contador_activaciones += 1
-                    return 
-        
-        # REGLA 2: Escalar Hacia Abajo (Ahorro)
-        elif ewt_actual < self.umbral_down and activos > self.min_servers:
-            # Buscar el último activo que esté libre
-            for i in range(self.max_servers - 1, -1, -1):
-                s = self.servidores[i]
-                if s.activo and not s.ocupado:
-                    s.activo = False
-                    self.contador_desactivaciones += 1
-                    return
-
-    def programar_llegada(self):
-        tasa = self._get_tasa_actual()
-        if tasa <= 0: return # Banco cerrado o error
-        
-        # Generar intervalo
-        tiempo = random.expovariate(tasa)
-        hora_evento = self.reloj + tiempo
-        
-        # Solo agendar si es antes del cierre (8 horas)
-        if hora_evento <= 8.0:
-            heapq.heappush(self.eventos, (hora_evento, "LLEGADA", None))
-
-    def intentar_asignar(self):
-        """Busca match entre servidor libre y cliente en cola"""
-        if not self.cola_clientes: return
-        
-        # Buscar candidato (activo y no ocupado)
-        candidato = next((s for s in self.servidores if s.activo and not s.ocupado), None)
-        
-        if candidato:
-            cliente = self.cola_clientes.popleft()
-            candidato.ocupado = True
-            
-            cliente.hora_inicio_atencion = self.reloj
-            duracion = random.expovariate(self.mu)
-            cliente.hora_salida = self.reloj + duracion
-            
-            # Registrar uso
-            candidato.tiempo_acumulado_trabajando += duracion
-            
-            self.historial_clientes.append(cliente)
-            heapq.heappush(self.eventos, (cliente.hora_salida, "SALIDA", candidato.id))
-
-    def correr(self):
-        # Primer evento
-        self.programar_llegada()
-        
-        # UI Progress
-        progress_bar = st.progress(0)
-        
-        while self.eventos:
-            tiempo_evento, tipo, data = heapq.heappop(self.eventos)
-            
-            # 1. Actualizar cronómetros ANTES de saltar el tiempo
-            delta = tiempo_evento - self.reloj
-            self._actualizar_cronometros(delta)
-            
-            # 2. Actualizar Reloj
-            self.reloj = tiempo_evento
-            
-            # 3. Manejar Evento
-            if tipo == "LLEGADA":
-                # Nace Cliente
-                c = Cliente(len(self.historial_clientes) + len(self.cola_clientes), self.reloj)
-                c.cola_al_llegar = len(self.cola_clientes)
-                
-                # Calcular métricas para decisión
-                ewt = self._calcular_ewt()
-                self._gestionar_auto_scaling(ewt)
-                
-                self.cola_clientes.append(c)
-                self.intentar_asignar()
-                self.programar_llegada()
-                self._registrar_snapshot() # FOTO
-                
-            elif tipo == "SALIDA":
-                srv_id = data
-                self.servidores[srv_id].ocupado = False
-                
-                self.intentar_asignar()
-                if not self.cola_clientes: self._gestionar_auto_scaling(0.0)
-                self._registrar_snapshot() # FOTO
-            
-            # Actualizar UI cada tanto (no siempre para no frenar)
-            if random.random() < 0.05:
-                progress_bar.progress(min(self.reloj / 8.0, 1.0))
-        
-        progress_bar.empty()
-        
-        # --- PROCESAMIENTO DE DATOS AL FINALIZAR ---
-        return self._generar_reportes()
-
-    def _generar_reportes(self):
-        # 1. DF Clientes (Realidad)
-        data_c = []
-        for c in self.historial_clientes:
-            wait = (c.hora_inicio_atencion - c.hora_llegada) * 60
-            data_c.append({
-                "ID": c.id,
-                "Llegada": c.hora_llegada,
-                "Espera_Real_Min": wait,
-                "Cola_Al_Llegar": c.cola_al_llegar
-            })
-        df_clientes = pd.DataFrame(data_c)
-        
-        # 2. DF Sistema (Estimaciones y Estado)
-        df_sistema = pd.DataFrame(self.log_sistema)
-        
-        # 3. DF Servidores (Eficiencia)
-        data_s = []
-        for s in self.servidores:
-            if s.tiempo_acumulado_activo > 0.001:
-                util = (s.tiempo_acumulado_trabajando / s.tiempo_acumulado_activo) * 100
-            else:
-                util = 0.0
-            
-            data_s.append({
-                "ID": f"Cajero {s.id}",
-                "Horas_Activo": s.tiempo_acumulado_activo,
-                "Horas_Trabajadas": s.tiempo_acumulado_trabajando,
-                "Utilizacion_Pct": util
-            })
-        df_servidores = pd.DataFrame(data_s)
-        
-        return df_clientes, df_sistema, df_servidores
-
-# ==========================================
-# 2. FUNCIONES DE ANÁLISIS DE DATOS (ETL)
+# INTERFAZ GRÁFICA (DASHBOARD)
 # ==========================================
+# El motor DES y el ETL viven en motor_master.py. Las corridas las hace el
+# servicio local (servicio_simulaciones.py), compartido por todas las sesiones.
 
-def fusionar_realidad_vs_estimado(df_sistema, df_clientes):
-    """
-    Crea el Dataset Maestro cruzando lo que el sistema 'veía' vs lo que 'pasó'.
-    Usa resampling de 1 minuto para suavizar ruido visual.
-    """
-    # Crear índice temporal ficticio (asumiendo apertura 8:00 AM)
-    base_time = pd.Timestamp("2024-01-01 08:00:00")
-    
-    # 1. Procesar Sistema
-    df_sistema['datetime'] = base_time + pd.to_timedelta(df_sistema['Tiempo'], unit='h')
-    df_sys_resampled = df_sistema.set_index('datetime').resample('1T').agg({
-        'Cola': 'max', # Peor caso del minuto
-        'Servidores_Activos': 'last', # Estado final del minuto
-        'Wait_Time_Estimado_Min': 'mean', # Promedio de estimación
-        'Tasa_Llegada_Instantanea': 'mean'
-    })
-    
-    # 2. Procesar Clientes (Realidad)
-    df_clientes['datetime'] = base_time + pd.to_timedelta(df_clientes['Llegada'], unit='h')
-    df_cl_resampled = df_clientes.set_index('datetime').resample('1T').agg({
-        'Espera_Real_Min': 'mean', # Promedio real de los que llegaron en ese minuto
-        'ID': 'count' # Cantidad de llegadas (Volumen)
-    })
-    
-    # 3. Join
-    df_master = df_sys_resampled.join(df_cl_resampled)
-    
-    # Limpieza: Si nadie llegó, interpolamos la espera real para que el gráfico no se corte
-    df_master['Espera_Real_Min'] = df_master['Espera_Real_Min'].interpolate(method='linear')
-    df_master['Volumen_Clientes'] = df_master['ID'].fillna(0)
-    
-    # Calcular el Sesgo (Bias)
-    df_master['Sesgo_Algoritmo'] = df_master['Espera_Real_Min'] - df_master['Wait_Time_Estimado_Min']
-    
-    return df_master
-
-# ==========================================
-# 3. INTERFAZ GRÁFICA (DASHBOARD)
-# ==========================================
+@st.cache_resource
+def obtener_servicio():
+    return ServicioSimulaciones()
 
 st.title("🏦 Simulador Bancario: Optimización Operativa & Analytics")
 st.markdown("### Plataforma de Simulación de Colas M/M/c con Auto-Scaling")
@@ -299,29 +41,148 @@ with st.sidebar:
     st.subheader("1. Perfil de Demanda")
     TASA_BASE = st.slider("Clientes Base / Hora", 50, 400, 150, help="Volumen en horas normales. La hora pico multiplicará esto por 1.8x")
     
+    PERFIL = None
+    if st.checkbox("Perfil ajustado a datos históricos", help="Estima la curva de demanda (día de semana x hora) a partir de timestamps reales de la ticketera."):
+        archivo_hist = st.file_uploader("Historial de llegadas (CSV, 1ra columna = timestamp)", type="csv")
+        col1, col2 = st.columns(2)
+        DIA = col1.selectbox("Día a simular", DIAS_SEMANA)
+        APERTURA = col2.number_input("Apertura (hora)", 0, 16, 8)
+        ESCALA = st.slider("Escala de demanda (%)", 50, 200, 100, help="Para escenarios what-if sobre la demanda histórica")
+        if archivo_hist is not None:
+            llegadas_hist = pd.to_datetime(pd.read_csv(archivo_hist).iloc[:, 0])
+            perfil_semanal = ajustar_perfil(llegadas_hist, ancho_min=15, semanal=True, suavizado_min=20)
+            PERFIL = perfil_semanal.perfil_dia(DIAS_SEMANA.index(DIA), APERTURA, APERTURA + 8).escalado(ESCALA / 100)
+            st.caption(f"Demanda esperada del día: {PERFIL.total_periodo:.0f} clientes")
+    
+    TRAZA = None
+    if st.checkbox("Usar llegadas reales (traza)", help="Reemplaza la curva sintética por un log de la ticketera (.npy, .parquet o .csv). Se lee en streaming."):
+        RUTA_TRAZA = st.text_input("Ruta del archivo en el servidor", "")
+        col1, col2 = st.columns(2)
+        COL_LLEGADA = col1.text_input("Columna de llegada", "llegada")
+        COL_SERVICIO = col2.text_input("Columna de servicio (opcional)", "")
+        UNIDAD_TRAZA = st.selectbox("Unidad de los valores numéricos", ["h", "min", "s"])
+        if RUTA_TRAZA:
+            TRAZA = TrazaLlegadas(RUTA_TRAZA, COL_LLEGADA, COL_SERVICIO or None, UNIDAD_TRAZA)
+    
     st.subheader("2. Capacidad Operativa")
     MAX_SERVERS = st.slider("Flota Máxima de Cajeros", 5, 40, 15)
     TASA_SERVICIO = st.slider("Velocidad Cajero (Pax/Hora)", 10, 60, 20)
     
+    TIPO_SERVICIO = st.selectbox("Distribución del Tiempo de Atención",
+                                 ["Exponencial", "Erlang", "Lognormal", "Gamma", "Determinista", "Empírica (CSV)"],
+                                 help="La media siempre es 60 / Velocidad minutos, salvo en la empírica.")
+    DIST_SERVICIO = None
+    if TIPO_SERVICIO == "Erlang":
+        DIST_SERVICIO = {"tipo": "erlang", "k": st.slider("Fases (k)", 2, 10, 3)}
+    elif TIPO_SERVICIO == "Lognormal":
+        DIST_SERVICIO = {"tipo": "lognormal", "cv": st.slider("Coef. de Variación", 0.1, 3.0, 0.8)}
+    elif TIPO_SERVICIO == "Gamma":
+        DIST_SERVICIO = {"tipo": "gamma", "forma": st.slider("Forma", 0.2, 10.0, 2.0)}
+    elif TIPO_SERVICIO == "Determinista":
+        DIST_SERVICIO = {"tipo": "determinista"}
+    elif TIPO_SERVICIO == "Empírica (CSV)":
+        archivo = st.file_uploader("Tiempos de atención reales (minutos, 1 columna)", type="csv")
+        if archivo is not None:
+            minutos = pd.read_csv(archivo).iloc[:, 0].dropna().to_numpy()
+            DIST_SERVICIO = {"tipo": "empirica", "valores": (minutos / 60.0).tolist()}
+    
     st.subheader("3. Política de Auto-Scaling")
     st.info("Reglas para prender/apagar cajeros automáticamente.")
     col1, col2 = st.columns(2)
     UMBRAL_UP = col1.number_input("Activar (> min)", 5, 60, 15)
     UMBRAL_DOWN = col2.number_input("Apagar (< min)", 1, 30, 3)
+    INCREMENTAL = st.checkbox("Re-simulación incremental", help="Semilla fija para la sesión: si solo cambian los umbrales, se re-simula desde el último punto en común (o nada, si ninguna decisión cambia).")
+    
+    st.subheader("4. Comportamiento del Cliente")
+    col1, col2 = st.columns(2)
+    PACIENCIA = col1.number_input("Paciencia media (min)", 0, 120, 0, help="0 = espera para siempre. Si la espera supera su paciencia, el cliente abandona la fila.")
+    COLA_BALKING = col2.number_input("No entra si cola ≥", 0, 500, 0, help="0 = sin límite. Largo de cola a partir del cual el cliente se va sin hacer fila.")
+    
+    st.subheader("5. Segmentos de Clientes")
+    USAR_CLASES = st.checkbox("Prioridad VIP / Empresas / Retail", value=False)
+    CLASES = None
+    PREEMPTIVO = False
+    if USAR_CLASES:
+        st.caption("% de las llegadas y espera objetivo (SLA) de cada segmento. El SLA también dispara el auto-scaling.")
+        CLASES = []
+        for nombre, pct, sla in [("VIP", 10, 5), ("Empresas", 30, 10), ("Retail", 60, UMBRAL_UP)]:
+            col1, col2 = st.columns(2)
+            pct = col1.number_input(f"% {nombre}", 1, 100, pct)
+            sla = col2.number_input(f"SLA {nombre} (min)", 1, 60, sla)
+            CLASES.append(ClaseCliente(nombre, pct, sla))
+        PREEMPTIVO = st.radio("Modo de prioridad", ["No preemptivo", "Preemptivo"], horizontal=True,
+                              help="Preemptivo: un VIP interrumpe la atención de un cliente de menor prioridad.") == "Preemptivo"
     
     st.markdown("---")
+    INSTRUMENTAR = st.checkbox("Diagnóstico de rendimiento", help="Cuenta y cronometra cada parte del motor (FEL, snapshots, auto-scaling, pandas...).")
     btn_run = st.button("🚀 INICIAR SIMULACIÓN", type="primary")
 
 # --- EJECUCIÓN ---
 if btn_run:
-    sim = SimulacionMaster(TASA_BASE, TASA_SERVICIO, 1, MAX_SERVERS, UMBRAL_UP, UMBRAL_DOWN)
+    parametros = dict(
+        tasa_base=TASA_BASE, tasa_servicio=TASA_SERVICIO, min_serv=1, max_serv=MAX_SERVERS,
+        umbral_up=UMBRAL_UP, umbral_down=UMBRAL_DOWN,
+        paciencia_min=PACIENCIA or None, cola_max_balking=COLA_BALKING or None,
+        clases=CLASES, preemptivo=PREEMPTIVO, dist_servicio=DIST_SERVICIO, traza=TRAZA,
+        perfil=PERFIL, instrumentar=INSTRUMENTAR, estimadores=list(ESTIMADORES))
+    trabajo = None
     
     with st.spinner("Procesando eventos discretos... (Calculando microsegundos)"):
-        df_clientes, df_sistema, df_servidores = sim.correr()
+        progress_bar = st.progress(0)
+        if INCREMENTAL:
+            # La corrida base (con sus checkpoints) vive en la sesión del usuario
+            incremental = st.session_state.setdefault("incremental", SimulacionIncremental(intervalo_checkpoint=0.5))
+            df_clientes, df_sistema, df_servidores, resumen = incremental.correr(progreso=progress_bar.progress, **parametros)
+        else:
+            trabajo = obtener_servicio().enviar("dia_master", **parametros)
+            while not trabajo.terminado():
+                texto = "En cola (servicio ocupado)..." if trabajo.estado == "en cola" else None
+                progress_bar.progress(trabajo.progreso, text=texto)
+                time.sleep(0.1)
+            df_clientes, df_sistema, df_servidores, resumen = trabajo.resultado()
+        progress_bar.empty()
+        df_clientes, df_sistema = df_clientes.copy(), df_sistema.copy() # El ETL les agrega columnas
         # Generar Dataset Maestro
         df_master = fusionar_realidad_vs_estimado(df_sistema, df_clientes)
         
+    avisos = []
+    if trabajo is not None and trabajo.pedidos > 1:
+        avisos.append(f"Resultado compartido: {trabajo.pedidos} pedidos idénticos usaron la misma corrida.")
+    if INCREMENTAL:
+        if incremental.reutilizado:
+            avisos.append("Ninguna decisión de auto-scaling cambió: la trayectoria es idéntica a la anterior.")
+        elif incremental.reanudado_desde:
+            avisos.append(f"Re-simulado desde la hora {incremental.reanudado_desde:.2f} en {incremental.segundos * 1000:.0f} ms (mismos números aleatorios).")
+    # Se GUARDA en session_state: cambiar el formato de descarga (u otro widget) re-ejecuta
+    # el script con btn_run en False y no debe borrar los resultados
+    st.session_state['resultados_master'] = {
+        'df_clientes': df_clientes, 'df_sistema': df_sistema, 'df_servidores': df_servidores,
+        'df_master': df_master, 'resumen': resumen, 'avisos': avisos,
+        'clases': CLASES, 'preemptivo': PREEMPTIVO, 'perdidas': bool(PACIENCIA or COLA_BALKING),
+    }
+
+resultados = st.session_state.get('resultados_master')
+if resultados is not None:
+    df_clientes, df_sistema, df_servidores = resultados['df_clientes'], resultados['df_sistema'], resultados['df_servidores']
+    df_master, resumen = resultados['df_master'], resultados['resumen']
+    # Configuración de la corrida mostrada (el menú lateral puede haber cambiado desde entonces)
+    CLASES, PREEMPTIVO = resultados['clases'], resultados['preemptivo']
+    
     st.success("Simulación completada con éxito.")
+    for aviso in resultados['avisos']:
+        st.caption(aviso)
+    
+    stats = resumen["estadisticas"]
+    if stats is not None:
+        with st.expander(f"⏱️ Diagnóstico del motor: {stats.eventos_por_seg:,.0f} eventos/seg"):
+            c1, c2, c3 = st.columns(3)
+            c1.metric("Eventos", f"{stats.eventos_totales:,}")
+            c2.metric("Máximo FEL", f"{stats.max_fel:,}")
+            c3.metric("Máximo Cola", f"{stats.max_cola:,}")
+            st.dataframe(stats.resumen().style.format({
+                'Segundos': '{:.4f}', 'Pct_Total': '{:.1f}%', 'Microseg_Por_Llamada': '{:.2f}'
+            }))
+            st.caption("Tiempos inclusivos: las secciones llamadas dentro de un evento también suman en ese evento.")
 
     # --- PESTAÑAS DEL DASHBOARD ---
     tab1, tab2, tab3, tab4 = st.tabs([
@@ -338,7 +199,7 @@ if btn_run:
         # Cálculos
         espera_media = df_clientes['Espera_Real_Min'].mean()
         espera_p95 = df_clientes['Espera_Real_Min'].quantile(0.95)
-        recambios = sim.contador_activaciones + sim.contador_desactivaciones
+        recambios = resumen['contador_activaciones'] + resumen['contador_desactivaciones']
         total_pax = len(df_clientes)
         costo_promedio = df_master['Servidores_Activos'].mean()
         
@@ -349,21 +210,46 @@ if btn_run:
         c3.metric("Recambios de Turno", f"{recambios}", help="Total de veces que se prendió/apagó un cajero")
         c4.metric("Costo Medio (Cajeros)", f"{costo_promedio:.1f}", help="Promedio de personal activo durante el día")
         
+        # Clientes perdidos (solo si el modelo de paciencia/balking está activo)
+        if resultados['perdidas']:
+            perdidos = resumen['contador_abandonos'] + resumen['contador_balking']
+            c1, c2, c3 = st.columns(3)
+            c1.metric("Abandonos", f"{resumen['contador_abandonos']}", help="Se cansaron de esperar y se fueron de la fila")
+            c2.metric("No Entraron (Balking)", f"{resumen['contador_balking']}", help="Vieron la fila demasiado larga y no entraron")
+            c3.metric("Clientes Perdidos", f"{perdidos / max(resumen['contador_llegadas'], 1) * 100:.1f}%", delta_color="inverse")
+        
+        # KPIs por segmento
+        if CLASES:
+            st.write("#### Desempeño por Segmento")
+            sla_por_clase = {c.nombre: c.sla_min for c in CLASES}
+            df_kpi_clases = df_clientes.groupby("Clase", sort=False)["Espera_Real_Min"].agg(
+                Clientes="count", Espera_Media="mean", Espera_P95=lambda x: x.quantile(0.95)
+            )
+            df_kpi_clases["SLA_Min"] = df_kpi_clases.index.map(sla_por_clase)
+            df_kpi_clases["Cumplimiento_SLA_Pct"] = (
+                df_clientes["Espera_Real_Min"] <= df_clientes["Clase"].map(sla_por_clase)
+            ).groupby(df_clientes["Clase"], sort=False).mean() * 100
+            st.dataframe(df_kpi_clases.style.format({
+                'Espera_Media': '{:.2f} min', 'Espera_P95': '{:.2f} min', 'Cumplimiento_SLA_Pct': '{:.1f}%'
+            }))
+            if PREEMPTIVO:
+                st.caption(f"Atenciones interrumpidas por un cliente más prioritario: {resumen['contador_preempciones']}")
+        
         st.divider()
         
         st.subheader("Dinámica del Día (Hora Pico)")
         # Gráfico principal combinado
         fig_main = go.Figure()
         
-        # Área de Cola
-        fig_main.add_trace(go.Scatter(
+        # Área de Cola (LTTB + WebGL: días largos o trazas de meses siguen siendo livianos)
+        fig_main.add_trace(serie(
             x=df_master.index, y=df_master['Cola'],
             name="Personas en Cola", fill='tozeroy', 
             line=dict(color='rgba(0,0,255,0.5)', width=1)
         ))
         
         # Línea de Capacidad (Cajeros)
-        fig_main.add_trace(go.Scatter(
+        fig_main.add_trace(serie(
             x=df_master.index, y=df_master['Servidores_Activos'],
             name="Cajeros Activos", mode='lines',
             line=dict(color='red', width=3, shape='hv'), # hv = step chart
@@ -390,13 +276,27 @@ if btn_run:
         """)
         
         fig_bias = go.Figure()
-        fig_bias.add_trace(go.Scatter(x=df_master.index, y=df_master['Wait_Time_Estimado_Min'], name="Estimado (Ex-Ante)", line=dict(dash='dot')))
-        fig_bias.add_trace(go.Scatter(x=df_master.index, y=df_master['Espera_Real_Min'], name="Real (Ex-Post)", line=dict(color='red')))
+        fig_bias.add_trace(serie(df_master.index, df_master['Wait_Time_Estimado_Min'], name="Estimado (Ex-Ante)", line=dict(dash='dot')))
+        fig_bias.add_trace(serie(df_master.index, df_master['Espera_Real_Min'], name="Real (Ex-Post)", line=dict(color='red')))
         
         fig_bias.update_layout(title="Serie de Tiempo: Sesgo de Predicción", yaxis_title="Minutos")
         st.plotly_chart(fig_bias, use_container_width=True)
         
         st.info(f"**Análisis de Sesgo:** En promedio, el sistema tiene un error de **{df_master['Sesgo_Algoritmo'].mean():.2f} minutos**. (Positivo = El cliente espera más de lo prometido).")
+        
+        # --- Comparativa de estimadores (promesa individual de cada cliente vs su espera real) ---
+        marcador = resumen["marcador_ewt"]
+        if marcador is not None:
+            st.markdown("### ¿Qué estimador poner en la pantalla?")
+            st.caption(f"Cada cliente recibió la promesa de los {len(marcador.nombres)} estimadores al llegar. "
+                       f"Cobertura = % que esperó como mucho lo prometido + {marcador.tolerancia * 60:.0f} min.")
+            st.dataframe(marcador.tabla(por_hora=False).set_index("Estimador").style.format({
+                'MAE_Min': '{:.2f}', 'Sesgo_Min': '{:+.2f}', 'Cobertura_Pct': '{:.1f}%'
+            }))
+            fig_mae = px.line(marcador.tabla(), x="Hora", y="MAE_Min", color="Estimador", markers=True,
+                              title="Error absoluto medio por hora de llegada")
+            fig_mae.update_layout(yaxis_title="Minutos", xaxis_title="Horas desde la apertura")
+            st.plotly_chart(fig_mae, use_container_width=True)
 
     # === TAB 3: Eficiencia ===
     with tab3:
@@ -428,17 +328,19 @@ if btn_run:
     with tab4:
         st.subheader("Descarga de Datasets")
         st.markdown("Descarga los datos procesados para análisis externo en Python/Excel/Tableau.")
+        # Los archivos se generan recién al hacer clic (no en cada rerun)
+        formato = selector_formato(st, key="formato_master")
         
         col1, col2 = st.columns(2)
         with col1:
             st.write("###### Dataset Resumido (Minuto a Minuto)")
             st.dataframe(df_master.head())
-            st.download_button("📥 Descargar Time-Series (CSV)", df_master.to_csv().encode('utf-8'), "timeseries_banco.csv")
+            boton_descarga(st, "📥 Descargar Time-Series", df_master, "timeseries_banco", formato)
             
         with col2:
             st.write("###### Registro Crudo de Clientes")
             st.dataframe(df_clientes.head())
-            st.download_button("📥 Descargar Clientes Raw (CSV)", df_clientes.to_csv().encode('utf-8'), "clientes_raw.csv")
+            boton_descarga(st, "📥 Descargar Clientes Raw", df_clientes, "clientes_raw", formato)
 
 else:
     # Pantalla de bienvenida
@@ -1,12 +1,15 @@
 import streamlit as st
 import heapq
-import random
 from collections import deque
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
 
+from exportacion import boton_descarga, selector_formato
+from distribuciones import crear_flujo, semillas_independientes
+from graficos import serie, mapa_calor, nube, MAX_PUNTOS_NUBE
+
 # ==========================================
 # 1. LÓGICA DE NEGOCIO (BACKEND)
 # ==========================================
@@ -39,13 +42,18 @@ class Servidor:
         self.ultimo_cambio_estado = 0.0 # Para calcular delta tiempo activo
 
 class SimulacionAvanzada:
-    def __init__(self, tasa_base, tasa_servicio, min_serv, max_serv, umbral_up, umbral_down):
+    def __init__(self, tasa_base, tasa_servicio, min_serv, max_serv, umbral_up, umbral_down, semilla=None):
         self.tasa_base = tasa_base
         self.mu = tasa_servicio
         self.min_servers = min_serv
         self.max_servers = max_serv
         self.umbral_up = umbral_up / 60.0
         self.umbral_down = umbral_down / 60.0
+
+        # Variables aleatorias pre-generadas en bloques (distribuciones.py): una llamada a NumPy cada miles de eventos
+        s_lleg, s_serv = semillas_independientes(semilla, 2)
+        self.flujo_llegadas = crear_flujo(None, s_lleg, media=1.0)
+        self.flujo_servicio = crear_flujo(None, s_serv, media_por_defecto=1.0 / self.mu)
         
         self.reloj = 0.0
         self.cola_clientes = deque()
@@ -132,6 +140,7 @@ class SimulacionAvanzada:
         progress_bar = st.progress(0)
         status_text = st.empty()
         
+        eventos_procesados = 0
         while self.eventos:
             tiempo, tipo, data = heapq.heappop(self.eventos)
             
@@ -166,7 +175,8 @@ class SimulacionAvanzada:
                 self._registrar_estado()
             
             # UI Updates
-            if random.random() < 0.05: # No actualizar siempre para rendimiento
+            eventos_procesados += 1
+            if not eventos_procesados % 20: # No actualizar siempre para rendimiento
                 p = min(self.reloj / 8.0, 1.0)
                 progress_bar.progress(p)
                 status_text.text(f"Simulando Hora: {self.reloj:.2f}...")
@@ -183,7 +193,7 @@ class SimulacionAvanzada:
 
     def _programar_llegada(self):
         tasa = self._get_tasa_actual()
-        tiempo = random.expovariate(tasa)
+        tiempo = self.flujo_llegadas.siguiente() / tasa # Exp(1) escalada por la tasa del momento
         heapq.heappush(self.eventos, (self.reloj + tiempo, "LLEGADA", None))
 
     def _intentar_asignar(self):
@@ -195,7 +205,7 @@ class SimulacionAvanzada:
             candidato.ocupado = True
             
             cliente.hora_inicio_atencion = self.reloj
-            duracion = random.expovariate(self.mu)
+            duracion = self.flujo_servicio.siguiente()
             cliente.hora_salida = self.reloj + duracion
             
             # Métricas Servidor
@@ -291,6 +301,18 @@ if btn_run:
     with st.spinner("Procesando eventos discretos..."):
         df_clientes, df_log, df_servidores = sim.correr_simulacion()
         df_timeseries = generar_dataset_timeseries(df_log)
+    # Se GUARDA en session_state: cambiar el formato de descarga re-ejecuta el script
+    # con btn_run en False y no debe borrar los resultados
+    st.session_state['resultados_pro'] = {
+        'sim': sim, 'df_clientes': df_clientes, 'df_servidores': df_servidores,
+        'df_timeseries': df_timeseries, 'umbral_up': UMBRAL_UP,
+    }
+
+resultados = st.session_state.get('resultados_pro')
+if resultados is not None:
+    sim, df_clientes, df_servidores = resultados['sim'], resultados['df_clientes'], resultados['df_servidores']
+    df_timeseries = resultados['df_timeseries']
+    UMBRAL_UP = resultados['umbral_up'] # El de la corrida mostrada, no el del menú actual
 
     # --- PESTAÑAS ---
     tab1, tab2, tab3 = st.tabs(["📊 Dashboard Gerencial", "📈 Análisis de Demanda", "💾 Data Export"])
@@ -337,15 +359,15 @@ if btn_run:
         
         fig_ts = go.Figure()
         
-        # Área de Cola
-        fig_ts.add_trace(go.Scatter(
-            x=df_timeseries.index, y=df_timeseries['Cola'],
+        # Área de Cola (LTTB + WebGL)
+        fig_ts.add_trace(serie(
+            df_timeseries.index, df_timeseries['Cola'],
             name="Cola (Personas)", fill='tozeroy', line=dict(color='blue', width=1)
         ))
         
         # Línea de Cajeros
-        fig_ts.add_trace(go.Scatter(
-            x=df_timeseries.index, y=df_timeseries['Servidores_Activos'],
+        fig_ts.add_trace(serie(
+            df_timeseries.index, df_timeseries['Servidores_Activos'],
             name="Cajeros Activos", line=dict(color='red', width=3), yaxis="y2"
         ))
         
@@ -358,9 +380,15 @@ if btn_run:
         st.plotly_chart(fig_ts, use_container_width=True)
         
         st.markdown("### Mapa de Calor: Espera vs Hora")
-        fig_scat = px.scatter(df_clientes, x="Llegada", y="Espera_Min", 
-                              color="Cola_Llegar", title="¿A qué hora se sufre más?",
-                              labels={"Llegada": "Hora del Día (0-8)", "Espera_Min": "Minutos Esperando"})
+        if len(df_clientes) > MAX_PUNTOS_NUBE:
+            # Muchos clientes: densidad 2D calculada en el servidor en vez de un punto por cliente
+            fig_scat = go.Figure(mapa_calor(df_clientes["Llegada"], df_clientes["Espera_Min"]))
+        else:
+            fig_scat = go.Figure(nube(df_clientes["Llegada"], df_clientes["Espera_Min"],
+                                      color=df_clientes["Cola_Llegar"],
+                                      marker=dict(colorscale="Plasma", showscale=True, colorbar=dict(title="Cola_Llegar"))))
+        fig_scat.update_layout(title="¿A qué hora se sufre más?",
+                               xaxis_title="Hora del Día (0-8)", yaxis_title="Minutos Esperando")
         st.plotly_chart(fig_scat, use_container_width=True)
 
     # === TAB 3: DATA EXPORT ===
@@ -373,14 +401,9 @@ if btn_run:
         
         st.dataframe(df_timeseries.head(10))
         
-        # Botón de Descarga
-        csv = df_timeseries.to_csv().encode('utf-8')
-        st.download_button(
-            label="📥 Descargar Dataset (serie_tiempo_banco.csv)",
-            data=csv,
-            file_name='serie_tiempo_banco.csv',
-            mime='text/csv',
-        )
+        # Botón de Descarga (el archivo se arma recién al hacer clic)
+        formato = selector_formato(st, key="formato_pro")
+        boton_descarga(st, "📥 Descargar Dataset", df_timeseries, "serie_tiempo_banco", formato)
         
         st.markdown("### Resumen Estadístico del Dataset")
         st.write(df_timeseries.describe())
@@ -1,12 +1,13 @@
 import streamlit as st
 import heapq
-import random
 from collections import deque
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
 
+from distribuciones import crear_flujo, semillas_independientes
+
 # ==========================================
 # 1. DEFINICIÓN DE LA CURVA DE DEMANDA
 # ==========================================
@@ -59,13 +60,18 @@ class Servidor:
         self.tiempo_fin_servicio = 0.0
 
 class SimulacionBancoVariable:
-    def __init__(self, tasa_base, tasa_servicio, min_serv, max_serv, umbral_up, umbral_down):
+    def __init__(self, tasa_base, tasa_servicio, min_serv, max_serv, umbral_up, umbral_down, semilla=None):
         self.tasa_base = tasa_base # ESTO AHORA ES UN BASE, NO FIJO
         self.mu = tasa_servicio
         self.min_servers = min_serv
         self.max_servers = max_serv
         self.umbral_up = umbral_up / 60.0
         self.umbral_down = umbral_down / 60.0
+
+        # Variables aleatorias pre-generadas en bloques (distribuciones.py): una llamada a NumPy cada miles de eventos
+        s_lleg, s_serv = semillas_independientes(semilla, 2)
+        self.flujo_llegadas = crear_flujo(None, s_lleg, media=1.0)
+        self.flujo_servicio = crear_flujo(None, s_serv, media_por_defecto=1.0 / self.mu)
         
         self.reloj = 0.0
         self.cola_clientes = deque()
@@ -117,7 +123,7 @@ class SimulacionBancoVariable:
         # Generamos el siguiente delta de tiempo
         # Nota: Si la tasa cambia drásticamente en el futuro inmediato, esto tiene un pequeño error,
         # pero para simulaciones paso a paso es una aproximación estándar muy válida.
-        tiempo = random.expovariate(lambd_actual)
+        tiempo = self.flujo_llegadas.siguiente() / lambd_actual # Exp(1) escalada por la tasa del momento
         
         proxima_llegada = self.reloj + tiempo
         
@@ -175,7 +181,7 @@ class SimulacionBancoVariable:
             cliente = self.cola_clientes.popleft()
             candidato.ocupado = True
             cliente.hora_inicio_atencion = self.reloj
-            duracion = random.expovariate(self.mu)
+            duracion = self.flujo_servicio.siguiente()
             cliente.hora_salida = self.reloj + duracion
             candidato.tiempo_fin_servicio = cliente.hora_salida
             self.historial_clientes.append(cliente)
@@ -1,9 +1,13 @@
 import streamlit as st
-import random
 import pandas as pd
 import plotly.express as px
+import plotly.graph_objects as go
 import numpy as np
 
+from distribuciones import crear_flujo, semillas_independientes
+from filas_separadas import simular_filas_separadas
+from graficos import nube, linea_tendencia
+
 # Configuración de página
 st.set_page_config(page_title="El Mito de la Fila", layout="wide")
 
@@ -14,7 +18,7 @@ st.markdown("""
 """)
 
 # --- MOTOR DE SIMULACIÓN CORREGIDO ---
-def simular_escenario_fijo(n_cajeros, tasa_servicio, n_clientes=1000):
+def simular_escenario_fijo(n_cajeros, tasa_servicio, n_clientes=1000, semilla=None):
     reloj = 0.0
     # Cajeros: Guarda el momento (reloj) en que cada cajero se libera
     cajeros_liberacion = [0.0] * n_cajeros 
@@ -27,9 +31,14 @@ def simular_escenario_fijo(n_cajeros, tasa_servicio, n_clientes=1000):
     # (Llegan un 30% más rápido de lo que los cajeros pueden atender)
     tasa_llegada = (n_cajeros * tasa_servicio) * 1.3
     
+    # Variables aleatorias pre-generadas en bloques (distribuciones.py)
+    s_lleg, s_serv = semillas_independientes(semilla, 2)
+    proxima_llegada = crear_flujo(None, s_lleg, media=1.0 / tasa_llegada).siguiente
+    proximo_servicio = crear_flujo(None, s_serv, media=1.0 / tasa_servicio).siguiente
+    
     for _ in range(n_clientes):
         # 1. Llega un cliente
-        intervalo = random.expovariate(tasa_llegada)
+        intervalo = proxima_llegada()
         reloj += intervalo
         
         # 2. CÁLCULO DE LA FILA (CORREGIDO)
@@ -54,7 +63,7 @@ def simular_escenario_fijo(n_cajeros, tasa_servicio, n_clientes=1000):
         # El servicio empieza cuando llego O cuando el cajero se libera (lo que pase último)
         inicio_atencion = max(reloj, momento_liberacion)
         
-        duracion = random.expovariate(tasa_servicio)
+        duracion = proximo_servicio()
         fin_atencion = inicio_atencion + duracion
         
         # Actualizamos estado del cajero y lista de salidas
@@ -74,11 +83,30 @@ def simular_escenario_fijo(n_cajeros, tasa_servicio, n_clientes=1000):
             
     return pd.DataFrame(resultados)
 
+# --- UNA FILA POR CAJA (filas_separadas.py) ---
+TIPOS_FILA = {
+    "Fila única (como el banco)": None,
+    "Una fila por caja: la más corta": "mas_corta",
+    "Una fila por caja: al azar": "azar",
+    "Una fila por caja: con cambios (jockeying)": "jockeying",
+}
+
+def simular_filas_por_caja(n_cajeros, tasa_servicio, regla, n_clientes=1000):
+    # Mismo tráfico que el escenario de fila única (30% más de lo que se puede atender)
+    df = simular_filas_separadas(n_cajeros, (n_cajeros * tasa_servicio) * 1.3, tasa_servicio, n_clientes, regla=regla)
+    df = df[df["Personas_Delante"] > 0]
+    return pd.DataFrame({
+        "Escenario": f"{n_cajeros} Cajeros",
+        "Metros de Fila": df["Personas_Delante"].to_numpy(),
+        "Tiempo Espera Real (Min)": df["Espera_Min"].to_numpy(),
+    })
+
 # --- SIDEBAR ---
 with st.sidebar:
     st.header("Configuración")
     VELOCIDAD = st.slider("Velocidad Cajero (Pax/hora)", 10, 60, 20)
     CARTEL_POSICION = st.slider("Posición del Cartel", 5, 40, 15)
+    TIPO_FILA = st.selectbox("Tipo de Fila", list(TIPOS_FILA))
     
     run_btn = st.button("🚨 SIMULAR AHORA", type="primary")
 
@@ -86,9 +114,15 @@ with st.sidebar:
 if run_btn:
     with st.spinner("Simulando colas masivas..."):
         # Escenarios: Pocos, Medios y Muchos cajeros
-        df1 = simular_escenario_fijo(2, VELOCIDAD)
-        df2 = simular_escenario_fijo(6, VELOCIDAD)
-        df3 = simular_escenario_fijo(12, VELOCIDAD)
+        regla = TIPOS_FILA[TIPO_FILA]
+        if regla is None:
+            df1 = simular_escenario_fijo(2, VELOCIDAD)
+            df2 = simular_escenario_fijo(6, VELOCIDAD)
+            df3 = simular_escenario_fijo(12, VELOCIDAD)
+        else:
+            df1 = simular_filas_por_caja(2, VELOCIDAD, regla)
+            df2 = simular_filas_por_caja(6, VELOCIDAD, regla)
+            df3 = simular_filas_por_caja(12, VELOCIDAD, regla)
         
         df_total = pd.concat([df1, df2, df3])
 
@@ -97,15 +131,22 @@ if run_btn:
     else:
         # 1. GRÁFICO DE DISPERSIÓN CON TENDENCIA
         st.subheader("Evidencia Visual: Las líneas no coinciden")
-        fig = px.scatter(
-            df_total, 
-            x="Metros de Fila", 
-            y="Tiempo Espera Real (Min)", 
-            color="Escenario",
-            opacity=0.4,
-            trendline="ols", # Usamos regresión lineal simple (más robusto que lowess)
+        fig = go.Figure()
+        colores = px.colors.qualitative.Plotly
+        for i, (escenario, df_esc) in enumerate(df_total.groupby("Escenario", sort=False)):
+            x = df_esc["Metros de Fila"].to_numpy()
+            y = df_esc["Tiempo Espera Real (Min)"].to_numpy()
+            color = colores[i % len(colores)]
+            # Puntos submuestreados en WebGL + recta sobre medias por posición
+            # (la posición es entera: misma recta que un OLS con todos los puntos, sin statsmodels)
+            fig.add_trace(nube(x, y, name=escenario, legendgroup=escenario, opacity=0.4,
+                               marker=dict(color=color, size=5)))
+            fig.add_trace(linea_tendencia(x, y, name=f"Tendencia {escenario}", legendgroup=escenario,
+                                          showlegend=False, line=dict(color=color, width=3)))
+        fig.update_layout(
             title=f"Si estás en el metro {CARTEL_POSICION} de la fila, ¿cuánto esperas?",
-            labels={"Metros de Fila": "Posición en la Fila (Personas delante)", "Tiempo Espera Real (Min)": "Tiempo de Espera (Min)"}
+            xaxis_title="Posición en la Fila (Personas delante)",
+            yaxis_title="Tiempo de Espera (Min)"
         )
         
         # Línea del cartel
@@ -134,7 +175,14 @@ if run_btn:
         col2.metric("Con 6 Cajeros", f"{e2:.1f} min", delta="Normal", delta_color="off")
         col3.metric("Con 12 Cajeros", f"{e3:.1f} min", delta="Rápido", delta_color="normal")
         
-        st.info("""
-        **Moraleja:** El cartel miente.
-        La distancia física (posición) no sirve para predecir el tiempo si no consideras la capacidad instalada (Cajeros).
-        """)
\ No newline at end of file
+        if regla is None:
+            st.info("""
+            **Moraleja:** El cartel miente.
+            La distancia física (posición) no sirve para predecir el tiempo si no consideras la capacidad instalada (Cajeros).
+            """)
+        else:
+            st.info("""
+            **Con una fila por caja el cartel acierta en promedio:** delante tuyo solo hay gente de TU caja,
+            así que cada posición es un cobro más, abra el súper 2 cajas o 12. Lo que se paga es la dispersión:
+            si tocó una caja lenta no hay otro cajero que te rescate (salvo que te cambies de fila).
+            """)
\ No newline at end of file
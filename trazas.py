@@ -0,0 +1,197 @@
+import itertools
+import os
+
+import numpy as np
+
+# ==========================================
+# REPLAY DE TRAZAS REALES (TICKETERA)
+# ==========================================
+# Formatos aceptados:
+#   .npy     -> memory-mapped (np.load(mmap_mode='r')). Puede ser:
+#               1-D float64 con la hora de llegada,
+#               2-D (n, 2) con [llegada, servicio],
+#               o un array estructurado con campos nombrados (datetime64 o float).
+#   .parquet -> pyarrow.memory_map + lectura por lotes (row groups) solo de las columnas pedidas
+#   .csv     -> lector streaming de pyarrow (parseo en C por bloques); pandas por chunks si no hay pyarrow
+#
+# Las horas numéricas se interpretan en `unidad` ("h", "min" o "s") y se pasan a horas.
+# Los timestamps se pasan a horas desde `origen` (default: medianoche del primer registro).
+# Nunca se carga la traza entera: el motor consume bloques de `tamano_bloque` filas.
+
+TAMANO_BLOQUE = 65536
+
+_FACTOR_UNIDAD = {"h": 1.0, "min": 1 / 60.0, "s": 1 / 3600.0}
+
+
+class TrazaLlegadas:
+    def __init__(self, ruta, columna_llegada="llegada", columna_servicio=None,
+                 unidad="h", origen=None, tamano_bloque=TAMANO_BLOQUE):
+        if unidad not in _FACTOR_UNIDAD:
+            raise ValueError(f"Unidad desconocida: {unidad!r} (opciones: h, min, s)")
+        self.ruta = ruta
+        self.columna_llegada = columna_llegada
+        self.columna_servicio = columna_servicio
+        self.unidad = unidad
+        self.origen = None if origen is None else np.datetime64(origen)
+        self.tamano_bloque = tamano_bloque
+        self.formato = os.path.splitext(ruta)[1].lower().lstrip(".")
+        if self.formato not in ("npy", "parquet", "csv"):
+            raise ValueError(f"Formato de traza no soportado: .{self.formato} (usar .npy, .parquet o .csv)")
+
+    # --- Conversión vectorizada (nunca fila por fila) ---
+
+    def _a_horas(self, valores):
+        valores = np.asarray(valores)
+        if np.issubdtype(valores.dtype, np.datetime64):
+            if self.origen is None:
+                # Apertura = medianoche del primer registro
+                self.origen = valores[0].astype("datetime64[D]")
+            return (valores - self.origen) / np.timedelta64(1, "h")
+        return valores.astype(np.float64) * _FACTOR_UNIDAD[self.unidad]
+
+    def _duracion_a_horas(self, valores):
+        valores = np.asarray(valores)
+        if np.issubdtype(valores.dtype, np.timedelta64):
+            return valores / np.timedelta64(1, "h")
+        return valores.astype(np.float64) * _FACTOR_UNIDAD[self.unidad]
+
+    # --- Lectores crudos por formato: generan (llegadas, servicios | None) ---
+
+    def _bloques_npy(self):
+        datos = np.load(self.ruta, mmap_mode="r")
+        n = len(datos)
+        for i in range(0, n, self.tamano_bloque):
+            bloque = datos[i:i + self.tamano_bloque] # Vista sobre el mmap: el SO pagina a demanda
+            if bloque.dtype.names:
+                llegadas = bloque[self.columna_llegada]
+                servicios = bloque[self.columna_servicio] if self.columna_servicio else None
+            elif bloque.ndim == 2:
+                llegadas = bloque[:, 0]
+                servicios = bloque[:, 1] if self.columna_servicio else None
+            else:
+                llegadas, servicios = bloque, None
+            yield llegadas, servicios
+
+    def _columnas(self):
+        return [self.columna_llegada] + ([self.columna_servicio] if self.columna_servicio else [])
+
+    def _bloques_parquet(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        archivo = pq.ParquetFile(pa.memory_map(self.ruta, "r"))
+        for lote in archivo.iter_batches(batch_size=self.tamano_bloque, columns=self._columnas()):
+            yield self._desde_lote_arrow(lote)
+
+    def _bloques_csv(self):
+        try:
+            import pyarrow.csv as pcsv
+        except ImportError:
+            import pandas as pd
+            for df in pd.read_csv(self.ruta, usecols=self._columnas(), chunksize=self.tamano_bloque):
+                llegadas = df[self.columna_llegada]
+                if llegadas.dtype == object: llegadas = pd.to_datetime(llegadas)
+                servicios = df[self.columna_servicio].to_numpy() if self.columna_servicio else None
+                yield llegadas.to_numpy(), servicios
+            return
+        # Bloques de ~8 MB parseados en C
+        opciones = pcsv.ConvertOptions(include_columns=self._columnas())
+        lector = pcsv.open_csv(self.ruta, read_options=pcsv.ReadOptions(block_size=8 << 20),
+                               convert_options=opciones)
+        for lote in lector:
+            yield self._desde_lote_arrow(lote)
+
+    def _desde_lote_arrow(self, lote):
+        llegadas = lote.column(self.columna_llegada).to_numpy(zero_copy_only=False)
+        servicios = None
+        if self.columna_servicio:
+            servicios = lote.column(self.columna_servicio).to_numpy(zero_copy_only=False)
+        return llegadas, servicios
+
+    # --- API ---
+
+    def bloques(self):
+        """Genera (llegadas_h, servicios_h | None) como ndarrays float64, validando el orden"""
+        lector = {"npy": self._bloques_npy, "parquet": self._bloques_parquet, "csv": self._bloques_csv}
+        ultima = -np.inf
+        for llegadas, servicios in lector[self.formato]():
+            if not len(llegadas): continue
+            llegadas = self._a_horas(llegadas)
+            # El motor necesita llegadas ordenadas (chequeo vectorizado por bloque)
+            if llegadas[0] < ultima or (np.diff(llegadas) < 0).any():
+                raise ValueError(f"La traza {self.ruta} no está ordenada por {self.columna_llegada!r}")
+            ultima = llegadas[-1]
+            if servicios is not None:
+                servicios = self._duracion_a_horas(servicios)
+            yield llegadas, servicios
+
+    def __iter__(self):
+        """Itera (hora_llegada, servicio | None) como floats de Python, bloque a bloque"""
+        def filas():
+            for llegadas, servicios in self.bloques():
+                if servicios is None:
+                    yield zip(llegadas.tolist(), itertools.repeat(None))
+                else:
+                    yield zip(llegadas.tolist(), servicios.tolist())
+        return itertools.chain.from_iterable(filas())
+
+    def clave_cache(self):
+        """Identidad para cachés: parámetros + tamaño y fecha de modificación del archivo (reescribirlo invalida)"""
+        info = os.stat(self.ruta)
+        return {**vars(self), "archivo": (info.st_size, info.st_mtime_ns)}
+
+    def horizonte(self):
+        """Hora de la última llegada (None si no se puede saber sin leer todo el archivo)"""
+        if self.formato == "npy":
+            datos = np.load(self.ruta, mmap_mode="r")
+            if not len(datos): return None
+            ultimo = datos[-1:]
+            if ultimo.dtype.names: ultimo = ultimo[self.columna_llegada]
+            elif ultimo.ndim == 2: ultimo = ultimo[:, 0]
+            if self.origen is None and np.issubdtype(ultimo.dtype, np.datetime64):
+                primero = datos[:1]
+                primero = primero[self.columna_llegada] if primero.dtype.names else primero
+                self.origen = primero[0].astype("datetime64[D]")
+            return float(self._a_horas(ultimo)[0])
+        if self.formato == "parquet":
+            import pyarrow.parquet as pq
+            meta = pq.ParquetFile(self.ruta).metadata
+            if not meta.num_row_groups: return None
+            idx = meta.schema.to_arrow_schema().get_field_index(self.columna_llegada)
+            stats = meta.row_group(meta.num_row_groups - 1).column(idx).statistics
+            if stats is None or not stats.has_min_max: return None
+            maximo = stats.max
+            if hasattr(maximo, "year"):
+                # Columna timestamp: mismo origen que usará bloques()
+                if self.origen is None:
+                    self.origen = np.datetime64(meta.row_group(0).column(idx).statistics.min, "D")
+                maximo = np.datetime64(maximo, "us")
+            return float(self._a_horas(np.array([maximo]))[0])
+        return None
+
+
+def convertir_a_npy(ruta_origen, ruta_npy, columna_llegada="llegada", columna_servicio=None,
+                    unidad="h", origen=None):
+    """
+    Convierte una traza CSV/Parquet a .npy float64 ([llegada] o [llegada, servicio] en horas)
+    con memoria constante, para que los replays siguientes sean memory-mapped.
+    """
+    traza = TrazaLlegadas(ruta_origen, columna_llegada, columna_servicio, unidad, origen)
+    n_cols = 2 if columna_servicio else 1
+    ruta_tmp = ruta_npy + ".tmp"
+    n = 0
+    with open(ruta_tmp, "wb") as f:
+        for llegadas, servicios in traza.bloques():
+            bloque = llegadas if servicios is None else np.column_stack([llegadas, servicios])
+            bloque.astype(np.float64).tofile(f)
+            n += len(llegadas)
+
+    # Segunda pasada: copiar a un .npy con header, también por bloques
+    forma = (n,) if n_cols == 1 else (n, n_cols)
+    destino = np.lib.format.open_memmap(ruta_npy, mode="w+", dtype=np.float64, shape=forma)
+    crudo = np.memmap(ruta_tmp, dtype=np.float64, mode="r", shape=forma)
+    for i in range(0, n, TAMANO_BLOQUE):
+        destino[i:i + TAMANO_BLOQUE] = crudo[i:i + TAMANO_BLOQUE]
+    destino.flush()
+    del destino, crudo
+    os.remove(ruta_tmp)
+    return n
@@ -0,0 +1,126 @@
+# ==========================================
+# TURNOS, DESCANSOS Y SESIÓN MÍNIMA
+# ==========================================
+# El calendario dice quién está en la sucursal y cuándo; el auto-scaling decide
+# cuántos de ellos atienden en ventanilla. Todo entra a la FEL como eventos:
+#
+#   DISPONIBLE      empieza el turno o vuelve del descanso: pasa al grupo de apagados
+#                   (el auto-scaling lo puede prender; si hay menos de min_serv, se prende ya)
+#   NO_DISPONIBLE   termina el turno o sale al descanso: si está libre se va en el acto;
+#                   si está atendiendo termina a ese cliente y se va (salida pendiente).
+#                   El último cajero en ventanilla no se va mientras haya fila (horas extra)
+#   SESION_MINIMA   se cumplió el tiempo mínimo desde que lo prendieron: recién ahora
+#                   el auto-scaling puede apagarlo (se re-evalúa la regla de bajada)
+#
+# Horas desde la apertura, como el reloj del motor. Los descansos van en (hora, minutos).
+
+
+class Turno:
+    def __init__(self, cajero, entrada, salida, descansos=()):
+        self.cajero = cajero        # ID del Servidor
+        self.entrada = entrada      # Horas
+        self.salida = salida
+        self.descansos = sorted(descansos)  # [(hora de inicio, minutos)]
+        if salida <= entrada:
+            raise ValueError(f"Turno del cajero {cajero}: la salida ({salida}) debe ser posterior a la entrada ({entrada})")
+        for inicio, minutos in self.descansos:
+            if not (entrada <= inicio and inicio + minutos / 60.0 <= salida):
+                raise ValueError(f"Turno del cajero {cajero}: el descanso de las {inicio} h queda fuera del turno")
+
+    def tramos(self):
+        """Intervalos (desde, hasta) en que el cajero está disponible"""
+        tramos, desde = [], self.entrada
+        for inicio, minutos in self.descansos:
+            if inicio > desde: tramos.append((desde, inicio))
+            desde = max(desde, inicio + minutos / 60.0)
+        if self.salida > desde: tramos.append((desde, self.salida))
+        return tramos
+
+
+class CalendarioTurnos:
+    def __init__(self, turnos, sesion_minima_min=0.0):
+        """
+        turnos: lista de Turno (un cajero puede tener varios, sin superponerse).
+        sesion_minima_min: una vez prendido, un cajero no se apaga por auto-scaling antes de este tiempo.
+        """
+        self.turnos = list(turnos)
+        self.sesion_minima = sesion_minima_min / 60.0
+        por_cajero = {}
+        for t in self.turnos:
+            por_cajero.setdefault(t.cajero, []).append(t)
+        for cajero, lista in por_cajero.items():
+            lista.sort(key=lambda t: t.entrada)
+            for a, b in zip(lista, lista[1:]):
+                if b.entrada < a.salida:
+                    raise ValueError(f"Cajero {cajero}: turnos superpuestos ({a.entrada}-{a.salida} y {b.entrada}-{b.salida})")
+        self.cajeros = sorted(por_cajero)
+
+    @classmethod
+    def todo_el_dia(cls, n_cajeros, horas=8.0, sesion_minima_min=0.0):
+        """Todos disponibles toda la jornada: solo agrega la sesión mínima al auto-scaling"""
+        return cls([Turno(i, 0.0, horas) for i in range(n_cajeros)], sesion_minima_min)
+
+    @classmethod
+    def escalonado(cls, entradas, horas_turno, descanso_min=30, sesion_minima_min=0.0):
+        """
+        Un turno por cajero (IDs 0, 1, ...) que entra a la hora indicada en `entradas`,
+        con un descanso de `descanso_min` a mitad de turno.
+        """
+        turnos = []
+        for i, entrada in enumerate(entradas):
+            mitad = entrada + horas_turno / 2
+            descansos = [(mitad, descanso_min)] if descanso_min else []
+            turnos.append(Turno(i, entrada, entrada + horas_turno, descansos))
+        return cls(turnos, sesion_minima_min)
+
+    def eventos(self):
+        """(hora, tipo, cajero) ordenados por hora: lo que se agenda en la FEL al abrir"""
+        tramos = {}
+        for t in self.turnos:
+            tramos.setdefault(t.cajero, []).extend(t.tramos())
+        eventos = []
+        for cajero, lista in tramos.items():
+            if not lista: continue # El descanso ocupa todo el turno
+            lista.sort()
+            # Turnos pegados (uno sale cuando empieza el otro) son un solo tramo: no se va y vuelve
+            unidos = [list(lista[0])]
+            for desde, hasta in lista[1:]:
+                if desde <= unidos[-1][1]: unidos[-1][1] = max(unidos[-1][1], hasta)
+                else: unidos.append([desde, hasta])
+            for desde, hasta in unidos:
+                eventos.append((desde, "DISPONIBLE", cajero))
+                eventos.append((hasta, "NO_DISPONIBLE", cajero))
+        return sorted(eventos)
+
+    def disponibles(self, hora):
+        """Cajeros en la sucursal (en turno y fuera de descanso) a una hora dada"""
+        return [t.cajero for t in self.turnos if any(d <= hora < h for d, h in t.tramos())]
+
+
+# --- ZONA DE PRUEBAS ---
+
+if __name__ == "__main__":
+    from motor_master import SimulacionMaster
+
+    # Misma sucursal (hasta 10 cajeros, 8 horas): auto-scaling puro vs calendario real
+    calendarios = {
+        "sin calendario": None,
+        "todo el día + sesión 45 min": CalendarioTurnos.todo_el_dia(10, 8.0, sesion_minima_min=45),
+        "2 turnos de 4 h + almuerzo": CalendarioTurnos.escalonado([0] * 5 + [4] * 5, 4.0, descanso_min=30,
+                                                                   sesion_minima_min=45),
+    }
+    for nombre, calendario in calendarios.items():
+        sim = SimulacionMaster(150, 20, 2, 10, 10, 3, paciencia_min=20, semilla=42, turnos=calendario)
+        df_clientes, _, df_servidores = sim.correr()
+        print(f"{nombre:<28} espera {df_clientes['Espera_Real_Min'].mean():5.1f} min | "
+              f"abandonos {sim.contador_abandonos:3d} | horas activas {df_servidores['Horas_Activo'].sum():5.1f} | "
+              f"prendidas/apagadas {sim.contador_activaciones}/{sim.contador_desactivaciones}")
+
+    # Contabilidad exacta: sin auto-scaling (min = max) cada cajero está activo justo en sus tramos
+    # (más las horas extra si era el último en ventanilla con gente en la fila)
+    calendario = CalendarioTurnos.escalonado([0, 0, 2, 4], 4.0, descanso_min=30)
+    sim = SimulacionMaster(10, 20, 4, 4, 15, 3, semilla=1, turnos=calendario)
+    sim.correr()
+    for s in sim.servidores:
+        disponible = sum(h - d for t in calendario.turnos if t.cajero == s.id for d, h in t.tramos())
+        print(f"Cajero {s.id}: activo {s.tiempo_acumulado_activo:.4f} h | en turno {disponible:.4f} h")